@@ -0,0 +1,95 @@
+"""
+Lean WSGI handling for the JSON API.
+
+Machine clients of the ``api/`` endpoints gain nothing from sessions, CSRF,
+authentication, messages or the browsable API. When ``LEAN_API`` is enabled,
+``AlgebraAPI.wsgi`` wraps the regular application in ``LeanAPIDispatcher`` so
+that requests under ``LEAN_API_PREFIX`` are served by ``LeanWSGIHandler``,
+which runs the stripped ``LEAN_API_MIDDLEWARE`` chain instead.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+
+class LeanWSGIHandler(WSGIHandler):
+    """
+    WSGI handler that builds its middleware chain from ``LEAN_API_MIDDLEWARE``.
+    """
+
+    def load_middleware(self, is_async=False):
+        """
+        Populate middleware lists from settings.LEAN_API_MIDDLEWARE.
+
+        Follows BaseHandler.load_middleware, which always reads settings.MIDDLEWARE,
+        over the lean list instead.
+        """
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(settings.LEAN_API_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            middleware_can_sync = getattr(middleware, 'sync_capable', True)
+            middleware_can_async = getattr(middleware, 'async_capable', False)
+            if not middleware_can_sync and not middleware_can_async:
+                raise RuntimeError(
+                    f"Middleware {middleware_path} must have at least one of sync_capable/async_capable set to True."
+                )
+            middleware_is_async = middleware_can_async if handler_is_async or not middleware_can_sync else False
+            try:
+                adapted_handler = self.adapt_method_mode(
+                    middleware_is_async, handler, handler_is_async,
+                    debug=settings.DEBUG, name=f"middleware {middleware_path}",
+                )
+                instance = middleware(adapted_handler)
+            except MiddlewareNotUsed:
+                continue
+            handler = adapted_handler
+            if instance is None:
+                raise ImproperlyConfigured(f"Middleware factory {middleware_path} returned None.")
+
+            if hasattr(instance, 'process_view'):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, instance.process_view))
+            if hasattr(instance, 'process_template_response'):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, instance.process_template_response)
+                )
+            if hasattr(instance, 'process_exception'):
+                self._exception_middleware.append(self.adapt_method_mode(False, instance.process_exception))
+
+            handler = convert_exception_to_response(instance)
+            handler_is_async = middleware_is_async
+
+        # Assigned last, since Django takes it as the sign that loading is complete.
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+
+class LeanAPIDispatcher:
+    """
+    WSGI application sending API paths to the lean handler and everything else
+    (main page, admin, swagger) to the regular one.
+    """
+
+    def __init__(self, application, lean_application, prefix: str):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            application: The regular Django WSGI application.
+            lean_application: The lean WSGI handler.
+            prefix (str): PATH_INFO prefix served by the lean handler.
+        """
+        self.application = application
+        self.lean_application = lean_application
+        self.prefix = prefix
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(self.prefix):
+            return self.lean_application(environ, start_response)
+        return self.application(environ, start_response)
@@ -0,0 +1,5 @@
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/', include('algebra_engine.lean_urls', 'algebra_engine')),
+]
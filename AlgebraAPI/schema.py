@@ -0,0 +1,118 @@
+"""
+OpenAPI schema serving for AlgebraAPI.
+
+The schema never changes between deploys, so it is generated once, either at build
+time by ``manage.py generate_schema`` or on first use, and served as a static
+artifact afterwards. drf_yasg and its schema machinery are only imported when a
+schema has to be generated or a documentation UI is rendered, which keeps them
+out of worker startup.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import permissions
+
+SCHEMA_CONTENT_TYPES = {
+    '.json': 'application/json',
+    '.yaml': 'application/yaml',
+}
+
+
+@lru_cache(maxsize=None)
+def get_api_info():
+    """
+    Build the drf_yasg description of the API.
+
+    Returns: openapi.Info: Title, version, and contact details of the API.
+    """
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Algebra API documentation",
+        default_version='v1',
+        description="API for evaluating algebraic expressions",
+        terms_of_service="",
+        contact=openapi.Contact(email=""),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_schema_view():
+    """
+    Build the drf_yasg schema view class used by the documentation UIs.
+
+    Returns: type: The drf_yasg SchemaView class.
+    """
+    from drf_yasg.views import get_schema_view as get_yasg_schema_view
+
+    return get_yasg_schema_view(
+        get_api_info(),
+        public=True,
+        permission_classes=[permissions.AllowAny],
+    )
+
+
+def generate_schema(schema_format: str) -> bytes:
+    """
+    Generate the public OpenAPI schema of the project.
+
+    Args: schema_format (str): Either '.json' or '.yaml'.
+
+    Returns: bytes: The encoded schema document.
+    """
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+
+    schema = OpenAPISchemaGenerator(get_api_info()).get_schema(request=None, public=True)
+    codec_class = OpenAPICodecJson if schema_format == '.json' else OpenAPICodecYaml
+    return codec_class(validators=[]).encode(schema)
+
+
+@lru_cache(maxsize=None)
+def get_schema(schema_format: str) -> bytes:
+    """
+    Return the schema document, generating it only if no prebuilt artifact exists.
+
+    Args: schema_format (str): Either '.json' or '.yaml'.
+
+    Returns: bytes: The encoded schema document.
+    """
+    path = settings.OPENAPI_SCHEMA_DIR / f'swagger{schema_format}'
+    if path.exists():
+        return path.read_bytes()
+    return generate_schema(schema_format)
+
+
+def schema_view(request, format):
+    """
+    Serve the prebuilt (or first-use generated) schema document.
+    """
+    return HttpResponse(get_schema(format), content_type=SCHEMA_CONTENT_TYPES[format])
+
+
+@lru_cache(maxsize=None)
+def get_schema_ui_view(renderer: str):
+    """
+    Build the drf_yasg documentation UI view on first use.
+
+    Args: renderer (str): Either 'swagger' or 'redoc'.
+
+    Returns: The drf_yasg UI view function.
+    """
+    return get_schema_view().with_ui(renderer, cache_timeout=settings.OPENAPI_UI_CACHE_TIMEOUT)
+
+
+def schema_ui_view(renderer: str):
+    """
+    Return a view rendering the given documentation UI without importing drf_yasg upfront.
+
+    Args: renderer (str): Either 'swagger' or 'redoc'.
+
+    Returns: The view function.
+    """
+    def view(request, *args, **kwargs):
+        return get_schema_ui_view(renderer)(request, *args, **kwargs)
+
+    return view
@@ -11,10 +11,30 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
 from pathlib import Path
+from importlib.util import find_spec
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+
+def env_flag(name: str, default: bool) -> bool:
+    """
+    Read a boolean setting from the environment.
+
+    Args:
+        name (str): Name of the environment variable.
+        default (bool): Value when the variable is not set.
+
+    Returns: bool: True for 1, true or yes in any case; False for anything else, empty included.
+    """
+    return os.environ.get(name, str(default)).strip().lower() in ('1', 'true', 'yes')
+
+
+# drf_yasg is only needed to generate the schema and render the documentation UIs, so it
+# is not an installed app (importing it pulls in pkg_resources at startup). Its templates
+# and static files are located without importing the package.
+DRF_YASG_DIR = Path(find_spec('drf_yasg').origin).parent
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ.get('SECRET_KEY', "hmorEbyVJZkLqsNYqMBLfIcUgYGhdloRTkZpndPrgDyXyJFKlgeZQMflEfmq")
 
@@ -37,7 +57,6 @@ INSTALLED_APPS = [
 
     # Third party apps
     'rest_framework',
-    'drf_yasg',
 
     # apps
     'algebra_engine'
@@ -53,12 +72,22 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Lean API mode: serve the JSON endpoints through a stripped middleware chain
+# (see AlgebraAPI/lean.py).
+
+LEAN_API = env_flag('LEAN_API', False)
+LEAN_API_PREFIX = '/api/'
+LEAN_API_URLCONF = 'AlgebraAPI.lean_urls'
+LEAN_API_MIDDLEWARE = [
+    'algebra_engine.middleware.LeanURLConfMiddleware',
+]
+
 ROOT_URLCONF = 'AlgebraAPI.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
+        'DIRS': [BASE_DIR / 'templates', DRF_YASG_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -86,6 +115,160 @@ DATABASES = {
     }
 }
 
+# Optional read replica for history reads (see algebra_engine/routers.py).
+# Reads stay on the primary for REPLICA_READ_AFTER_WRITE_SECONDS after a client's own write.
+
+REPLICA_DATABASE = 'replica'
+REPLICA_ROUTED_MODELS = (
+    'algebra_engine.ExpressionHistory',
+    'algebra_engine.ExpressionHourlyStats',
+    'algebra_engine.ExpressionHeavyHitter',
+)
+REPLICA_READ_AFTER_WRITE_SECONDS = int(os.environ.get('DB_REPLICA_READ_AFTER_WRITE_SECONDS', 5))
+REPLICA_PIN_COOKIE = 'replica_pinned_until'
+
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES[REPLICA_DATABASE] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'HOST': os.environ.get('DB_REPLICA_HOST'),
+        'PORT': os.environ.get('DB_REPLICA_PORT', os.environ.get('DB_PORT')),
+        'NAME': os.environ.get('DB_REPLICA_DATABASE', os.environ.get('DB_DATABASE')),
+        'USER': os.environ.get('DB_REPLICA_USERNAME', os.environ.get('DB_USERNAME')),
+        'PASSWORD': os.environ.get('DB_REPLICA_PASSWORD', os.environ.get('DB_PASSWORD')),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['algebra_engine.routers.ReplicaRouter']
+    MIDDLEWARE.append('algebra_engine.middleware.ReplicaPinningMiddleware')
+    LEAN_API_MIDDLEWARE.append('algebra_engine.middleware.ReplicaPinningMiddleware')
+
+
+# Asynchronous expression jobs (see algebra_engine/jobs.py)
+
+EXPRESSION_JOBS_POLL_INTERVAL = 0.5
+EXPRESSION_JOBS_LONG_POLL_INTERVAL = 0.1
+EXPRESSION_JOBS_LONG_POLL_MAX_WAIT = 30
+
+
+# In-memory feed of recent evaluations (see algebra_engine/feed.py)
+
+RECENT_FEED_SIZE = int(os.environ.get('RECENT_FEED_SIZE', 500))
+RECENT_FEED_LONG_POLL_MAX_WAIT = 30
+
+
+# Evaluation statistics (see algebra_engine/stats.py)
+# Each process writes outcomes to the rollups in batches of up to STATS_BATCH_SIZE,
+# at most STATS_BATCH_INTERVAL seconds after the first outcome of the batch.
+
+STATS_TOP_K = 100
+STATS_MAX_HOURS = 24 * 31
+STATS_BATCH_SIZE = int(os.environ.get('STATS_BATCH_SIZE', 100))
+STATS_BATCH_INTERVAL = float(os.environ.get('STATS_BATCH_INTERVAL', 1))
+
+
+# Slow expression sampling (see algebra_engine/profiler.py), browsable in the admin.
+# Re-running slow evaluations under cProfile doubles their cost.
+
+SLOW_EXPRESSIONS_THRESHOLD = float(os.environ.get('SLOW_EXPRESSIONS_THRESHOLD', 0.1))
+SLOW_EXPRESSIONS_SAMPLE_RATE = float(os.environ.get('SLOW_EXPRESSIONS_SAMPLE_RATE', 1))
+SLOW_EXPRESSIONS_PROFILE = env_flag('SLOW_EXPRESSIONS_PROFILE', False)
+SLOW_EXPRESSIONS_MAX_RECORDS = 1000
+SLOW_EXPRESSIONS_MAX_LENGTH = 10000
+
+
+# Cost-weighted admission control (see algebra_engine/admission.py), off by default.
+# One token is worth one millisecond of evaluation CPU time.
+
+ADMISSION_CONTROL = env_flag('ADMISSION_CONTROL', False)
+ADMISSION_CACHE = 'admission'
+ADMISSION_CAPACITY = int(os.environ.get('ADMISSION_CAPACITY', 2000))
+ADMISSION_REFILL_RATE = float(os.environ.get('ADMISSION_REFILL_RATE', 100))
+ADMISSION_BASE_COST = 1
+ADMISSION_COST_PER_KB = 1
+ADMISSION_BUCKET_TTL = 60 * 60 * 24
+ADMISSION_LIST_INTERVAL = 60 * 60
+ADMISSION_MAX_TRACKED_CLIENTS = 10000
+
+# The admission cache holds one bucket per client. It is in-process memory by default,
+# which culls the least recently used buckets past MAX_ENTRIES; set a shared backend
+# such as django.core.cache.backends.redis.RedisCache for workers to share buckets.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'admission': {
+        'BACKEND': os.environ.get('ADMISSION_CACHE_BACKEND') or 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': os.environ.get('ADMISSION_CACHE_LOCATION') or 'admission',
+        'OPTIONS': {
+            'MAX_ENTRIES': ADMISSION_MAX_TRACKED_CLIENTS,
+        },
+    },
+}
+
+TEST_RUNNER = 'AlgebraAPI.test_runner.AlgebraTestRunner'
+
+# Clients are identified by REMOTE_ADDR; behind N reverse proxies, set NUM_PROXIES=N
+# so that the address they append to X-Forwarded-For is used instead.
+
+REST_FRAMEWORK = {
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Parallel evaluation of independent big-integer subtrees (see algebra_engine/parallel.py).
+# A cost unit is roughly 2-3 ns, so subtrees under ~10 ms never pay the pool overhead.
+# PARALLEL_EVAL_WORKERS defaults to the number of CPUs.
+
+PARALLEL_EVAL = env_flag('PARALLEL_EVAL', False)
+PARALLEL_EVAL_WORKERS = int(os.environ.get('PARALLEL_EVAL_WORKERS') or 0)
+PARALLEL_EVAL_MIN_COST = float(os.environ.get('PARALLEL_EVAL_MIN_COST', 4e6))
+PARALLEL_EVAL_MIN_LENGTH = 1000
+
+# Prepared expressions (see algebra_engine/prepared.py)
+
+PREPARED_EXPRESSIONS_CACHE_SIZE = int(os.environ.get('PREPARED_EXPRESSIONS_CACHE_SIZE', 1024))
+PREPARED_EXPRESSIONS_MAX_BATCH = 1000
+
+# Streaming upload of large expressions (see algebra_engine/streaming.py).
+# Only the first EXPRESSION_UPLOAD_PREFIX_LENGTH characters and a hash are stored.
+
+EXPRESSION_UPLOAD_MAX_SIZE = int(os.environ.get('EXPRESSION_UPLOAD_MAX_SIZE', 32 * 1024 * 1024))
+EXPRESSION_UPLOAD_CHUNK_SIZE = 64 * 1024
+EXPRESSION_UPLOAD_MAX_TOKEN = 4300
+EXPRESSION_UPLOAD_MAX_DEPTH = 1000
+EXPRESSION_UPLOAD_MAX_PENDING = 10000
+EXPRESSION_UPLOAD_PREFIX_LENGTH = 1000
+
+# Idempotency-Key support on api/expression-input/ (see algebra_engine/idempotency.py).
+# Duplicates of a request still being evaluated wait up to IDEMPOTENCY_WAIT_TIMEOUT seconds;
+# a request in flight for over IDEMPOTENCY_LOCK_TIMEOUT seconds is considered abandoned.
+
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 60 * 60 * 24))
+IDEMPOTENCY_WAIT_TIMEOUT = 30
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Compressed storage of large history values (see algebra_engine/compression.py).
+# 'zlib', 'zstd' (requires the zstandard package) or an empty line to store plain text.
+
+HISTORY_COMPRESSION = os.environ.get('HISTORY_COMPRESSION', '')
+HISTORY_COMPRESSION_LEVEL = int(os.environ.get('HISTORY_COMPRESSION_LEVEL', 6))
+HISTORY_COMPRESSION_MIN_SIZE = int(os.environ.get('HISTORY_COMPRESSION_MIN_SIZE', 4096))
+HISTORY_PREVIEW_LENGTH = 200
+
+# Canonical forms of expressions (see algebra_engine/canonical.py)
+
+CANONICAL_MAX_LENGTH = int(os.environ.get('CANONICAL_MAX_LENGTH', 10000))
+
+# In-process result cache warmed up with hot expressions when the WSGI application
+# is loaded (see algebra_engine/result_cache.py).
+
+RESULT_CACHE = env_flag('RESULT_CACHE', True)
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+RESULT_CACHE_WARMUP = env_flag('RESULT_CACHE_WARMUP', True)
+RESULT_CACHE_WARMUP_TOP = int(os.environ.get('RESULT_CACHE_WARMUP_TOP', 200))
+RESULT_CACHE_WARMUP_SAMPLE = 10000
+RESULT_CACHE_WARMUP_TIME_BUDGET = float(os.environ.get('RESULT_CACHE_WARMUP_TIME_BUDGET', 2))
+
 
 # Password validation
 
@@ -119,6 +302,22 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 
 STATIC_URL = 'static/'
+STATICFILES_DIRS = [DRF_YASG_DIR / 'static']
+
+# OpenAPI schema (see AlgebraAPI/schema.py). Generate the artifacts with
+# `python manage.py generate_schema`; without them the schema is generated on first use.
+# The Docker image keeps them outside of the source tree, which docker-compose mounts over.
+
+OPENAPI_SCHEMA_DIR = Path(os.environ.get('OPENAPI_SCHEMA_DIR', BASE_DIR / 'schema'))
+OPENAPI_UI_CACHE_TIMEOUT = 60 * 60 * 24
+
+SWAGGER_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
 # Default primary key field type
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
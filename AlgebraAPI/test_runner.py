@@ -0,0 +1,36 @@
+"""
+Test runner for AlgebraAPI.
+
+Every request to the evaluation endpoints may charge an admission bucket. The
+test suite keeps those buckets in memory of its own instead of the ``admission``
+cache configured for the host, which may be shared (e.g. Redis), so that test
+runs neither throttle nor get throttled by a server running alongside.
+
+Evaluation statistics are written as soon as they are recorded, instead of being
+batched and left to a timer thread outside the test transactions.
+"""
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class AlgebraTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner with an admission cache of its own and unbatched statistics.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.admission_settings = override_settings(STATS_BATCH_SIZE=1, CACHES={
+            **settings.CACHES,
+            settings.ADMISSION_CACHE: {
+                **settings.CACHES[settings.ADMISSION_CACHE],
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'algebra_api_admission_tests',
+            },
+        })
+        self.admission_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.admission_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,28 +1,13 @@
-from drf_yasg import openapi
 from django.contrib import admin
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
 from django.urls import path, include, re_path
 
 from algebra_engine.views import MainView
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Algebra API documentation",
-        default_version='v1',
-        description="API for evaluating algebraic expressions",
-        terms_of_service="",
-        contact=openapi.Contact(email=""),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+from AlgebraAPI.schema import schema_view, schema_ui_view
 
 urlpatterns = [
     path('', MainView.as_view(), name='main'),
     path('admin/', admin.site.urls),
     path('api/', include('algebra_engine.urls', 'algebra_engine')),
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),]
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view, name='schema-json'),
+    path('swagger/', schema_ui_view('swagger'), name='schema-swagger-ui'),
+    path('redoc/', schema_ui_view('redoc'), name='schema-redoc'),]
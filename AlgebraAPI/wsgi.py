@@ -9,8 +9,21 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
+from django.db import connections
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'AlgebraAPI.settings')
 
 application = get_wsgi_application()
+
+from algebra_engine.result_cache import warm_up_on_startup  # noqa: E402
+
+warm_up_on_startup()
+# Do not hand the warm-up's connections over to forked workers.
+connections.close_all()
+
+if settings.LEAN_API:
+    from AlgebraAPI.lean import LeanAPIDispatcher, LeanWSGIHandler
+
+    application = LeanAPIDispatcher(application, LeanWSGIHandler(), settings.LEAN_API_PREFIX)
@@ -1,19 +1,69 @@
 from django.contrib import admin
-from .models import ExpressionHistory
+from .models import ExpressionHistory, SlowExpression
 
 
 @admin.register(ExpressionHistory)
 class ExpressionHistoryAdmin(admin.ModelAdmin):
     list_display = ('expression', 'result', 'status', 'created_at', 'evaluated_at')
     list_filter = ('status', 'created_at', 'evaluated_at')
-    search_fields = ('expression', 'result')
+    search_fields = ('expression', 'result', '=canonical_hash')
+    readonly_fields = (
+        'expression_hash', 'canonical_hash', 'input_size', 'compression', 'full_expression', 'full_result',
+    )
 
     fieldsets = (
         (None, {
-            'fields': ('expression', 'result', 'status')
+            'fields': ('expression', 'result', 'error', 'status')
         }),
         ('Date Information', {
             'fields': ('evaluated_at',),
             'classes': ('collapse',),
         }),
+        ('Canonical form', {
+            'fields': ('canonical_hash',),
+            'classes': ('collapse',),
+        }),
+        ('Compressed values', {
+            'fields': ('expression_hash', 'input_size', 'compression', 'full_expression', 'full_result'),
+            'classes': ('collapse',),
+        }),
+    )
+
+    def get_queryset(self, request):
+        # Lists only show the previews kept in the text fields; compressed values
+        # are loaded when the change form reads full_expression and full_result.
+        return super().get_queryset(request).defer('expression_data', 'result_data')
+
+
+@admin.register(SlowExpression)
+class SlowExpressionAdmin(admin.ModelAdmin):
+    list_display = (
+        'expression_preview', 'input_size', 'total_time', 'unary_time', 'format_time',
+        'validation_time', 'canonical_time', 'eval_time', 'db_time', 'created_at',
+    )
+    list_filter = ('created_at',)
+    search_fields = ('expression',)
+    ordering = ('-total_time',)
+
+    fieldsets = (
+        (None, {
+            'fields': ('expression', 'input_size', 'total_time', 'created_at')
+        }),
+        ('Stage timings', {
+            'fields': ('unary_time', 'format_time', 'validation_time', 'canonical_time', 'eval_time', 'db_time'),
+        }),
+        ('Profile', {
+            'fields': ('profile',),
+            'classes': ('collapse',),
+        }),
     )
+
+    @admin.display(description='Expression')
+    def expression_preview(self, obj):
+        return obj.expression[:80]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,183 @@
+"""
+Cost-weighted admission control for expression evaluation.
+
+Every client owns a token bucket of ADMISSION_CAPACITY tokens refilled at
+ADMISSION_REFILL_RATE tokens per second. A token is worth one millisecond of
+evaluation CPU time: after each evaluation the client is charged its measured
+CPU time plus a size-based cost, so the bucket can go into debt. Requests are
+only admitted while the balance is positive, and rejected ones get 429 with a
+Retry-After header telling when the debt will be paid back.
+
+Each client's bucket and usage counters are a single small record of the
+``admission`` cache, and requests read no other. The cache is in-process memory
+by default, so every worker admits a client on its own; a shared backend such
+as Redis makes workers and hosts share buckets, and lets ``admission_usage``
+read them. Updates are read-modify-write without locking; concurrent charges
+from one client may occasionally be lost, which only makes the throttle
+slightly more lenient.
+
+Clients are listed in the AdmissionClient table for the usage export, which is
+only written when a bucket is created and then every ADMISSION_LIST_INTERVAL
+seconds.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .models import AdmissionClient
+
+
+def get_cache():
+    return caches[settings.ADMISSION_CACHE]
+
+
+def bucket_key(client: str) -> str:
+    return f'admission:bucket:{client}'
+
+
+def evaluation_cost(expression: str, cpu_time: float, size: int = None) -> float:
+    """
+    Compute the number of tokens an evaluation costs.
+
+    Args:
+        expression (str): The evaluated expression.
+        cpu_time (float): CPU seconds spent evaluating it.
+        size (int): Size of the expression, when ``expression`` is only a prefix of it.
+
+    Returns: float: The cost in tokens.
+    """
+    return (
+        settings.ADMISSION_BASE_COST
+        + cpu_time * 1000
+        + (len(expression) if size is None else size) / 1024 * settings.ADMISSION_COST_PER_KB
+    )
+
+
+def refill(bucket: dict, now: float) -> dict:
+    """
+    Add the tokens a bucket earned since its last update, up to ADMISSION_CAPACITY.
+
+    Args:
+        bucket (dict): The stored bucket.
+        now (float): Current UNIX time.
+
+    Returns: dict: The refilled bucket.
+    """
+    elapsed = max(0.0, now - bucket['updated'])
+    bucket['tokens'] = min(settings.ADMISSION_CAPACITY, bucket['tokens'] + elapsed * settings.ADMISSION_REFILL_RATE)
+    bucket['updated'] = now
+    return bucket
+
+
+def get_bucket(client: str) -> dict:
+    """
+    Load a client's bucket and refill it up to now.
+
+    Args: client (str): The client identifier.
+
+    Returns: dict: The bucket with its refilled ``tokens`` and usage counters.
+    """
+    now = time.time()
+    bucket = get_cache().get(bucket_key(client)) or {
+        'tokens': settings.ADMISSION_CAPACITY, 'updated': now, 'listed': 0.0,
+        'charged': 0.0, 'cpu_time': 0.0, 'requests': 0, 'rejected': 0,
+    }
+    return refill(bucket, now)
+
+
+def save_bucket(client: str, bucket: dict) -> None:
+    """
+    Store a client's bucket, listing the client for usage export if it is new or was listed long ago.
+
+    Args:
+        client (str): The client identifier.
+        bucket (dict): The bucket to store.
+    """
+    if bucket['updated'] - bucket['listed'] >= settings.ADMISSION_LIST_INTERVAL:
+        AdmissionClient.objects.bulk_create(
+            [AdmissionClient(client=client, seen_at=datetime.fromtimestamp(bucket['updated'], timezone.utc))],
+            update_conflicts=True, unique_fields=['client'], update_fields=['seen_at'],
+        )
+        bucket['listed'] = bucket['updated']
+    get_cache().set(bucket_key(client), bucket, settings.ADMISSION_BUCKET_TTL)
+
+
+def charge(client: str, expression: str, cpu_time: float, size: int = None) -> dict:
+    """
+    Charge a client for one evaluation.
+
+    Args:
+        client (str): The client identifier.
+        expression (str): The evaluated expression.
+        cpu_time (float): CPU seconds spent evaluating it.
+        size (int): Size of the expression, when ``expression`` is only a prefix of it.
+
+    Returns: dict: The updated bucket.
+    """
+    bucket = get_bucket(client)
+    cost = evaluation_cost(expression, cpu_time, size)
+    bucket['tokens'] -= cost
+    bucket['charged'] += cost
+    bucket['cpu_time'] += cpu_time
+    bucket['requests'] += 1
+    save_bucket(client, bucket)
+    return bucket
+
+
+def get_usage() -> dict:
+    """
+    Collect the usage of the listed clients whose bucket is still in the cache.
+
+    Clients not seen for longer than their bucket can live are dropped from the list.
+
+    Returns: dict: Bucket state and usage counters keyed by client identifier.
+    """
+    now = time.time()
+    expired = timedelta(seconds=settings.ADMISSION_BUCKET_TTL + settings.ADMISSION_LIST_INTERVAL)
+    AdmissionClient.objects.filter(seen_at__lt=datetime.fromtimestamp(now, timezone.utc) - expired).delete()
+    clients = AdmissionClient.objects.values_list('client', flat=True)
+    buckets = get_cache().get_many([bucket_key(client) for client in clients])
+    return {
+        client: refill(buckets[bucket_key(client)], now) for client in clients if bucket_key(client) in buckets
+    }
+
+
+class EvaluationCostThrottle(BaseThrottle):
+    """
+    Throttle admitting a client's request only while its cost bucket has a positive balance.
+
+    Views using it must call ``charge_request`` once the evaluation cost is known.
+    """
+
+    def allow_request(self, request, view):
+        if not settings.ADMISSION_CONTROL:
+            return True
+
+        client = self.get_ident(request)
+        bucket = get_bucket(client)
+        if bucket['tokens'] > 0:
+            return True
+
+        bucket['rejected'] += 1
+        save_bucket(client, bucket)
+        self.retry_after = -bucket['tokens'] / settings.ADMISSION_REFILL_RATE
+        return False
+
+    def wait(self):
+        return self.retry_after
+
+    def charge_request(self, request, expression: str, cpu_time: float, size: int = None) -> None:
+        """
+        Charge the client behind a request for one evaluation.
+
+        Args:
+            request: Django Rest Framework request object.
+            expression (str): The evaluated expression.
+            cpu_time (float): CPU seconds spent evaluating it.
+            size (int): Size of the expression, when ``expression`` is only a prefix of it.
+        """
+        if settings.ADMISSION_CONTROL:
+            charge(self.get_ident(request), expression, cpu_time, size)
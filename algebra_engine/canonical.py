@@ -0,0 +1,216 @@
+"""
+Canonical form of expressions, to recognize equivalent ones.
+
+Expressions differing only in spacing, redundant parentheses, operand order of
+``+`` and ``*`` or ``len('...')`` literals are rewritten to the same text, and
+its SHA-256 ``canonical_hash`` keys the result cache and is stored in the history
+for deduplication.
+
+Every rewrite keeps the value and its type, so equal canonical forms always
+evaluate to the same result:
+
+- operands of a single ``+`` or ``*`` are swapped into order, which is exact for
+  floats too since both are commutative;
+- whole chains of ``+``, ``-`` and ``*`` are only flattened and reordered when
+  every operand is an integer, since float arithmetic is not associative;
+- ``+x`` and ``--x`` become ``x``, and ``len('...')`` its value.
+"""
+import ast
+import hashlib
+from typing import Optional
+
+from django.conf import settings
+
+# Binding strength of the printed operators, from loosest to tightest.
+SUM, PRODUCT, UNARY, POWER, ATOM = range(1, 6)
+
+OPERATORS = {
+    ast.Add: ('+', SUM), ast.Sub: ('-', SUM),
+    ast.Mult: ('*', PRODUCT), ast.Div: ('/', PRODUCT), ast.FloorDiv: ('//', PRODUCT),
+    ast.Pow: ('**', POWER),
+}
+
+
+class Term:
+    """
+    Canonical text of a subexpression.
+
+    ``exact`` tells that its value is an integer. Chains of integer sums and products
+    keep their signed ``terms`` or ``factors`` instead, and are only sorted and printed
+    when their text is needed, so that long chains are flattened in linear time.
+    Negations keep their ``operand``, for their sign to be moved out of chains.
+    """
+
+    def __init__(
+        self, text: str = None, precedence: int = ATOM, exact: bool = False, terms=None, factors=None, operand=None
+    ):
+        self._text = text
+        self.precedence = precedence
+        self.exact = exact
+        self.terms = terms
+        self.factors = factors
+        self.operand = operand
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            if self.terms is not None:
+                self._text = self.render_sum()
+            else:
+                self._text = self.render_product()
+        return self._text
+
+    def render_sum(self) -> str:
+        terms = sorted(self.terms, key=lambda item: (item[0], item[1].text))
+        negative, first = terms[0]
+        parts = [negate(first) if negative else first.text]
+        for negative, term in terms[1:]:
+            parts.append(f"{'-' if negative else '+'} {term.text}")
+        return ' '.join(parts)
+
+    def render_product(self) -> str:
+        first, *others = sorted(self.factors, key=lambda factor: factor.text)
+        # Factors after the first are right operands: a * (b // c) is not a * b // c.
+        others = [wrap(factor, factor.precedence <= PRODUCT) for factor in others]
+        return ' * '.join([wrap(first, first.precedence < PRODUCT), *others])
+
+    def negated(self) -> 'Term':
+        if self.operand is not None:
+            return self.operand
+        if self.terms is not None:
+            return Term(precedence=SUM, exact=True, terms=[(not negative, term) for negative, term in self.terms])
+        return Term(negate(self), UNARY, self.exact, operand=self)
+
+    def signed(self) -> list:
+        """
+        Signed operands of the term as a sum: its own terms, or itself without its sign.
+
+        Returns: list: Pairs of whether the operand is subtracted, and the operand.
+        """
+        if self.terms is not None:
+            return self.terms
+        if self.operand is not None:
+            return [(True, self.operand)]
+        return [(False, self)]
+
+
+def wrap(term: Term, parenthesize: bool) -> str:
+    return f'({term.text})' if parenthesize else term.text
+
+
+def negate(term: Term) -> str:
+    # Unary minus binds tighter than '*' and '//', and -a // b is not -(a // b).
+    return '-' + wrap(term, term.precedence < UNARY)
+
+
+class Canonicalizer:
+    """
+    Rewrites the AST of an expression to its canonical text.
+    """
+
+    def visit(self, node: ast.AST) -> Term:
+        """
+        Canonicalize a subexpression.
+
+        Args: node (ast.AST): Node of the parsed expression.
+
+        Returns: Term: Its canonical text.
+
+        Raises: ValueError: If the node is not part of the expression language.
+        """
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            if type(node.value) is int:
+                return Term(str(node.value), exact=True)
+            return Term(repr(node.value))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            return self.visit_unary(node)
+        if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+            return self.visit_binary(node)
+        if (
+            isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ('len', 'abs')
+            and len(node.args) == 1 and not node.keywords
+        ):
+            return self.visit_call(node.func.id, node.args[0])
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+    def visit_unary(self, node: ast.UnaryOp) -> Term:
+        negative = False
+        while isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            negative ^= isinstance(node.op, ast.USub)
+            node = node.operand
+        operand = self.visit(node)
+        return operand.negated() if negative else operand
+
+    def visit_call(self, name: str, argument: ast.AST) -> Term:
+        if name == 'len':
+            if not isinstance(argument, ast.Constant) or type(argument.value) is not str:
+                raise ValueError("len() only takes string literals")
+            # Same value as ExpressionEvaluator.handle_len_operator.
+            return Term(str(len(argument.value.strip())), exact=True)
+        argument = self.visit(argument)
+        return Term(f'abs({argument.text})', exact=argument.exact)
+
+    def visit_binary(self, node: ast.BinOp) -> Term:
+        symbol, precedence = OPERATORS[type(node.op)]
+        left, right = self.visit(node.left), self.visit(node.right)
+        exact = left.exact and right.exact and not isinstance(node.op, ast.Div)
+
+        if isinstance(node.op, ast.Pow):
+            # A negative or non-literal exponent may turn integers into floats.
+            exact = left.exact and isinstance(node.right, ast.Constant) and type(node.right.value) is int
+            text = f'{wrap(left, left.precedence <= POWER)} ** {wrap(right, right.precedence < UNARY)}'
+            return Term(text, POWER, exact)
+        if exact and isinstance(node.op, (ast.Add, ast.Sub)):
+            # The left operand is discarded, so its list can be extended in place.
+            terms = left.signed()
+            subtract = isinstance(node.op, ast.Sub)
+            terms.extend((negative != subtract, term) for negative, term in right.signed())
+            return Term(precedence=SUM, exact=True, terms=terms)
+        if exact and isinstance(node.op, ast.Mult):
+            # Integer products are signed like their factors: -a * b == a * -b == -(a * b).
+            negative = (left.operand is not None) != (right.operand is not None)
+            left, right = left.operand or left, right.operand or right
+            factors = left.factors if left.factors is not None else [left]
+            factors.extend(right.factors or [right])
+            product = Term(precedence=PRODUCT, exact=True, factors=factors)
+            return product.negated() if negative else product
+        if isinstance(node.op, (ast.Add, ast.Mult)) and right.text < left.text:
+            left, right = right, left
+        text = f'{wrap(left, left.precedence < precedence)} {symbol} {wrap(right, right.precedence <= precedence)}'
+        return Term(text, precedence, exact)
+
+
+def canonicalize(expression: str) -> str:
+    """
+    Rewrite an expression to its canonical form.
+
+    Args: expression (str): The expression, as submitted or after ExpressionEvaluator's formatting.
+
+    Returns: str: The canonical form, with single spaces around binary operators.
+
+    Raises: ValueError: If the expression cannot be parsed or uses unsupported syntax.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except (SyntaxError, ValueError) as e:
+        raise ValueError(f"Invalid expression: {e}")
+    return Canonicalizer().visit(tree.body).text
+
+
+def canonical_hash(expression: str) -> Optional[str]:
+    """
+    Compute the key shared by the expressions equivalent to this one.
+
+    Expressions longer than CANONICAL_MAX_LENGTH are not canonicalized, since they
+    seldom repeat and parsing them again is not free.
+
+    Args: expression (str): The expression.
+
+    Returns: Optional[str]: Hex SHA-256 digest of the canonical form, None if it has none.
+    """
+    if len(expression) > settings.CANONICAL_MAX_LENGTH:
+        return None
+    try:
+        return hashlib.sha256(canonicalize(expression).encode()).hexdigest()
+    except (ValueError, RecursionError, MemoryError):
+        return None
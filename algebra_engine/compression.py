@@ -0,0 +1,70 @@
+"""
+Optional compressed storage of large expressions and results.
+
+With HISTORY_COMPRESSION set to 'zlib' or 'zstd', an expression or result of at
+least HISTORY_COMPRESSION_MIN_SIZE bytes is stored compressed in a binary column
+(``expression_data``, ``result_data``), while the text column only keeps its
+first HISTORY_PREVIEW_LENGTH characters as a preview. Compressed expressions also
+get their SHA-256 ``expression_hash`` and ``input_size``. Full values are only
+decompressed when read through ExpressionHistory.full_expression/full_result.
+zstd requires the optional ``zstandard`` package.
+"""
+import zlib
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: str) -> tuple:
+    """
+    Return the compression and decompression functions of a codec.
+
+    Args: name (str): 'zlib' or 'zstd'.
+
+    Returns: tuple: The compress and decompress functions, taking and returning bytes.
+
+    Raises: ImproperlyConfigured: If the codec is unknown or its package is not installed.
+    """
+    if name == 'zlib':
+        return lambda data: zlib.compress(data, settings.HISTORY_COMPRESSION_LEVEL), zlib.decompress
+    if name == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImproperlyConfigured("HISTORY_COMPRESSION='zstd' requires the zstandard package.")
+        compressor = zstandard.ZstdCompressor(level=settings.HISTORY_COMPRESSION_LEVEL)
+        decompressor = zstandard.ZstdDecompressor()
+        return compressor.compress, lambda data: decompressor.decompress(bytes(data))
+    raise ImproperlyConfigured(f"Unknown HISTORY_COMPRESSION codec '{name}'.")
+
+
+def decompress(data, codec: str) -> str:
+    return get_codec(codec)[1](data).decode()
+
+
+def history_fields(**values) -> dict:
+    """
+    Compute the ExpressionHistory fields storing an expression and/or result.
+
+    Args: **values: ``expression`` and/or ``result`` to store; None values are stored as is.
+
+    Returns: dict: Field values, with previews and compressed data for large values.
+    """
+    codec = settings.HISTORY_COMPRESSION
+    fields = dict(values)
+    for name, value in values.items():
+        if not codec or value is None or len(value) < settings.HISTORY_COMPRESSION_MIN_SIZE:
+            continue
+        encoded = value.encode()
+        if len(encoded) < settings.HISTORY_COMPRESSION_MIN_SIZE:
+            continue
+        fields[name] = value[:settings.HISTORY_PREVIEW_LENGTH]
+        fields[f'{name}_data'] = get_codec(codec)[0](encoded)
+        fields['compression'] = codec
+        if name == 'expression':
+            fields['expression_hash'] = hashlib.sha256(encoded).hexdigest()
+            fields['input_size'] = len(encoded)
+    return fields
@@ -0,0 +1,40 @@
+"""
+Synthetic expression traffic, shared by the bench_canonical command and the tests.
+"""
+import random
+
+
+class Corpus:
+    """
+    Synthetic traffic: a Zipf-distributed set of expressions, each request written
+    the way people type them, with their own spacing, parentheses, operand order and
+    ``len('...')`` literals.
+    """
+
+    def __init__(self, distinct: int, seed: int):
+        self.random = random.Random(seed)
+        self.expressions = [self.tree(self.random.randint(1, 4)) for _ in range(distinct)]
+        self.weights = [1 / rank ** 1.1 for rank in range(1, distinct + 1)]
+
+    def tree(self, depth: int):
+        if depth == 0 or self.random.random() < 0.2:
+            return self.random.choice([str(self.random.randint(1, 99)), f'{self.random.randint(1, 99)}.5'])
+        operator = self.random.choice(['+', '+', '*', '*', '-', '/', '//', '**'])
+        right = str(self.random.randint(0, 3)) if operator == '**' else self.tree(depth - 1)
+        return operator, self.tree(depth - 1), right
+
+    def write(self, node, top: bool = True) -> str:
+        if isinstance(node, str):
+            if node.isdigit() and int(node) < 8 and self.random.random() < 0.2:
+                return f"len('{'x' * int(node)}')"
+            return node
+        operator, left, right = node
+        if operator in ('+', '*') and self.random.random() < 0.5:
+            left, right = right, left
+        space = self.random.choice(['', ' '])
+        text = f'{self.write(left, False)}{space}{operator}{space}{self.write(right, False)}'
+        # Operands are always parenthesized, and sometimes the whole expression too.
+        return f'({text})' if not top or self.random.random() < 0.1 else text
+
+    def requests(self, count: int) -> list:
+        return [self.write(node) for node in self.random.choices(self.expressions, self.weights, k=count)]
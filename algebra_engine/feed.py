@@ -0,0 +1,186 @@
+"""
+In-memory feed of the most recent evaluations.
+
+Dashboards refresh the latest history over and over; instead of querying
+ExpressionHistory each time, every server process keeps the last RECENT_FEED_SIZE
+evaluations in a ring buffer, filled by the views as they write the history and
+seeded once from the database. Clients read what is newer than their ``since``
+cursor and can long-poll until something new arrives.
+
+The buffer only sees the evaluations written by its own process (and the rows
+already stored when it was seeded), while cursors are history ids shared by all
+processes. Reads are served from the database instead when the buffer may be
+missing records after the cursor: when the cursor fell behind the buffer or is
+ahead of it, when the ids after it are not consecutive (records written by other
+processes, or jobs still pending), and when a long poll ran out without news.
+Reads without a cursor likewise need the latest records of the buffer to be
+consecutive.
+
+Jobs are published by the process evaluating them, under the id they were given
+when submitted; readers whose cursor passed that id while the job was pending
+have to poll the job itself.
+"""
+import logging
+import threading
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+
+from .models import ExpressionHistory
+from .encoders import RowEncoder
+from .serializers import ExpressionHistorySerializer
+from .stats import record_evaluation
+
+logger = logging.getLogger(__name__)
+
+
+class RecentFeed:
+    """
+    Thread-safe ring buffer of encoded history records, ordered by id.
+    """
+    row_encoder = RowEncoder(ExpressionHistorySerializer)
+
+    def __init__(self, size: int):
+        """
+        Initialize an empty feed.
+
+        Args: size (int): Number of records kept.
+        """
+        self.entries = deque(maxlen=size)
+        self.latest = 0
+        # Id of the newest record that may be missing from the buffer.
+        self.horizon = 0
+        self.seeded = False
+        self.condition = threading.Condition()
+
+    def encode(self, record: ExpressionHistory) -> dict:
+        return self.row_encoder.encode(tuple(getattr(record, field) for field in self.row_encoder.fields))
+
+    def seed(self) -> None:
+        """
+        Fill the buffer with the latest evaluated records from the database, once per process.
+        """
+        with self.condition:
+            if self.seeded:
+                return
+            rows = (
+                ExpressionHistory.objects
+                .exclude(status=ExpressionHistory.Status.PENDING)
+                .order_by('-id')
+                .values_list(*self.row_encoder.fields)[:self.entries.maxlen]
+            )
+            stored = self.row_encoder.encode_rows(rows)
+            if len(stored) == self.entries.maxlen:
+                self.horizon = stored[-1]['id'] - 1
+            entries = {entry['id']: entry for entry in stored}
+            entries.update((entry['id'], entry) for entry in self.entries)
+            self.entries.clear()
+            self.entries.extend(entries[pk] for pk in sorted(entries)[-self.entries.maxlen:])
+            if entries:
+                self.latest = max(self.latest, max(entries))
+            self.seeded = True
+
+    def publish(self, *records: ExpressionHistory) -> None:
+        """
+        Add just written records to the feed and wake up the long-polling clients.
+
+        Args: records (ExpressionHistory): Saved records; those without an id (bulk inserts on
+            backends that do not return them) are skipped.
+        """
+        entries = [self.encode(record) for record in records if record.pk is not None]
+        if not entries:
+            return
+        with self.condition:
+            for entry in entries:
+                if len(self.entries) == self.entries.maxlen:
+                    self.horizon = max(self.horizon, self.entries[0]['id'])
+                self.entries.append(entry)
+                if entry['id'] < self.latest:
+                    # Concurrent requests may publish out of order; keep the buffer sorted.
+                    ordered = sorted(self.entries, key=lambda item: item['id'])
+                    self.entries.clear()
+                    self.entries.extend(ordered)
+                self.latest = max(self.latest, entry['id'])
+            self.condition.notify_all()
+
+    def read(self, since: int = None, limit: int = None, wait: float = 0) -> tuple:
+        """
+        Return the records newer than a cursor, waiting for one if there is none yet.
+
+        Args:
+            since (int): Id of the last record the client has, None for the latest records.
+            limit (int): Maximum number of records returned, the oldest first when reading a cursor.
+            wait (float): Seconds to wait for a new record when there is none after ``since``.
+
+        Returns: tuple: The records, oldest first, and the cursor to read the next ones from.
+        """
+        self.seed()
+        limit = limit or self.entries.maxlen
+        with self.condition:
+            if since is None:
+                entries = list(self.entries)[-limit:]
+                if entries and self.horizon < entries[0]['id'] and consecutive(entries[0]['id'] - 1, entries):
+                    return entries, entries[-1]['id']
+            elif not wait or self.condition.wait_for(lambda: self.latest > since, wait):
+                entries = [entry for entry in self.entries if entry['id'] > since][:limit]
+                if self.horizon <= since <= self.latest and consecutive(since, entries):
+                    return entries, entries[-1]['id'] if entries else since
+        # Records after the cursor, or among the latest ones, may be missing from the buffer.
+        evaluated = ExpressionHistory.objects.exclude(status=ExpressionHistory.Status.PENDING)
+        if since is None:
+            rows = evaluated.order_by('-id').values_list(*self.row_encoder.fields)[:limit]
+            entries = self.row_encoder.encode_rows(rows)[::-1]
+            return entries, entries[-1]['id'] if entries else 0
+        rows = evaluated.filter(id__gt=since).order_by('id').values_list(*self.row_encoder.fields)[:limit]
+        entries = self.row_encoder.encode_rows(rows)
+        return entries, entries[-1]['id'] if entries else since
+
+    def clear(self) -> None:
+        with self.condition:
+            self.entries.clear()
+            self.latest = self.horizon = 0
+            self.seeded = False
+
+
+def consecutive(since: int, entries: list) -> bool:
+    """
+    Tell whether records follow a cursor without gaps in their ids.
+
+    Args:
+        since (int): The cursor.
+        entries (list): Encoded records after the cursor, ordered by id.
+
+    Returns: bool: True if the ids are ``since + 1``, ``since + 2``, and so on.
+    """
+    return all(entry['id'] == since + offset for offset, entry in enumerate(entries, 1))
+
+
+@lru_cache(maxsize=None)
+def get_recent_feed() -> RecentFeed:
+    """
+    Return the process-wide feed of recent evaluations.
+
+    Returns: RecentFeed: The shared feed.
+    """
+    return RecentFeed(settings.RECENT_FEED_SIZE)
+
+
+def publish_evaluations(*records: ExpressionHistory) -> None:
+    """
+    Add just stored evaluations to the recent feed and the statistics rollups.
+
+    Both are derived from the history, so their failures are logged instead of
+    failing the request or job whose evaluation is already stored.
+
+    Args: records (ExpressionHistory): The stored records.
+    """
+    try:
+        get_recent_feed().publish(*records)
+    except Exception:
+        logger.warning("Publishing evaluations to the recent feed failed.", exc_info=True)
+    try:
+        for record in records:
+            record_evaluation(record.expression, record.status, record.evaluated_at, record.expression_hash)
+    except Exception:
+        logger.warning("Recording evaluation statistics failed.", exc_info=True)
@@ -0,0 +1,95 @@
+"""
+Idempotency keys for expression evaluation.
+
+The first request carrying a given ``Idempotency-Key`` claims it by inserting an
+in-flight IdempotencyRecord; the unique constraint on (client, key) makes the
+claim atomic across workers. Its response is then stored on the record for
+IDEMPOTENCY_TTL seconds. Duplicates poll the record until that response is
+available and replay it, so retries neither evaluate again nor add history rows.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.db import IntegrityError, transaction
+
+from algebra_engine.models import IdempotencyRecord
+
+
+def claim(client: str, key: str, request_hash: str) -> tuple:
+    """
+    Claim an idempotency key for a request, unless another request holds it.
+
+    Expired records are purged first, and a record left in flight for longer than
+    IDEMPOTENCY_LOCK_TIMEOUT (e.g. by a crashed worker) is taken over.
+
+    Args:
+        client (str): The client identifier.
+        key (str): The Idempotency-Key header.
+        request_hash (str): Hash of the request payload.
+
+    Returns: tuple: The record and whether this request claimed it.
+    """
+    now = timezone.now()
+    IdempotencyRecord.objects.filter(expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            record = IdempotencyRecord.objects.create(
+                client=client, key=key, request_hash=request_hash,
+                created_at=now, expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL),
+            )
+        return record, True
+    except IntegrityError:
+        record = IdempotencyRecord.objects.get(client=client, key=key)
+
+    abandoned = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+    if record.status_code is None and record.created_at < abandoned and record.request_hash == request_hash:
+        taken_over = IdempotencyRecord.objects.filter(
+            pk=record.pk, status_code__isnull=True, created_at=record.created_at
+        ).update(created_at=now)
+        if taken_over:
+            record.created_at = now
+            return record, True
+    return record, False
+
+
+def wait_for_response(record: IdempotencyRecord) -> IdempotencyRecord:
+    """
+    Wait for the request holding a key to store its response.
+
+    Args: record (IdempotencyRecord): The claimed record.
+
+    Returns: IdempotencyRecord: The record, still without response if IDEMPOTENCY_WAIT_TIMEOUT ran out.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while record.status_code is None and time.monotonic() < deadline:
+        time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+        try:
+            record.refresh_from_db(fields=['status_code', 'response'])
+        except IdempotencyRecord.DoesNotExist:
+            # Released after a failure; the duplicate gets no stored response to replay.
+            break
+    return record
+
+
+def complete(record: IdempotencyRecord, status_code: int, response: dict) -> None:
+    """
+    Store the response of the request holding a key.
+
+    Args:
+        record (IdempotencyRecord): The claimed record.
+        status_code (int): Status code of the response.
+        response (dict): Data of the response.
+    """
+    record.status_code, record.response = status_code, response
+    record.save(update_fields=['status_code', 'response'])
+
+
+def release(record: IdempotencyRecord) -> None:
+    """
+    Give up a claimed key without response, so that a retry evaluates again.
+
+    Args: record (IdempotencyRecord): The claimed record.
+    """
+    IdempotencyRecord.objects.filter(pk=record.pk, status_code__isnull=True).delete()
@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ExpressionHistory
+from .admission import charge
+from .compression import history_fields
+from .parser import ExpressionEvaluator
+from .profiler import sample_slow_evaluation
+from .feed import publish_evaluations
+from .stats import flush_stats
+
+
+def evaluate_record(record: ExpressionHistory) -> ExpressionHistory:
+    """
+    Evaluate a pending expression record and store the outcome.
+
+    On failure the error message is kept in ``error``, like ExpressionInput stores it,
+    so that clients polling the job can see why it failed.
+
+    The client that queued the record is charged for the evaluation, like
+    ExpressionInput charges its clients.
+
+    Args: record (ExpressionHistory): The pending record to evaluate.
+
+    Returns: ExpressionHistory: The updated record.
+    """
+    expression = record.full_expression
+    evaluator = ExpressionEvaluator(expression)
+    started = time.thread_time()
+    try:
+        result, record.error = evaluator.evaluate(), None
+        record.status = ExpressionHistory.Status.SUCCESS
+    except Exception as e:
+        result, record.error = None, str(e)
+        record.status = ExpressionHistory.Status.FAILED
+    cpu_time = time.thread_time() - started
+    fields = history_fields(result=result)
+    for name, value in fields.items():
+        setattr(record, name, value)
+    record.canonical_hash = evaluator.canonical_hash
+    record.evaluated_at = timezone.now()
+    with evaluator.timed('db'):
+        record.save(update_fields=[*fields, 'error', 'status', 'canonical_hash', 'evaluated_at'])
+    publish_evaluations(record)
+    if settings.ADMISSION_CONTROL and record.client is not None:
+        charge(record.client, expression, cpu_time)
+    sample_slow_evaluation(evaluator)
+    return record
+
+
+def process_next_job() -> bool:
+    """
+    Claim the oldest pending record and evaluate it.
+
+    The database is the queue: the row is locked with ``SELECT ... FOR UPDATE SKIP LOCKED``
+    so concurrent workers never pick the same record and never wait on each other.
+
+    Returns: bool: True if a record was processed, False if the queue was empty.
+    """
+    with transaction.atomic():
+        record = (
+            ExpressionHistory.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=ExpressionHistory.Status.PENDING)
+            .order_by('id')
+            .first()
+        )
+        if record is None:
+            return False
+        evaluate_record(record)
+    return True
+
+
+def run_worker(poll_interval: float, drain: bool = False) -> int:
+    """
+    Process pending records until stopped.
+
+    Args:
+        poll_interval (float): Seconds to sleep when the queue is empty.
+        drain (bool): Return as soon as the queue is empty instead of polling forever.
+
+    Returns: int: Number of records processed.
+    """
+    processed = 0
+    while True:
+        if process_next_job():
+            processed += 1
+        else:
+            # Outcomes batched for the statistics are written as soon as the queue is idle.
+            flush_stats()
+            if drain:
+                return processed
+            time.sleep(poll_interval)
@@ -0,0 +1,27 @@
+from django.urls import path
+
+from algebra_engine.views import (
+    LeanExpressionHistoryList, LeanRecentExpressions, LeanExpressionHistoryDetail, LeanExpressionInput,
+    LeanExpressionUpload, LeanExpressionJobInput, LeanExpressionJobDetail, LeanExpressionStats,
+    LeanPreparedExpressionInput, LeanPreparedExpressionEvaluate,
+)
+
+app_name = 'algebra_engine'
+
+
+urlpatterns = [
+    path('expressions/', LeanExpressionHistoryList.as_view(), name='expression-history'),
+    path('expressions/recent/', LeanRecentExpressions.as_view(), name='expression-recent'),
+    path('expressions/<int:pk>/', LeanExpressionHistoryDetail.as_view(), name='expression-history-detail'),
+    path('expression-input/', LeanExpressionInput.as_view(), name='expression-input'),
+    path('expression-upload/', LeanExpressionUpload.as_view(), name='expression-upload'),
+    path('expression-jobs/', LeanExpressionJobInput.as_view(), name='expression-job-input'),
+    path('expression-jobs/<int:pk>/', LeanExpressionJobDetail.as_view(), name='expression-job-detail'),
+    path('stats/', LeanExpressionStats.as_view(), name='expression-stats'),
+    path('prepared-expressions/', LeanPreparedExpressionInput.as_view(), name='prepared-expression-input'),
+    path(
+        'prepared-expressions/<int:pk>/evaluate/', LeanPreparedExpressionEvaluate.as_view(),
+        name='prepared-expression-evaluate',
+    ),
+
+]
@@ -0,0 +1,282 @@
+"""
+End-to-end load harness for the expression endpoints.
+
+The application is served by a threaded WSGI server in a separate process, so
+that the load generator does not compete with it for the GIL, against a
+throwaway test database. Each response carries the number of DB queries it
+ran in an ``X-DB-Queries`` header. Traffic is a weighted mix of scenarios
+built from the expressions in constance.py and, optionally, requests
+replayed from a JSONL file.
+"""
+import json
+import logging
+import time
+import random
+import itertools
+import socket
+import statistics
+import http.client
+import multiprocessing
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connection, connections
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+
+from algebra_engine.constance import SyntaxValidatorConstants
+
+QUERY_COUNT_HEADER = 'X-DB-Queries'
+PERCENTILES = (50, 95, 99)
+# Relative change below which a metric is reported as unchanged against the baseline.
+DIFF_TOLERANCE = 0.05
+HIGHER_IS_BETTER = {'throughput'}
+
+
+class QueryCountingApplication:
+    """
+    WSGI application wrapper adding the number of DB queries of each request to its response headers.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    def __call__(self, environ, start_response):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        def counting_start_response(status, headers, exc_info=None):
+            return start_response(status, headers + [(QUERY_COUNT_HEADER, str(queries))], exc_info)
+
+        with ExitStack() as stack:
+            for db in connections.all():
+                stack.enter_context(db.execute_wrapper(count))
+            return self.application(environ, counting_start_response)
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, database_name: str, overrides: dict) -> None:
+    """
+    Serve the project's WSGI application on localhost; runs in the server process.
+
+    Args:
+        port (int): Port to listen on.
+        database_name (str): Name of the database to serve from.
+        overrides (dict): Settings to override in the server process.
+    """
+    django.setup()
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    connection.settings_dict['NAME'] = database_name
+    application = QueryCountingApplication(get_internal_wsgi_application())
+    # Expected 4xx responses would otherwise be logged for every invalid expression. Loading the
+    # WSGI application configures logging again, which resets the level if it was set before.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+    server = ThreadedWSGIServer(('127.0.0.1', port), QuietWSGIRequestHandler)
+    server.set_app(application)
+    server.serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_name: str, overrides: dict, timeout: float = 30) -> tuple:
+    """
+    Start the server process and wait until it accepts connections.
+
+    Args:
+        database_name (str): Name of the database to serve from.
+        overrides (dict): Settings to override in the server process.
+        timeout (float): Seconds to wait for the server.
+
+    Returns: tuple: The server process and its port.
+
+    Raises: RuntimeError: If the server does not start in time.
+    """
+    port = free_port()
+    process = multiprocessing.get_context('spawn').Process(
+        target=serve, args=(port, database_name, overrides), daemon=True
+    )
+    process.start()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.is_alive():
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The load test server did not start.")
+
+
+def evaluation_request(expression: str) -> tuple:
+    return 'POST', '/api/expression-input/', {'expression': expression}
+
+
+def build_scenarios(traffic: list = None) -> dict:
+    """
+    Build the request generators of each scenario.
+
+    Args: traffic (list): Recorded requests with method, path and optional body, replayed in order.
+
+    Returns: dict: Functions returning a (method, path, body) request, by scenario name.
+    """
+    invalid = [
+        expression
+        for name, expressions in vars(SyntaxValidatorConstants).items()
+        if name.isupper() and name != 'VALID_EXPRESSIONS'
+        for expression in expressions
+    ]
+    scenarios = {
+        'valid': lambda: evaluation_request(random.choice(SyntaxValidatorConstants.VALID_EXPRESSIONS)),
+        'invalid': lambda: evaluation_request(random.choice(invalid)),
+        'history': lambda: ('GET', '/api/expressions/', None),
+    }
+    if traffic:
+        replay = itertools.cycle(traffic)
+        scenarios['replay'] = lambda: next(replay)
+    return scenarios
+
+
+def load_traffic(path: str) -> list:
+    """
+    Read recorded requests from a JSONL file, skipping lines that are not requests.
+
+    Args: path (str): Path of the file, one {"method", "path", "body"} object per line.
+
+    Returns: list: (method, path, body) requests.
+    """
+    traffic = []
+    with open(path) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 'path' in record:
+                traffic.append((record.get('method', 'GET').upper(), record['path'], record.get('body')))
+    return traffic
+
+
+def send(port: int, method: str, path: str, body) -> tuple:
+    """
+    Send one request to the server.
+
+    Returns: tuple: The status (0 on connection failure), latency in seconds and number of DB queries.
+    """
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {'Content-Type': 'application/json', 'Accept': 'application/json'} if payload else {}
+    started = time.perf_counter()
+    client = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        client.request(method, path, payload, headers)
+        response = client.getresponse()
+        response.read()
+        status, queries = response.status, int(response.getheader(QUERY_COUNT_HEADER, 0))
+    except OSError:
+        status, queries = 0, 0
+    finally:
+        client.close()
+    return status, time.perf_counter() - started, queries
+
+
+def run_load(port: int, scenarios: dict, mix: dict, requests: int, concurrency: int) -> dict:
+    """
+    Replay a weighted traffic mix against the server.
+
+    Args:
+        port (int): Port of the server.
+        scenarios (dict): Request generators by scenario name.
+        mix (dict): Weight of each scenario.
+        requests (int): Total number of requests.
+        concurrency (int): Number of concurrent clients.
+
+    Returns: dict: Results of the run, see summarize.
+    """
+    names = random.choices(list(mix), weights=list(mix.values()), k=requests)
+    planned = [(name, scenarios[name]()) for name in names]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        samples = list(executor.map(lambda item: (item[0], *send(port, *item[1])), planned))
+    return summarize(samples, time.perf_counter() - started)
+
+
+def percentile(latencies: list, percent: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0.0
+    return statistics.quantiles(latencies, n=100, method='inclusive')[percent - 1]
+
+
+def summarize_samples(samples: list, elapsed: float) -> dict:
+    latencies = [latency for _, latency, _ in samples]
+    summary = {
+        'requests': len(samples),
+        'errors': sum(1 for status, _, _ in samples if not status or status >= 500),
+        'throttled': sum(1 for status, _, _ in samples if status == 429),
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+        'queries_per_request': statistics.fmean(queries for _, _, queries in samples) if samples else 0.0,
+    }
+    summary.update({f'p{percent}_ms': percentile(latencies, percent) * 1000 for percent in PERCENTILES})
+    return summary
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """
+    Summarize request samples overall and by scenario.
+
+    Args:
+        samples (list): (scenario, status, latency, queries) tuples.
+        elapsed (float): Wall time of the run in seconds.
+
+    Returns: dict: Metrics under 'total' and under each scenario name.
+    """
+    scenarios = {}
+    for name, *sample in samples:
+        scenarios.setdefault(name, []).append(sample)
+    return {
+        'total': summarize_samples([sample for _, *sample in samples], elapsed),
+        **{name: summarize_samples(scenario, elapsed) for name, scenario in sorted(scenarios.items())},
+    }
+
+
+def diff(results: dict, baseline: dict, tolerance: float = DIFF_TOLERANCE) -> list:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results (dict): Results of the run.
+        baseline (dict): Results of a previous run.
+        tolerance (float): Relative change below which a metric is considered unchanged.
+
+    Returns: list: (scenario, metric, baseline, current, relative change, verdict) for metrics present in both,
+        where verdict is 'better', 'worse' or 'same'.
+    """
+    changes = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            previous = baseline.get(name, {}).get(metric)
+            if previous is None or metric == 'requests' or previous == value == 0:
+                continue
+            change = (value - previous) / previous if previous else (0.0 if value == previous else float('inf'))
+            if abs(change) < tolerance:
+                verdict = 'same'
+            elif (change > 0) == (metric in HIGHER_IS_BETTER):
+                verdict = 'better'
+            else:
+                verdict = 'worse'
+            changes.append((name, metric, previous, value, change, verdict))
+    return changes
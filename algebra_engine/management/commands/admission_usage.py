@@ -0,0 +1,12 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from algebra_engine.admission import get_usage
+
+
+class Command(BaseCommand):
+    help = "Export per-client admission control usage as JSON."
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(get_usage(), indent=2, sort_keys=True))
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from algebra_engine.corpus import Corpus
+from algebra_engine.canonical import canonical_hash
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.result_cache import ResultCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare result cache hit rates and deduplication when expressions are keyed "
+        "by their text or by their canonical form."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000)
+        parser.add_argument('--distinct', type=int, default=5000)
+        parser.add_argument('--cache-bytes', type=int, default=256 * 1024)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--history', action='store_true',
+            help="Replay the latest successful evaluations of the history instead of synthetic traffic.",
+        )
+
+    def replay(self, requests, key):
+        cache = ResultCache(self.cache_bytes)
+        for expression in requests:
+            cache_key = key(expression)
+            if cache.get(cache_key) is None:
+                cache.put(cache_key, '0' * 20)
+        return cache.hits / len(requests)
+
+    def handle(self, *args, **options):
+        self.cache_bytes = options['cache_bytes']
+        if options['history']:
+            requests = list(
+                ExpressionHistory.objects
+                .filter(status=ExpressionHistory.Status.SUCCESS, input_size__isnull=True)
+                .order_by('id')
+                .values_list('expression', flat=True)[:options['requests']]
+            )
+        else:
+            requests = Corpus(options['distinct'], options['seed']).requests(options['requests'])
+        if not requests:
+            self.stdout.write("No expressions to replay.")
+            return
+
+        started = time.perf_counter()
+        hashes = {expression: canonical_hash(expression) for expression in requests}
+        elapsed = time.perf_counter() - started
+
+        texts, forms = len(set(requests)), len(set(hashes.values()))
+        self.stdout.write(
+            f"{len(requests)} requests, {texts} distinct texts, {forms} distinct canonical forms "
+            f"({texts / forms:.2f} texts per form), canonicalized in {elapsed / len(hashes) * 1e6:.1f} µs each"
+        )
+        for name, key in (('text', str), ('canonical', lambda expression: hashes[expression] or expression)):
+            self.stdout.write(f"Cache hit rate by {name}: {self.replay(requests, key):.1%}")
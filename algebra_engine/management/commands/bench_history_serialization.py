@@ -0,0 +1,54 @@
+import time
+import tracemalloc
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.renderers import MessagePackRenderer
+from algebra_engine.serializers import ExpressionHistorySerializer
+from algebra_engine.views import ExpressionHistoryList
+
+
+class Command(BaseCommand):
+    help = "Compare rows per second and peak memory of the history serialization paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help="Number of history rows to serialize.")
+
+    def handle(self, *args, **options):
+        encoder = ExpressionHistoryList.row_encoder
+        queryset = ExpressionHistory.objects.all()
+        paths = {
+            'ModelSerializer + JSON': lambda: JSONRenderer().render(
+                ExpressionHistorySerializer(queryset.all(), many=True).data
+            ),
+            'RowEncoder + JSON': lambda: JSONRenderer().render(
+                encoder.encode_rows(queryset.values_list(*encoder.fields))
+            ),
+            'RowEncoder + MessagePack': lambda: MessagePackRenderer().render(
+                encoder.encode_rows(queryset.values_list(*encoder.fields))
+            ),
+        }
+
+        with transaction.atomic():
+            ExpressionHistory.objects.bulk_create(
+                ExpressionHistory(expression=f"{i} * (3 + len('abc'))", result=str(i * 6), status="SUCCESS")
+                for i in range(options['rows'])
+            )
+            rows = queryset.count()
+            for name, render in paths.items():
+                started = time.perf_counter()
+                body = render()
+                elapsed = time.perf_counter() - started
+
+                # Measured in a separate run, tracing allocations distorts the timing.
+                tracemalloc.start()
+                render()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"{name}: {rows / elapsed:,.0f} rows/s, peak {peak / 2 ** 20:.1f} MiB, body {len(body) / 2 ** 20:.1f} MiB"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,73 @@
+import json
+import time
+
+from django.db import close_old_connections, transaction
+from django.core.signals import request_started, request_finished
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+from AlgebraAPI.lean import LeanWSGIHandler
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request overhead saved by the lean API handler compared with the regular stack."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per endpoint and handler.")
+        parser.add_argument('--expression', default="(2 + 3) * len('hello') - abs(-4)")
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        body = json.dumps({'expression': options['expression']})
+        endpoints = {
+            'GET api/expressions/': lambda: factory.get('/api/expressions/').environ,
+            'POST api/expression-input/': lambda: factory.post(
+                '/api/expression-input/', body, content_type='application/json'
+            ).environ,
+        }
+        handlers = {'regular': WSGIHandler(), 'lean': LeanWSGIHandler()}
+
+        # Keep the database untouched and the connection open across the run,
+        # the same way Django's test client does. Admission control is off, like
+        # in load_test, or throttled requests would be measured instead.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with override_settings(ADMISSION_CONTROL=False), transaction.atomic():
+                for name, make_environ in endpoints.items():
+                    timings = {
+                        handler_name: self.measure(handler, make_environ, options['requests'])
+                        for handler_name, handler in handlers.items()
+                    }
+                    saved = timings['regular'] - timings['lean']
+                    self.stdout.write(
+                        f"{name}: regular {timings['regular']:.1f} us, lean {timings['lean']:.1f} us, "
+                        f"saved {saved:.1f} us/request ({saved / timings['regular']:.1%})"
+                    )
+                transaction.set_rollback(True)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+    @staticmethod
+    def measure(handler, make_environ, requests: int) -> float:
+        """
+        Call a WSGI handler repeatedly and return the mean latency.
+
+        Args:
+            handler: The WSGI handler under test.
+            make_environ: Callable building a fresh WSGI environ per request.
+            requests (int): Number of requests to send.
+
+        Returns: float: Mean time per request in microseconds.
+        """
+        def start_response(status, headers):
+            pass
+
+        environs = [make_environ() for _ in range(requests)]
+        started = time.perf_counter()
+        for environ in environs:
+            response = handler(environ, start_response)
+            response.close()
+        return (time.perf_counter() - started) / requests * 1e6
@@ -0,0 +1,41 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from algebra_engine.parallel import ParallelEvaluator, eval_source
+
+EXPRESSION = '(3 ** 1000000 * 5 ** 700000 + 7 ** 900000 * 11 ** 600000) // (13 ** 700000 * 17 ** 450000)'
+
+
+class Command(BaseCommand):
+    help = "Measure the speedup of parallel big-integer evaluation by number of pool workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()])
+        parser.add_argument('--expression', default=EXPRESSION)
+        parser.add_argument('--min-cost', type=float, default=4e6)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def best_of(self, evaluate, expression, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            evaluate(expression)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def handle(self, *args, **options):
+        expression, repeat = options['expression'], options['repeat']
+        sequential = self.best_of(eval_source, expression, repeat)
+        self.stdout.write(f"CPUs: {os.cpu_count()}, sequential: {sequential * 1000:.0f} ms")
+
+        for workers in sorted(set(options['workers'])):
+            evaluator = ParallelEvaluator(workers, options['min_cost'])
+            try:
+                # Start the pool outside of the measurement.
+                evaluator.get_pool().submit(eval_source, '0').result()
+                elapsed = self.best_of(evaluator.evaluate, expression, repeat)
+            finally:
+                evaluator.close()
+            self.stdout.write(f"{workers} workers: {elapsed * 1000:.0f} ms, speedup {sequential / elapsed:.2f}x")
@@ -0,0 +1,67 @@
+import os
+import sys
+import subprocess
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+from AlgebraAPI.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(time.perf_counter() - started)
+"""
+
+HEAVY_MODULES_SCRIPT = """
+import sys
+from AlgebraAPI.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(' '.join(sorted(name for name in {modules} if name in sys.modules)))
+"""
+
+HEAVY_MODULES = ('drf_yasg.generators', 'drf_yasg.inspectors', 'drf_yasg.views', 'drf_yasg.openapi')
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how long a fresh worker takes to load the WSGI application and URLconf, "
+        "without the result cache warm-up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=10, help="Number of fresh interpreters to start.")
+
+    def handle(self, *args, **options):
+        # The result cache warm-up depends on the history and has its own budget (see warm_up_cache).
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ['DJANGO_SETTINGS_MODULE'], 'RESULT_CACHE_WARMUP': ''}
+        timings = [
+            float(self.run_script(STARTUP_SCRIPT, env).splitlines()[-1]) * 1000
+            for _ in range(options['runs'])
+        ]
+        loaded = self.run_script(HEAVY_MODULES_SCRIPT.format(modules=HEAVY_MODULES), env).splitlines()[-1]
+
+        self.stdout.write(
+            f"Startup over {options['runs']} runs: min {min(timings):.1f} ms, "
+            f"median {statistics.median(timings):.1f} ms, max {max(timings):.1f} ms"
+        )
+        self.stdout.write(f"Schema modules imported at startup: {loaded or 'none'}")
+
+    @staticmethod
+    def run_script(script: str, env: dict) -> str:
+        """
+        Run a script in a fresh interpreter from the project root.
+
+        Args:
+            script (str): Python source to run.
+            env (dict): Environment of the child process.
+
+        Returns: str: The script's standard output.
+        """
+        return subprocess.run(
+            [sys.executable, '-c', script], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
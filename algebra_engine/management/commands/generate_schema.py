@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from AlgebraAPI.schema import SCHEMA_CONTENT_TYPES, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema artifacts served by /swagger.json and /swagger.yaml."
+
+    def handle(self, *args, **options):
+        settings.OPENAPI_SCHEMA_DIR.mkdir(parents=True, exist_ok=True)
+        for schema_format in SCHEMA_CONTENT_TYPES:
+            path = settings.OPENAPI_SCHEMA_DIR / f'swagger{schema_format}'
+            path.write_bytes(generate_schema(schema_format))
+            self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,95 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.core.management.base import BaseCommand, CommandError
+
+from algebra_engine.loadtest import build_scenarios, diff, load_traffic, run_load, start_server
+
+DEFAULT_MIX = ['valid=70', 'invalid=10', 'history=20']
+
+
+class Command(BaseCommand):
+    help = "Load test the expression endpoints against a throwaway local database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Total number of requests.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Number of concurrent clients.")
+        parser.add_argument(
+            '--mix', nargs='+', default=None, metavar='SCENARIO=WEIGHT',
+            help="Traffic mix over the valid, invalid, history and replay scenarios.",
+        )
+        parser.add_argument('--traffic', help="JSONL file of {\"method\", \"path\", \"body\"} requests to replay.")
+        parser.add_argument('--warmup', type=int, default=100, help="Requests sent before measuring.")
+        parser.add_argument('--admission', action='store_true', help="Keep admission control enabled.")
+        parser.add_argument('--output', help="Save the results as JSON, e.g. as a new baseline.")
+        parser.add_argument('--baseline', help="Compare the results against a saved JSON baseline.")
+
+    def parse_mix(self, options, scenarios):
+        mix = {}
+        for item in options['mix'] or (['replay=1'] if options['traffic'] else DEFAULT_MIX):
+            name, _, weight = item.partition('=')
+            if name not in scenarios:
+                raise CommandError(f"Unknown scenario '{name}', expected one of {', '.join(scenarios)}.")
+            try:
+                mix[name] = float(weight or 1)
+            except ValueError:
+                raise CommandError(f"Invalid weight in '{item}'.")
+        return mix
+
+    def handle(self, *args, **options):
+        traffic = load_traffic(options['traffic']) if options['traffic'] else None
+        if options['traffic'] and not traffic:
+            raise CommandError(f"No requests found in {options['traffic']}.")
+        scenarios = build_scenarios(traffic)
+        mix = self.parse_mix(options, scenarios)
+        overrides = {} if options['admission'] else {'ADMISSION_CONTROL': False}
+
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == 'sqlite':
+                # An in-memory test database could not be shared with the server process.
+                connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'load_test.sqlite3')
+            old_name = connection.settings_dict['NAME']
+            test_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            connection.close()
+            try:
+                server, port = start_server(test_name, overrides)
+                try:
+                    if options['warmup']:
+                        run_load(port, scenarios, mix, options['warmup'], options['concurrency'])
+                    results = run_load(port, scenarios, mix, options['requests'], options['concurrency'])
+                finally:
+                    server.terminate()
+                    server.join()
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.report(results)
+        if options['baseline']:
+            self.report_diff(results, json.loads(Path(options['baseline']).read_text()))
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'scenario':<10}{'requests':>10}{'errors':>8}{'429':>6}{'req/s':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+        )
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:<10}{metrics['requests']:>10}{metrics['errors']:>8}{metrics['throttled']:>6}"
+                f"{metrics['throughput']:>10.1f}{metrics['p50_ms']:>10.2f}{metrics['p95_ms']:>10.2f}"
+                f"{metrics['p99_ms']:>10.2f}{metrics['queries_per_request']:>9.2f}"
+            )
+
+    def report_diff(self, results, baseline):
+        self.stdout.write("\nAgainst baseline:")
+        for name, metric, previous, current, change, verdict in diff(results, baseline):
+            line = f"{name:<10}{metric:<22}{previous:>12.2f} -> {current:>12.2f} ({change:+.1%})"
+            if verdict == 'worse':
+                self.stdout.write(self.style.ERROR(f"{line} worse"))
+            elif verdict == 'better':
+                self.stdout.write(self.style.SUCCESS(f"{line} better"))
+            else:
+                self.stdout.write(line)
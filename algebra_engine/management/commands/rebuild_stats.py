@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from algebra_engine.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the statistics rollups from the whole expression history."
+
+    def handle(self, *args, **options):
+        rebuild_stats()
+        self.stdout.write("Statistics rebuilt")
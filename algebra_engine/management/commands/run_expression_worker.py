@@ -0,0 +1,36 @@
+import multiprocessing
+
+from django.conf import settings
+from django.db import connections
+from django.core.management.base import BaseCommand
+
+from algebra_engine.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Evaluate expressions submitted through the asynchronous job endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help="Number of worker processes.")
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.EXPRESSION_JOBS_POLL_INTERVAL,
+            help="Seconds to sleep when no job is pending.",
+        )
+        parser.add_argument('--drain', action='store_true', help="Exit once no job is pending.")
+
+    def handle(self, *args, **options):
+        if options['workers'] == 1:
+            processed = run_worker(options['poll_interval'], options['drain'])
+            self.stdout.write(f"Processed {processed} job(s)")
+            return
+
+        # Forked workers must open their own database connections.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(options['poll_interval'], options['drain']))
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from algebra_engine.result_cache import get_result_cache, warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the result cache warm-up done by each server process at startup and report its cost, "
+        "to tune the RESULT_CACHE_WARMUP_* budgets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=settings.RESULT_CACHE_WARMUP_TOP)
+        parser.add_argument('--sample', type=int, default=settings.RESULT_CACHE_WARMUP_SAMPLE)
+        parser.add_argument('--time-budget', type=float, default=settings.RESULT_CACHE_WARMUP_TIME_BUDGET)
+
+    def handle(self, *args, **options):
+        report = warm_up(options['top'], options['sample'], options['time_budget'])
+        cache = get_result_cache()
+        self.stdout.write(
+            f"Cached {report['cached']} of {report['candidates']} hot expressions in {report['time'] * 1000:.0f} ms "
+            f"(skipped {report['skipped']} too slow for the budget), "
+            f"using {cache.size / 2 ** 20:.2f} of {cache.max_bytes / 2 ** 20:.0f} MiB."
+        )
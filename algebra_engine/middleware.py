@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+
+from .routers import has_written, pin_to_primary, reset_pinning, restore_pinning
+
+
+class LeanURLConfMiddleware:
+    """
+    Route requests served by the lean API handler through the lean URLconf.
+
+    The lean URLconf only exposes the JSON endpoints, backed by views that
+    skip authentication and browsable-API rendering.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.urlconf = settings.LEAN_API_URLCONF
+        return self.get_response(request)
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keep a client's reads on the primary for a while after it wrote.
+
+    A request that wrote sets a cookie holding the time until which the client is
+    pinned; requests presenting a valid cookie read from the primary. See ReplicaRouter.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = reset_pinning()
+        try:
+            pinned_until = float(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        if pinned_until > time.time():
+            pin_to_primary(pinned_until - time.time())
+
+        response = self.get_response(request)
+
+        if has_written():
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                str(time.time() + settings.REPLICA_READ_AFTER_WRITE_SECONDS),
+                max_age=settings.REPLICA_READ_AFTER_WRITE_SECONDS,
+                httponly=True,
+            )
+        restore_pinning(tokens)
+        return response
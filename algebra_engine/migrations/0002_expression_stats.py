@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpressionHeavyHitter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expression_hash', models.CharField(max_length=64, unique=True)),
+                ('expression', models.TextField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('error', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ExpressionHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SUCCESS', 'Success'), ('FAILED', 'Failed')], max_length=7)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='expressionhourlystats',
+            constraint=models.UniqueConstraint(fields=('hour', 'status'), name='unique_hourly_stats'),
+        ),
+        migrations.AddIndex(
+            model_name='expressionheavyhitter',
+            index=models.Index(fields=['count'], name='heavy_hitter_count_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0002_expression_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowExpression',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expression', models.TextField(help_text='Expression, truncated to SLOW_EXPRESSIONS_MAX_LENGTH characters.')),
+                ('input_size', models.PositiveBigIntegerField()),
+                ('total_time', models.FloatField()),
+                ('unary_time', models.FloatField(default=0)),
+                ('format_time', models.FloatField(default=0)),
+                ('validation_time', models.FloatField(default=0)),
+                ('eval_time', models.FloatField(default=0)),
+                ('db_time', models.FloatField(default=0)),
+                ('profile', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
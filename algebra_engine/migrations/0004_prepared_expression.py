@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0003_slow_expression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PreparedExpression',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template', models.TextField()),
+                ('source', models.TextField()),
+                ('placeholders', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0004_prepared_expression'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='expression_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='input_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0006_idempotency_record'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='compression',
+            field=models.CharField(blank=True, max_length=8, null=True),
+        ),
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='expression_data',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='result_data',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
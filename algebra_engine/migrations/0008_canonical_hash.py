@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0007_history_compression'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='canonical_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
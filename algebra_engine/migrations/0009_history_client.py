@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0008_canonical_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='client',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
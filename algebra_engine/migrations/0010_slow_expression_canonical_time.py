@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0009_history_client'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slowexpression',
+            name='canonical_time',
+            field=models.FloatField(default=0),
+        ),
+    ]
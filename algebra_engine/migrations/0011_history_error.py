@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0010_slow_expression_canonical_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expressionhistory',
+            name='error',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
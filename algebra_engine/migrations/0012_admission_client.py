@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algebra_engine', '0011_history_error'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmissionClient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client', models.CharField(max_length=255, unique=True)),
+                ('seen_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seen_at'], name='admission_client_seen_at_idx')],
+            },
+        ),
+    ]
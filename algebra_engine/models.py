@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils.functional import cached_property
+
+from .compression import decompress
 
 
 class ExpressionHistory(models.Model):
@@ -9,9 +12,159 @@ class ExpressionHistory(models.Model):
 
     expression = models.TextField()
     result = models.TextField(blank=True, null=True)
+    # Error message of FAILED evaluations, whose result is empty.
+    error = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=7, choices=Status.choices, default=Status.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
     evaluated_at = models.DateTimeField(null=True, blank=True)
+    # Set for uploaded and compressed expressions, of which ``expression`` only keeps a prefix.
+    expression_hash = models.CharField(max_length=64, blank=True, null=True)
+    input_size = models.PositiveBigIntegerField(blank=True, null=True)
+    # Shared by equivalent expressions (see canonical.py), for deduplication; not set for prepared evaluations.
+    canonical_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    # Codec of the compressed values, whose text fields only keep a preview (see compression.py).
+    compression = models.CharField(max_length=8, blank=True, null=True)
+    expression_data = models.BinaryField(blank=True, null=True)
+    result_data = models.BinaryField(blank=True, null=True)
+    # Client that queued the job, charged for its evaluation by the worker (see admission.py).
+    client = models.CharField(max_length=255, blank=True, null=True)
 
     def __str__(self):
         return self.expression
+
+    @cached_property
+    def full_expression(self) -> str:
+        """
+        The whole expression, decompressed on first access if it is stored compressed.
+        """
+        if self.expression_data is None:
+            return self.expression
+        return decompress(self.expression_data, self.compression)
+
+    @cached_property
+    def full_result(self) -> str:
+        """
+        The whole result, decompressed on first access if it is stored compressed.
+        """
+        if self.result_data is None:
+            return self.result
+        return decompress(self.result_data, self.compression)
+
+
+class ExpressionHourlyStats(models.Model):
+    """
+    Number of evaluations per hour and outcome, maintained incrementally as results are stored.
+    """
+    hour = models.DateTimeField()
+    status = models.CharField(max_length=7, choices=ExpressionHistory.Status.choices)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'status'], name='unique_hourly_stats'),
+        ]
+
+    def __str__(self):
+        return f'{self.hour:%Y-%m-%d %H:00} {self.status}: {self.count}'
+
+
+class ExpressionHeavyHitter(models.Model):
+    """
+    One counter of the bounded Space-Saving sketch tracking the most frequent expressions.
+
+    ``count`` overestimates the true frequency by at most ``error``.
+    """
+    expression_hash = models.CharField(max_length=64, unique=True)
+    expression = models.TextField()
+    count = models.PositiveBigIntegerField(default=0)
+    error = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['count'], name='heavy_hitter_count_idx'),
+        ]
+
+    def __str__(self):
+        return self.expression
+
+
+class AdmissionClient(models.Model):
+    """
+    Client holding an admission bucket, listed for the usage export (see admission.py).
+
+    Buckets live in the ``admission`` cache; ``seen_at`` is only refreshed every
+    ADMISSION_LIST_INTERVAL seconds, not on every request.
+    """
+    client = models.CharField(max_length=255, unique=True)
+    seen_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['seen_at'], name='admission_client_seen_at_idx'),
+        ]
+
+    def __str__(self):
+        return self.client
+
+
+class SlowExpression(models.Model):
+    """
+    Evaluation that took longer than SLOW_EXPRESSIONS_THRESHOLD, with its per-stage timings.
+
+    The table is a ring buffer holding the latest SLOW_EXPRESSIONS_MAX_RECORDS evaluations.
+    """
+    expression = models.TextField(help_text="Expression, truncated to SLOW_EXPRESSIONS_MAX_LENGTH characters.")
+    input_size = models.PositiveBigIntegerField()
+    total_time = models.FloatField()
+    unary_time = models.FloatField(default=0)
+    format_time = models.FloatField(default=0)
+    validation_time = models.FloatField(default=0)
+    canonical_time = models.FloatField(default=0)
+    eval_time = models.FloatField(default=0)
+    db_time = models.FloatField(default=0)
+    profile = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.expression
+
+
+class PreparedExpression(models.Model):
+    """
+    Expression template with ``{name}`` placeholders, validated once at registration.
+
+    ``source`` is the validated Python source of the template, with placeholders as variables.
+    """
+    template = models.TextField()
+    source = models.TextField()
+    placeholders = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.template
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Response to the first request sent with an ``Idempotency-Key``, replayed for its duplicates.
+
+    ``status_code`` and ``response`` stay empty while the first request is being evaluated.
+    """
+    client = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True)
+    response = models.JSONField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['client', 'key'], name='unique_idempotency_key'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_at_idx'),
+        ]
+
+    def __str__(self):
+        return self.key
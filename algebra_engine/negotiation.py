@@ -0,0 +1,46 @@
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.utils.mediatypes import media_type_matches
+
+
+class LeanContentNegotiation(BaseContentNegotiation):
+    """
+    Content negotiation that skips full Accept-header parsing.
+
+    Views using it are expected to declare exactly the parsers and renderers
+    they support. The parser is the first one matching the Content-Type, and the
+    renderer the first one, unless the Accept header is exactly the media type of
+    another declared renderer.
+    """
+
+    def select_parser(self, request, parsers):
+        """
+        Select the first parser declared on the view that handles the Content-Type.
+
+        Args:
+            request: Django Rest Framework request object.
+            parsers (list): Parser instances declared on the view.
+
+        Returns: The parser, or None for an unsupported media type (415 Unsupported Media Type).
+        """
+        for parser in parsers:
+            if media_type_matches(parser.media_type, request.content_type):
+                return parser
+        return None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        """
+        Select the renderer whose media type is the Accept header, or the first one.
+
+        Args:
+            request: Django Rest Framework request object.
+            renderers (list): Renderer instances declared on the view.
+            format_suffix (str): Ignored, kept for interface compatibility.
+
+        Returns: tuple: The renderer and its media type.
+        """
+        accept = request.META.get('HTTP_ACCEPT')
+        for renderer in renderers:
+            if renderer.media_type == accept:
+                return renderer, renderer.media_type
+        renderer = renderers[0]
+        return renderer, renderer.media_type
@@ -0,0 +1,271 @@
+"""
+Parallel evaluation of independent, expensive big-integer subtrees.
+
+Large expressions often combine several independent big-integer terms, such as
+``(3 ** 2000000 * 5 ** 1000000) // 7 ** 2500000``, which plain ``eval`` computes one
+after another on a single core. ParallelEvaluator parses the expression, estimates
+the size and cost of every subtree, and sends independent subtrees above
+``min_cost`` to a process pool before combining their results in the original
+tree, so the result is exactly what ``eval`` would return. Expressions without
+such subtrees are evaluated directly and never touch the pool.
+"""
+import ast
+import os
+import math
+import operator
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+# Bits in a CPython big-integer digit.
+DIGIT_BITS = 30
+# Exponent of the Karatsuba multiplication used by CPython.
+KARATSUBA = math.log2(3)
+# Prefix of the names substituted for subtrees evaluated in the pool.
+PLACEHOLDER = '_parallel_'
+
+
+def eval_source(source: str):
+    """
+    Evaluate an expression with the same restricted namespace as ExpressionEvaluator.safe_eval.
+
+    Args: source (str): The expression.
+
+    Returns: Any: The result of the evaluation.
+    """
+    return eval(source, {"__builtins__": None}, operator.__dict__)
+
+
+def multiplication_cost(left_bits: float, right_bits: float) -> float:
+    """
+    Estimate the cost of multiplying two integers, in digit operations.
+
+    Args:
+        left_bits (float): Size of the left operand.
+        right_bits (float): Size of the right operand.
+
+    Returns: float: The estimated cost.
+    """
+    small, large = sorted((max(left_bits, 1) / DIGIT_BITS, max(right_bits, 1) / DIGIT_BITS))
+    # Unbalanced products are computed as large / small balanced Karatsuba products.
+    return large / small * small ** KARATSUBA
+
+
+class CostEstimator:
+    """
+    Estimate result size (in bits) and evaluation cost of expression subtrees.
+    """
+
+    def __init__(self):
+        self.estimates = {}
+
+    def bits(self, node: ast.AST) -> float:
+        return self.estimate(node)[0]
+
+    def cost(self, node: ast.AST) -> float:
+        return self.estimate(node)[1]
+
+    def estimate(self, node: ast.AST) -> tuple:
+        """
+        Estimate a subtree, memoizing the result.
+
+        Args: node (ast.AST): The subtree.
+
+        Returns: tuple: The result size in bits and the evaluation cost.
+        """
+        if id(node) not in self.estimates:
+            self.estimates[id(node)] = self._estimate(node)
+        return self.estimates[id(node)]
+
+    def _estimate(self, node: ast.AST) -> tuple:
+        if isinstance(node, ast.Constant):
+            return (node.value.bit_length() if isinstance(node.value, int) else 64), 0.0
+        if isinstance(node, ast.UnaryOp):
+            return self.estimate(node.operand)
+        if not isinstance(node, ast.BinOp):
+            return 64, 0.0
+
+        left_bits, left_cost = self.estimate(node.left)
+        right_bits, right_cost = self.estimate(node.right)
+        cost = left_cost + right_cost
+        if isinstance(node.op, (ast.Add, ast.Sub)):
+            bits = max(left_bits, right_bits) + 1
+            return bits, cost + bits / DIGIT_BITS
+        if isinstance(node.op, ast.Mult):
+            return left_bits + right_bits, cost + multiplication_cost(left_bits, right_bits)
+        if isinstance(node.op, ast.Pow):
+            exponent = self.small_value(node.right)
+            if not isinstance(exponent, int) or exponent < 0:
+                return 64, cost
+            bits = left_bits * exponent
+            # Dominated by the last squarings of the binary exponentiation.
+            return bits, cost + 2 * multiplication_cost(bits / 2, bits / 2)
+        if isinstance(node.op, (ast.FloorDiv, ast.Mod)):
+            return max(left_bits - right_bits, right_bits, 1), cost + (left_bits / DIGIT_BITS) * (right_bits / DIGIT_BITS)
+        return 64, cost + (left_bits + right_bits) / DIGIT_BITS
+
+    def small_value(self, node: ast.AST):
+        """
+        Compute the value of a subtree if it is cheap and small, as needed to size exponents.
+
+        Args: node (ast.AST): The subtree.
+
+        Returns: Any: The value, or None if it is too big to compute upfront or fails.
+        """
+        bits, cost = self.estimate(node)
+        if bits > 64 or cost > 1000:
+            return None
+        try:
+            return eval_source(ast.unparse(node))
+        except Exception:
+            return None
+
+
+def operands(node: ast.AST) -> list:
+    """
+    List the operands of a node, flattening chains of the same + or * operator.
+
+    Args: node (ast.AST): The node.
+
+    Returns: list: Operand subtrees, in source order.
+    """
+    if isinstance(node, ast.UnaryOp):
+        return [node.operand]
+    if not isinstance(node, ast.BinOp):
+        return []
+    if isinstance(node.op, (ast.Add, ast.Mult)):
+        return [
+            operand
+            for child in (node.left, node.right)
+            for operand in (
+                operands(child) if isinstance(child, ast.BinOp) and type(child.op) is type(node.op) else [child]
+            )
+        ]
+    return [node.left, node.right]
+
+
+def independent_subtrees(node: ast.AST, estimator: CostEstimator, min_cost: float) -> list:
+    """
+    Find independent subtrees worth evaluating concurrently.
+
+    Args:
+        node (ast.AST): Root of the expression.
+        estimator (CostEstimator): Estimator for the expression.
+        min_cost (float): Minimum estimated cost of a subtree sent to the pool.
+
+    Returns: list: At least two disjoint expensive subtrees, or an empty list.
+    """
+    expensive = [operand for operand in operands(node) if estimator.cost(operand) >= min_cost]
+    if len(expensive) == 1:
+        return independent_subtrees(expensive[0], estimator, min_cost)
+    # Split expensive operands further when they combine independent expensive subtrees themselves.
+    return [
+        subtree
+        for operand in expensive
+        for subtree in independent_subtrees(operand, estimator, min_cost) or [operand]
+    ]
+
+
+class Substitute(ast.NodeTransformer):
+    """
+    Replace the subtrees evaluated in the pool with placeholder names.
+    """
+
+    def __init__(self, names: dict):
+        self.names = names
+
+    def visit(self, node):
+        if id(node) in self.names:
+            return ast.copy_location(ast.Name(id=self.names[id(node)], ctx=ast.Load()), node)
+        return super().visit(node)
+
+
+class ParallelEvaluator:
+    """
+    Evaluator computing independent expensive subtrees in a process pool.
+    """
+
+    def __init__(self, workers: int, min_cost: float):
+        """
+        Initialize the evaluator; the pool is only started when first needed.
+
+        Args:
+            workers (int): Number of pool processes.
+            min_cost (float): Minimum estimated cost of a subtree sent to the pool.
+        """
+        self.workers = workers
+        self.min_cost = min_cost
+        self.pool = None
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            # Spawned workers do not inherit the server's threads and connections.
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self.pool
+
+    def close(self, wait: bool = True) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(wait)
+            self.pool = None
+
+    def evaluate(self, expression: str):
+        """
+        Evaluate an expression, in parallel when it has independent expensive subtrees.
+
+        Args: expression (str): The formatted and validated expression.
+
+        Returns: Any: The same result as eval_source(expression).
+        """
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError:
+            return eval_source(expression)
+
+        subtrees = independent_subtrees(tree.body, CostEstimator(), self.min_cost)
+        if not subtrees:
+            return eval_source(expression)
+
+        try:
+            futures = [self.get_pool().submit(eval_source, ast.unparse(subtree)) for subtree in subtrees]
+            results = [future.result() for future in futures]
+        except BrokenProcessPool:
+            # A worker died (e.g. killed out of memory); the next evaluation starts a new pool.
+            self.close(wait=False)
+            return eval_source(expression)
+        except Exception:
+            # Re-run sequentially so errors are exactly those of plain evaluation.
+            return eval_source(expression)
+
+        names = {id(subtree): f'{PLACEHOLDER}{index}' for index, subtree in enumerate(subtrees)}
+        body = ast.fix_missing_locations(Substitute(names).visit(tree))
+        namespace = {**operator.__dict__, **{names[id(subtree)]: result for subtree, result in zip(subtrees, results)}}
+        return eval(compile(body, '<expression>', 'eval'), {"__builtins__": None}, namespace)
+
+
+@lru_cache(maxsize=None)
+def get_parallel_evaluator() -> ParallelEvaluator:
+    """
+    Return the process-wide evaluator configured by the PARALLEL_EVAL_* settings.
+
+    Returns: ParallelEvaluator: The shared evaluator.
+    """
+    return ParallelEvaluator(settings.PARALLEL_EVAL_WORKERS or os.cpu_count(), settings.PARALLEL_EVAL_MIN_COST)
+
+
+def safe_parallel_eval(expression: str):
+    """
+    Evaluate an expression, using the process pool only for large ones with '**' or long literals.
+
+    Args: expression (str): The formatted and validated expression.
+
+    Returns: Any: The result of the evaluation.
+    """
+    if (
+        not settings.PARALLEL_EVAL
+        or ('**' not in expression and len(expression) < settings.PARALLEL_EVAL_MIN_LENGTH)
+    ):
+        return eval_source(expression)
+    return get_parallel_evaluator().evaluate(expression)
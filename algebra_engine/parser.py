@@ -1,9 +1,13 @@
 import re
+import time
 import operator
 from typing import Any
+from contextlib import contextmanager
 
 from error_messages import SyntaxErrorMessages
 from algebra_engine.expression_validator import SyntaxValidator
+from algebra_engine.parallel import safe_parallel_eval
+from algebra_engine.canonical import canonical_hash
 
 
 class ExpressionFormatter:
@@ -93,21 +97,59 @@ class ExpressionEvaluator:
         """
         self.expression: str = expression
         self.original_expression: str = expression
+        self.canonical_hash: str = None
+        self.timings: dict = {}
 
-    def evaluate(self) -> str:
+    @contextmanager
+    def timed(self, stage: str):
+        """
+        Record the wall time spent in a stage into ``timings``, even if the stage fails.
+
+        Args: stage (str): Name of the stage.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - started
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Key of the result in a ResultCache, shared by equivalent expressions once they are validated.
+        """
+        return self.canonical_hash or self.expression
+
+    def evaluate(self, cache=None) -> str:
         """
         Evaluate the stored algebraic expression.
 
+        The time spent in each stage (unary, format, validation, canonical, eval) is kept in ``timings``.
+        Once the expression is validated, the canonical stage computes its ``canonical_hash``.
+
+        Args: cache (ResultCache): Cache to look the result up in before evaluating it, and to store it in.
+
         Returns: str: The result of the evaluated expression.
 
         Raises: Exception: With detailed error messages if the expression is invalid or cannot be evaluated.
         """
         try:
-            self.expression = self.handle_unary_operators()
-            formatter = ExpressionFormatter(self.expression)
-            self.expression = formatter.format_expression()
-            self.is_valid_syntax()
-            return str(self.safe_eval())
+            with self.timed('unary'):
+                self.expression = self.handle_unary_operators()
+            with self.timed('format'):
+                formatter = ExpressionFormatter(self.expression)
+                self.expression = formatter.format_expression()
+            with self.timed('validation'):
+                self.is_valid_syntax()
+            with self.timed('canonical'):
+                self.canonical_hash = canonical_hash(self.expression)
+            result = cache.get(self.cache_key) if cache is not None else None
+            if result is None:
+                with self.timed('eval'):
+                    result = str(self.safe_eval())
+                if cache is not None:
+                    cache.put(self.cache_key, result)
+            return result
 
         except SyntaxError as e:
             raise Exception(SyntaxErrorMessages.GLOBAL_SYNTAX_ERROR.format(self.original_expression, str(e)))
@@ -187,4 +229,4 @@ class ExpressionEvaluator:
         Raises: Exception: If the evaluation fails.
         """
 
-        return eval(self.expression, {"__builtins__": None}, operator.__dict__)
+        return safe_parallel_eval(self.expression)
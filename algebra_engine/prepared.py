@@ -0,0 +1,153 @@
+"""
+Prepared expressions: templates validated and compiled once, evaluated many times.
+
+A template is an expression with ``{name}`` placeholders, such as
+``{price} * (1 + {rate}) ** len('years')``. Registration runs the usual unary,
+formatting and syntax checks on the template with every placeholder replaced by
+a number, then stores the Python source where placeholders are variables.
+Evaluating a parameter set only binds those variables and runs the compiled
+source, kept in a per-worker LRU cache keyed by PreparedExpression id.
+"""
+import re
+import operator
+from collections import ChainMap
+from functools import lru_cache
+
+from django.conf import settings
+
+from error_messages import PreparedExpressionMessages, SyntaxErrorMessages
+from algebra_engine.models import PreparedExpression
+from algebra_engine.parser import ExpressionEvaluator, ExpressionFormatter
+from algebra_engine.expression_validator import SyntaxValidator
+
+PLACEHOLDER = re.compile(r'\{\s*([A-Za-z_]\w*)\s*\}')
+# Placeholders become variables with this prefix, so they cannot shadow the operator functions.
+VARIABLE_PREFIX = '_p_'
+
+
+class PreparedForm:
+    """
+    Compiled template of a prepared expression.
+    """
+
+    def __init__(self, template: str, source: str, placeholders: list):
+        """
+        Compile an already validated template.
+
+        Args:
+            template (str): The expression with ``{name}`` placeholders.
+            source (str): The validated Python source, with placeholders as variables.
+            placeholders (list): Placeholder names, in order of appearance.
+        """
+        self.template = template
+        self.source = source
+        self.placeholders = placeholders
+        self.code = compile(source, '<prepared expression>', 'eval')
+
+    @classmethod
+    def from_template(cls, template: str) -> 'PreparedForm':
+        """
+        Validate and compile a template.
+
+        Args: template (str): The expression with ``{name}`` placeholders.
+
+        Returns: PreparedForm: The compiled template.
+
+        Raises: Exception: With the same messages as ExpressionEvaluator if the template is invalid.
+        """
+        try:
+            static = ExpressionEvaluator.handle_len_operator(template)
+            placeholders = list(dict.fromkeys(PLACEHOLDER.findall(static)))
+
+            # Spaces around the probe value keep adjacent placeholders from merging into one number.
+            probe = ExpressionEvaluator.handle_abs_operator(PLACEHOLDER.sub(' 1 ', static))
+            SyntaxValidator(ExpressionFormatter(probe).format_expression()).validate()
+
+            source = PLACEHOLDER.sub(lambda match: VARIABLE_PREFIX + match.group(1), static)
+            return cls(template, source, placeholders)
+        except SyntaxError as e:
+            raise Exception(SyntaxErrorMessages.GLOBAL_SYNTAX_ERROR.format(template, str(e)))
+        except Exception as e:
+            raise Exception(SyntaxErrorMessages.EVALUATING_EXPRESSION_ERROR.format(template, str(e)))
+
+    def check_parameters(self, parameters: dict) -> None:
+        """
+        Check that a parameter set binds every placeholder, and only those, to numbers.
+
+        Args: parameters (dict): Values by placeholder name.
+
+        Raises: ValueError: If the parameter set does not match the placeholders.
+        """
+        unknown = parameters.keys() - set(self.placeholders)
+        if unknown:
+            raise ValueError(PreparedExpressionMessages.UNKNOWN_PARAMETERS.format(', '.join(sorted(unknown))))
+        missing = [name for name in self.placeholders if name not in parameters]
+        if missing:
+            raise ValueError(PreparedExpressionMessages.MISSING_PARAMETERS.format(', '.join(missing)))
+        for name, value in parameters.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(PreparedExpressionMessages.INVALID_PARAMETER.format(name))
+
+    def expression(self, parameters: dict) -> str:
+        """
+        Render the template with a parameter set, as stored in the expression history.
+
+        Args: parameters (dict): Values by placeholder name.
+
+        Returns: str: The expression with placeholders replaced by their values.
+        """
+        def render(match):
+            value = parameters[match.group(1)]
+            return f'({value})' if value < 0 else str(value)
+
+        return PLACEHOLDER.sub(render, self.template)
+
+    def evaluate(self, parameters: dict) -> str:
+        """
+        Evaluate the compiled template with a checked parameter set.
+
+        Args: parameters (dict): Values by placeholder name.
+
+        Returns: str: The result of the evaluation.
+
+        Raises: Exception: With the same message as ExpressionEvaluator if the evaluation fails.
+        """
+        variables = {VARIABLE_PREFIX + name: value for name, value in parameters.items()}
+        try:
+            return str(eval(self.code, {"__builtins__": None}, ChainMap(variables, operator.__dict__)))
+        except Exception as e:
+            raise Exception(
+                SyntaxErrorMessages.EVALUATING_EXPRESSION_ERROR.format(self.expression(parameters), str(e))
+            )
+
+
+@lru_cache(maxsize=settings.PREPARED_EXPRESSIONS_CACHE_SIZE)
+def get_prepared_form(pk: int) -> PreparedForm:
+    """
+    Return the compiled form of a prepared expression, from the per-worker LRU cache.
+
+    The stored source was validated at registration, so a cache miss only compiles it.
+    Templates are immutable once registered, so cached forms never go stale.
+
+    Args: pk (int): Id of the PreparedExpression.
+
+    Returns: PreparedForm: The compiled template.
+
+    Raises: PreparedExpression.DoesNotExist: If there is no such prepared expression.
+    """
+    prepared = PreparedExpression.objects.get(pk=pk)
+    return PreparedForm(prepared.template, prepared.source, prepared.placeholders)
+
+
+def register(template: str) -> PreparedExpression:
+    """
+    Validate, compile and store a template.
+
+    Args: template (str): The expression with ``{name}`` placeholders.
+
+    Returns: PreparedExpression: The stored prepared expression.
+
+    Raises: Exception: If the template is invalid.
+    """
+    form = PreparedForm.from_template(template)
+    return PreparedExpression.objects.create(template=template, source=form.source, placeholders=form.placeholders)
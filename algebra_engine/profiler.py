@@ -0,0 +1,62 @@
+import io
+import pstats
+import random
+import cProfile
+
+from django.conf import settings
+
+from .models import SlowExpression
+from .parser import ExpressionEvaluator
+
+STAGES = ('unary', 'format', 'validation', 'canonical', 'eval', 'db')
+
+
+def sample_slow_evaluation(evaluator: ExpressionEvaluator):
+    """
+    Keep a record of an evaluation if it was slow.
+
+    Cheap for the common case: only the stage timings already collected by the
+    evaluator are summed and compared with SLOW_EXPRESSIONS_THRESHOLD.
+
+    Args: evaluator (ExpressionEvaluator): The evaluator after evaluation, with its ``timings``.
+
+    Returns: SlowExpression: The stored record, or None if the evaluation was not recorded.
+    """
+    total_time = sum(evaluator.timings.values())
+    if total_time < settings.SLOW_EXPRESSIONS_THRESHOLD or random.random() >= settings.SLOW_EXPRESSIONS_SAMPLE_RATE:
+        return None
+
+    expression = evaluator.original_expression
+    record = SlowExpression.objects.create(
+        expression=expression[:settings.SLOW_EXPRESSIONS_MAX_LENGTH],
+        input_size=len(expression),
+        total_time=total_time,
+        profile=profile_evaluation(expression) if settings.SLOW_EXPRESSIONS_PROFILE else None,
+        **{f'{stage}_time': evaluator.timings.get(stage, 0.0) for stage in STAGES},
+    )
+    SlowExpression.objects.filter(id__lte=record.id - settings.SLOW_EXPRESSIONS_MAX_RECORDS).delete()
+    return record
+
+
+def profile_evaluation(expression: str) -> str:
+    """
+    Evaluate an expression again under cProfile.
+
+    This doubles the cost of the slow evaluation, hence SLOW_EXPRESSIONS_PROFILE is off by default.
+
+    Args: expression (str): The expression to profile.
+
+    Returns: str: The top functions by cumulative time.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        ExpressionEvaluator(expression).evaluate()
+    except Exception:
+        pass
+    finally:
+        profiler.disable()
+
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(25)
+    return output.getvalue()
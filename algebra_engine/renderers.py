@@ -0,0 +1,22 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer producing compact binary MessagePack documents.
+
+    Clients opt in with ``Accept: application/msgpack`` (or ``?format=msgpack``).
+    Values MessagePack has no type for (dates, decimals, ...) are converted the same
+    way the JSON renderer converts them.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=JSONEncoder().default)
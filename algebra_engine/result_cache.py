@@ -0,0 +1,204 @@
+"""
+In-process cache of evaluation results, warmed up with the hottest expressions.
+
+Evaluation is deterministic, so ExpressionInput can serve a repeated expression,
+or an equivalent one (see canonical.py), from a per-process LRU cache bounded by
+RESULT_CACHE_MAX_BYTES instead of running ExpressionEvaluator again. New processes
+start cold; warm_up pre-evaluates the most frequent recent successful expressions
+from ExpressionHistory, within a time budget, and is run from the WSGI entry point
+so it happens once per server process and never in management commands.
+"""
+import sys
+import ast
+import math
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+
+from .models import ExpressionHistory
+from .parser import ExpressionEvaluator
+from .parallel import CostEstimator
+
+logger = logging.getLogger(__name__)
+
+# Approximate overhead of an entry in the OrderedDict, on top of its key and value.
+ENTRY_OVERHEAD = 100
+# Upper end of the duration of a CostEstimator unit, in seconds.
+COST_UNIT_TIME = 3e-9
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of results by ExpressionEvaluator.cache_key, bounded by the memory of its entries.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize an empty cache.
+
+        Args: max_bytes (int): Memory budget of the cached expressions and results.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key: str):
+        return key in self.entries
+
+    @staticmethod
+    def entry_size(key: str, result: str) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(result) + ENTRY_OVERHEAD
+
+    def get(self, key: str):
+        """
+        Look up a result, marking it as recently used.
+
+        Args: key (str): ExpressionEvaluator.cache_key of the expression.
+
+        Returns: str: The cached result, or None.
+        """
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return result
+
+    def put(self, key: str, result: str) -> bool:
+        """
+        Cache a result, evicting the least recently used entries to fit the budget.
+
+        Args:
+            key (str): ExpressionEvaluator.cache_key of the expression.
+            result (str): Its result.
+
+        Returns: bool: False if the entry alone exceeds the budget and was not cached.
+        """
+        size = self.entry_size(key, result)
+        if size > self.max_bytes:
+            return False
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= self.entry_size(key, previous)
+            self.entries[key] = result
+            self.size += size
+            while self.size > self.max_bytes:
+                evicted, evicted_result = self.entries.popitem(last=False)
+                self.size -= self.entry_size(evicted, evicted_result)
+        return True
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = self.hits = self.misses = 0
+
+
+@lru_cache(maxsize=None)
+def get_result_cache() -> ResultCache:
+    """
+    Return the process-wide result cache.
+
+    Returns: ResultCache: The shared cache.
+    """
+    return ResultCache(settings.RESULT_CACHE_MAX_BYTES)
+
+
+def hot_expressions(top: int, sample: int) -> list:
+    """
+    Find the most frequent expressions among the latest successful evaluations.
+
+    Only the latest ``sample`` rows are read, so the cost does not grow with the history;
+    truncated expressions (uploads and compressed values) are skipped.
+
+    Args:
+        top (int): Number of expressions to return.
+        sample (int): Number of latest successful evaluations to count.
+
+    Returns: list: The expressions, most frequent first.
+    """
+    expressions = (
+        ExpressionHistory.objects
+        .filter(status=ExpressionHistory.Status.SUCCESS, input_size__isnull=True)
+        .order_by('-id')
+        .values_list('expression', flat=True)[:sample]
+    )
+    return [expression for expression, _ in Counter(expressions).most_common(top)]
+
+
+def estimated_time(expression: str) -> float:
+    """
+    Estimate how long an expression takes to evaluate, from the cost of its integer arithmetic.
+
+    Args: expression (str): The expression.
+
+    Returns: float: Estimated seconds, infinite if the expression cannot be parsed.
+    """
+    try:
+        return CostEstimator().cost(ast.parse(expression.strip(), mode='eval').body) * COST_UNIT_TIME
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return math.inf
+
+
+def warm_up(top: int, sample: int, time_budget: float) -> dict:
+    """
+    Pre-evaluate hot expressions into the result cache.
+
+    Stops when the time budget is spent. Evaluations cannot be interrupted, so expressions
+    whose estimated evaluation time exceeds the remaining budget are skipped rather than
+    holding up the server start. The memory budget is enforced by the cache.
+
+    Args:
+        top (int): Number of hot expressions to pre-evaluate.
+        sample (int): Number of latest successful evaluations to count.
+        time_budget (float): Seconds to spend at most, including the query.
+
+    Returns: dict: Number of candidate, skipped and cached expressions and the time spent.
+    """
+    started = time.monotonic()
+    cache = get_result_cache()
+    candidates = hot_expressions(top, sample)
+    cached = skipped = 0
+    for expression in candidates:
+        remaining = time_budget - (time.monotonic() - started)
+        if remaining <= 0:
+            break
+        if estimated_time(expression) > remaining:
+            skipped += 1
+            continue
+        evaluator = ExpressionEvaluator(expression)
+        try:
+            evaluator.evaluate(cache)
+        except Exception:
+            continue
+        cached += evaluator.cache_key in cache
+    return {'candidates': len(candidates), 'skipped': skipped, 'cached': cached, 'time': time.monotonic() - started}
+
+
+def warm_up_on_startup() -> None:
+    """
+    Warm up the result cache of a starting server process, as configured by the RESULT_CACHE_* settings.
+
+    Failures (e.g. the database not being reachable or migrated yet) never prevent the server from starting.
+    """
+    if not settings.RESULT_CACHE or not settings.RESULT_CACHE_WARMUP:
+        return
+    try:
+        warm_up(
+            settings.RESULT_CACHE_WARMUP_TOP, settings.RESULT_CACHE_WARMUP_SAMPLE,
+            settings.RESULT_CACHE_WARMUP_TIME_BUDGET,
+        )
+    except Exception:
+        logger.warning("Result cache warm-up failed.", exc_info=True)
@@ -0,0 +1,91 @@
+import time
+from contextvars import ContextVar
+
+from django.db import connections
+from django.conf import settings
+
+# Monotonic deadline until which reads in the current context must go to the primary.
+_pinned_until: ContextVar[float] = ContextVar('pinned_until', default=0.0)
+# Whether the current context wrote to the primary.
+_wrote: ContextVar[bool] = ContextVar('wrote', default=False)
+
+
+def pin_to_primary(seconds: float) -> None:
+    """
+    Send reads in the current context to the primary for the given time.
+
+    Args: seconds (float): How long reads stay on the primary.
+    """
+    _pinned_until.set(max(_pinned_until.get(), time.monotonic() + seconds))
+
+
+def is_pinned_to_primary() -> bool:
+    """
+    Check whether reads in the current context must go to the primary.
+
+    Reads inside a transaction on the primary stay there too, since the replica
+    cannot see uncommitted rows.
+
+    Returns: bool: True while a read-after-write guard or a transaction is active.
+    """
+    return (
+        _wrote.get()
+        or time.monotonic() < _pinned_until.get()
+        or connections['default'].in_atomic_block
+    )
+
+
+def has_written() -> bool:
+    """
+    Check whether the current context wrote to the primary.
+
+    Returns: bool: True if a write was routed since the last reset.
+    """
+    return _wrote.get()
+
+
+def reset_pinning() -> tuple:
+    """
+    Forget any write or pin recorded in the current context.
+
+    Returns: tuple: Tokens to pass to restore_pinning.
+    """
+    return _pinned_until.set(0.0), _wrote.set(False)
+
+
+def restore_pinning(tokens: tuple) -> None:
+    """
+    Restore the pinning state saved by reset_pinning.
+
+    Args: tokens (tuple): The tokens returned by reset_pinning.
+    """
+    pinned_until_token, wrote_token = tokens
+    _pinned_until.reset(pinned_until_token)
+    _wrote.reset(wrote_token)
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads of the models in REPLICA_ROUTED_MODELS to the replica.
+
+    Writes always go to the primary. After a write, reads in the same context stay on
+    the primary, and ReplicaPinningMiddleware extends that guard to the client's next
+    requests for REPLICA_READ_AFTER_WRITE_SECONDS, so clients read their own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label in settings.REPLICA_ROUTED_MODELS and not is_pinned_to_primary():
+            return settings.REPLICA_DATABASE
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication.
+        return db == 'default'
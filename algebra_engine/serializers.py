@@ -1,12 +1,53 @@
-from .models import ExpressionHistory
+from django.conf import settings
+
+from .models import ExpressionHistory, PreparedExpression
 from rest_framework import serializers
 
 
 class ExpressionHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = ExpressionHistory
-        fields = ['id', 'expression', 'result', 'status', 'created_at', 'evaluated_at']
+        fields = [
+            'id', 'expression', 'result', 'error', 'status', 'created_at', 'evaluated_at', 'expression_hash',
+            'canonical_hash', 'input_size', 'compression',
+        ]
+
+
+class ExpressionHistoryDetailSerializer(ExpressionHistorySerializer):
+    """
+    Serializer of a single record, with compressed values decompressed.
+    """
+    expression = serializers.CharField(source='full_expression')
+    result = serializers.CharField(source='full_result', allow_null=True)
 
 
 class ExpressionInputSerializer(serializers.Serializer):
     expression = serializers.CharField()
+
+
+class ExpressionJobPollSerializer(serializers.Serializer):
+    wait = serializers.FloatField(min_value=0, max_value=settings.EXPRESSION_JOBS_LONG_POLL_MAX_WAIT, default=0)
+
+
+class RecentExpressionsQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=settings.RECENT_FEED_SIZE, default=100)
+    wait = serializers.FloatField(min_value=0, max_value=settings.RECENT_FEED_LONG_POLL_MAX_WAIT, default=0)
+
+
+class ExpressionStatsQuerySerializer(serializers.Serializer):
+    hours = serializers.IntegerField(min_value=1, max_value=settings.STATS_MAX_HOURS, default=24)
+    top = serializers.IntegerField(min_value=1, max_value=settings.STATS_TOP_K, default=10)
+
+
+class PreparedExpressionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PreparedExpression
+        fields = ['id', 'template', 'placeholders', 'created_at']
+        read_only_fields = ['placeholders']
+
+
+class PreparedExpressionEvaluateSerializer(serializers.Serializer):
+    parameters = serializers.ListField(
+        child=serializers.DictField(), min_length=1, max_length=settings.PREPARED_EXPRESSIONS_MAX_BATCH
+    )
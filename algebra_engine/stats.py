@@ -0,0 +1,316 @@
+"""
+Incrementally maintained evaluation statistics.
+
+Evaluation outcomes are rolled up into hourly counters by status and a
+Space-Saving sketch of the most frequent expressions, so that reports never scan
+ExpressionHistory. Each process buffers outcomes in a StatsBatch and writes them
+in one transaction once STATS_BATCH_SIZE outcomes are pending, or from a timer
+thread once the oldest is STATS_BATCH_INTERVAL seconds old, which takes the
+rollups off the per-request path. Pending outcomes are also written before this
+process reads the stats and when it exits, and are kept for the next attempt
+when writing them fails.
+"""
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from django.db.models import CharField, Count, F, Min
+from django.db.models.functions import SHA256, Coalesce, TruncHour
+from django.db import IntegrityError, connection, transaction
+
+from .models import ExpressionHistory, ExpressionHourlyStats, ExpressionHeavyHitter
+
+logger = logging.getLogger(__name__)
+
+
+def expression_hash(expression: str) -> str:
+    """
+    Compute the key identifying an expression in the heavy-hitters sketch.
+
+    Args: expression (str): The expression as submitted.
+
+    Returns: str: Hex SHA-256 digest of the expression.
+    """
+    return hashlib.sha256(expression.encode()).hexdigest()
+
+
+class StatsBatch:
+    """
+    Thread-safe buffer of evaluation outcomes not written to the rollup tables yet.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timer = None
+        self.clear()
+
+    def add(self, hour: datetime, status: str, expression: str, digest: str) -> bool:
+        """
+        Buffer one evaluation outcome, starting the timer that writes the batch if it was empty.
+
+        Args:
+            hour (datetime): Start of the hour of the outcome.
+            status (str): The outcome, SUCCESS or FAILED.
+            expression (str): The evaluated expression.
+            digest (str): expression_hash of the whole expression.
+
+        Returns: bool: Whether the batch is due to be written.
+        """
+        with self.lock:
+            if not self.size:
+                self.started = time.monotonic()
+            self.size += 1
+            self.hours[hour, status] += 1
+            self.expressions.setdefault(digest, [expression, 0])[1] += 1
+            due = self.size >= settings.STATS_BATCH_SIZE or (
+                time.monotonic() - self.started >= settings.STATS_BATCH_INTERVAL
+            )
+            if not due and self.timer is None:
+                self.schedule()
+            return due
+
+    def take(self) -> tuple:
+        """
+        Empty the batch.
+
+        Returns: tuple: Counts by hour and status, and expressions with their counts by digest.
+        """
+        with self.lock:
+            taken = self.hours, self.expressions
+            self.clear()
+            return taken
+
+    def restore(self, hours: Counter, expressions: dict) -> None:
+        """
+        Put back outcomes taken from the batch that could not be written.
+
+        Args:
+            hours (Counter): Counts by hour and status.
+            expressions (dict): Expressions with their counts by digest.
+        """
+        with self.lock:
+            if not self.size:
+                self.started = time.monotonic()
+            self.size += sum(hours.values())
+            self.hours.update(hours)
+            for digest, (expression, count) in expressions.items():
+                self.expressions.setdefault(digest, [expression, 0])[1] += count
+            if self.timer is None:
+                self.schedule()
+
+    def schedule(self) -> None:
+        # Called with the lock held.
+        self.timer = threading.Timer(settings.STATS_BATCH_INTERVAL, flush_pending_stats)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def clear(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.hours = Counter()
+        self.expressions = {}
+        self.size = 0
+        self.started = None
+
+
+@lru_cache(maxsize=None)
+def get_stats_batch() -> StatsBatch:
+    """
+    Return the process-wide batch of pending evaluation outcomes, written when the process exits.
+
+    Returns: StatsBatch: The shared batch.
+    """
+    atexit.register(flush_pending_stats)
+    return StatsBatch()
+
+
+def record_evaluation(expression: str, status: str, at: datetime = None, digest: str = None) -> None:
+    """
+    Add one evaluation outcome to the rollups, writing the pending batch when it is due.
+
+    Args:
+        expression (str): The evaluated expression.
+        status (str): The outcome, SUCCESS or FAILED.
+        at (datetime): When the outcome was recorded, defaults to now.
+        digest (str): expression_hash of the whole expression, when ``expression`` is only a prefix of it.
+    """
+    hour = (at or timezone.now()).replace(minute=0, second=0, microsecond=0)
+    if get_stats_batch().add(hour, status, expression, digest or expression_hash(expression)):
+        flush_stats()
+
+
+def flush_stats() -> None:
+    """
+    Write the pending evaluation outcomes of this process to the rollup tables.
+
+    Rows are updated in a fixed order, so that concurrent flushes cannot deadlock.
+    If the write fails, the outcomes are put back in the batch for the next flush.
+    """
+    batch = get_stats_batch()
+    hours, expressions = batch.take()
+    if not hours:
+        return
+    try:
+        with transaction.atomic():
+            for (hour, status), count in sorted(hours.items()):
+                increment_hourly_stats(hour, status, count)
+            for digest, (expression, count) in sorted(expressions.items()):
+                record_heavy_hitter(expression, digest, count)
+    except Exception:
+        batch.restore(hours, expressions)
+        raise
+
+
+def flush_pending_stats() -> None:
+    """
+    Write the pending outcomes from the batch timer or at exit, logging failures instead of raising.
+    """
+    try:
+        flush_stats()
+    except Exception:
+        logger.warning("Writing evaluation statistics failed.", exc_info=True)
+    finally:
+        # The timer thread's connection would otherwise stay open until the process exits.
+        connection.close()
+
+
+def increment_hourly_stats(hour: datetime, status: str, count: int = 1) -> None:
+    """
+    Add evaluations to the counter of an hour and outcome, creating it if needed.
+
+    Args:
+        hour (datetime): Start of the hour.
+        status (str): The outcome, SUCCESS or FAILED.
+        count (int): Number of evaluations.
+    """
+    counters = ExpressionHourlyStats.objects.filter(hour=hour, status=status)
+    if counters.update(count=F('count') + count):
+        return
+    try:
+        with transaction.atomic():
+            ExpressionHourlyStats.objects.create(hour=hour, status=status, count=count)
+    except IntegrityError:
+        # Another worker created the counter first.
+        counters.update(count=F('count') + count)
+
+
+def record_heavy_hitter(expression: str, digest: str = None, count: int = 1) -> None:
+    """
+    Count occurrences of an expression in the Space-Saving sketch.
+
+    The sketch keeps at most STATS_TOP_K counters. A new expression arriving when it is
+    full takes over the smallest counter and inherits its count as error bound, so any
+    expression more frequent than total / STATS_TOP_K is guaranteed to be tracked.
+
+    Args:
+        expression (str): The evaluated expression.
+        digest (str): expression_hash of the whole expression, when ``expression`` is only a prefix of it.
+        count (int): Number of occurrences.
+    """
+    digest = digest or expression_hash(expression)
+    counters = ExpressionHeavyHitter.objects.filter(expression_hash=digest)
+    if counters.update(count=F('count') + count):
+        return
+    with transaction.atomic():
+        if ExpressionHeavyHitter.objects.count() < settings.STATS_TOP_K:
+            try:
+                with transaction.atomic():
+                    ExpressionHeavyHitter.objects.create(expression_hash=digest, expression=expression, count=count)
+            except IntegrityError:
+                # Another worker started tracking the expression first.
+                counters.update(count=F('count') + count)
+            return
+        # Evictions lock the smallest counter, then look the expression up again since
+        # another worker may have started tracking it before the lock was granted.
+        smallest = ExpressionHeavyHitter.objects.select_for_update().order_by('count', 'id').first()
+        if counters.update(count=F('count') + count):
+            return
+        smallest.error = smallest.count
+        smallest.count += count
+        smallest.expression_hash = digest
+        smallest.expression = expression
+        try:
+            with transaction.atomic():
+                smallest.save(update_fields=['expression_hash', 'expression', 'count', 'error'])
+        except IntegrityError:
+            counters.update(count=F('count') + count)
+
+
+def get_stats(hours: int, top: int) -> dict:
+    """
+    Read the rollups for the last hours.
+
+    Only the rollup tables are queried, so the cost does not depend on the size of ExpressionHistory.
+    The outcomes pending in this process are written first.
+
+    Args:
+        hours (int): Number of hours to report, including the current one.
+        top (int): Number of most frequent expressions to report.
+
+    Returns: dict: Totals, success and failure rates, hourly volume, and top expressions.
+    """
+    flush_stats()
+    since = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+    hourly = {}
+    totals = {ExpressionHistory.Status.SUCCESS: 0, ExpressionHistory.Status.FAILED: 0}
+    for hour, status, count in (
+        ExpressionHourlyStats.objects.filter(hour__gte=since).order_by('hour').values_list('hour', 'status', 'count')
+    ):
+        hourly.setdefault(hour, dict.fromkeys(totals, 0))[status] = count
+        totals[status] = totals.get(status, 0) + count
+
+    total = sum(totals.values())
+    return {
+        'total': total,
+        'totals': totals,
+        'success_rate': totals[ExpressionHistory.Status.SUCCESS] / total if total else None,
+        'failure_rate': totals[ExpressionHistory.Status.FAILED] / total if total else None,
+        'hourly': [{'hour': hour, **counts} for hour, counts in hourly.items()],
+        'top_expressions': list(
+            ExpressionHeavyHitter.objects.order_by('-count', 'id').values('expression', 'count', 'error')[:top]
+        ),
+    }
+
+
+def rebuild_stats() -> None:
+    """
+    Recompute the rollup tables from the whole of ExpressionHistory.
+
+    Meant for backfilling existing data or repairing the rollups; it is the only
+    place that scans the history table.
+    """
+    evaluated = ExpressionHistory.objects.exclude(status=ExpressionHistory.Status.PENDING)
+    with transaction.atomic():
+        ExpressionHourlyStats.objects.all().delete()
+        ExpressionHourlyStats.objects.bulk_create(
+            ExpressionHourlyStats(hour=row['hour'], status=row['status'], count=row['count'])
+            for row in (
+                evaluated
+                # Outcomes are recorded at evaluated_at, which queued jobs set after created_at.
+                .annotate(hour=TruncHour(Coalesce('evaluated_at', 'created_at')))
+                .values('hour', 'status')
+                .annotate(count=Count('id'))
+                .order_by()
+            )
+        )
+        ExpressionHeavyHitter.objects.all().delete()
+        # Expressions are keyed like record_heavy_hitter keys them: uploaded and compressed rows
+        # only keep a prefix of the expression, and the digest of the whole of it.
+        ExpressionHeavyHitter.objects.bulk_create(
+            ExpressionHeavyHitter(expression_hash=row['digest'], expression=row['text'], count=row['count'])
+            for row in (
+                evaluated
+                .annotate(digest=Coalesce('expression_hash', SHA256('expression'), output_field=CharField()))
+                .values('digest')
+                .annotate(text=Min('expression'), count=Count('id'))
+                .order_by('-count')[:settings.STATS_TOP_K]
+            )
+        )
@@ -0,0 +1,379 @@
+"""
+Streaming evaluation of very large expressions.
+
+StreamingEvaluator consumes an expression in chunks, as read from the request
+body, without ever holding it whole: chunks are decoded incrementally, split
+into tokens and evaluated on the fly with operator-precedence (shunting-yard)
+stacks. Memory is bounded by the chunk size, the longest token and the number
+of pending operators (open parentheses, right-associative ``**`` chains and
+repeated signs) instead of the expression size. The grammar follows ExpressionEvaluator
+and SyntaxValidator, signs included, except inside abs(): ExpressionEvaluator
+evals the text of its argument without validating it, while streamed arguments
+are validated like the rest. As with eval, a syntax error anywhere in the
+expression takes precedence over an evaluation error.
+"""
+import re
+import codecs
+import hashlib
+import operator
+
+from error_messages import SyntaxErrorMessages, UploadErrorMessages
+
+# Leading whitespace is consumed with each token; 'end' matches trailing whitespace.
+TOKEN = re.compile(
+    r"\s*(?:(?P<number>\d+\.?\d*|\.\d+)|(?P<operator>\*\*|//|[-+*/])|(?P<paren>[()])"
+    r"|(?P<name>[A-Za-z_]\w*)|(?P<quote>')|(?P<other>.)|(?P<end>\Z))",
+    re.S,
+)
+# Tokens that may continue in the next chunk, besides a '.' starting a number.
+OPEN_ENDED = {'number', 'operator', 'name'}
+
+BINARY_OPERATORS = {
+    '+': (1, operator.add),
+    '-': (1, operator.sub),
+    '*': (2, operator.mul),
+    '/': (2, operator.truediv),
+    '//': (2, operator.floordiv),
+    '**': (4, operator.pow),
+}
+UNARY_OPERATORS = {'u+': (3, operator.pos), 'u-': (3, operator.neg)}
+RIGHT_ASSOCIATIVE = {'**'}
+# Markers of opened parentheses on the operator stack.
+PAREN, ABS = '(', 'abs('
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised as soon as a streamed expression exceeds the maximum size.
+    """
+
+
+class StreamingEvaluator:
+    """
+    Incremental tokenizer and evaluator for streamed expressions.
+    """
+
+    def __init__(self, max_size: int, max_token: int, max_depth: int, max_pending: int, prefix_length: int):
+        """
+        Initialize the evaluator.
+
+        Args:
+            max_size (int): Maximum size of the expression in bytes.
+            max_token (int): Maximum length of a number or name, bounding the carried-over buffer.
+            max_depth (int): Maximum nesting of parentheses.
+            max_pending (int): Maximum number of operators and parentheses awaiting evaluation, bounding the stacks.
+            prefix_length (int): Number of leading characters kept in ``prefix``.
+        """
+        self.max_size = max_size
+        self.max_token = max_token
+        self.max_depth = max_depth
+        self.max_pending = max_pending
+        self.prefix_length = prefix_length
+
+        self.size = 0
+        self.prefix = ''
+        self.digest = hashlib.sha256()
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.carry = ''
+
+        self.values = []
+        self.operators = []
+        self.depth = 0
+        self.expect_operand = True
+        self.previous = None
+        self.previous_operator = None
+        # Progress through len('...'): None, 'len', 'open', 'literal' or 'close'.
+        self.len_state = None
+        self.literal_length = 0
+        self.literal_spaces = 0
+        self.literal_started = False
+        self.abs_pending = False
+        self.error = None
+
+    def consume(self, stream, chunk_size: int) -> str:
+        """
+        Read and evaluate a whole stream.
+
+        After a syntax error the rest of the stream is still read, only to complete
+        ``size`` and ``hexdigest``.
+
+        Args:
+            stream: File-like object to read the expression from, or None if it is empty.
+            chunk_size (int): Number of bytes read at a time.
+
+        Returns: str: The result of the evaluation.
+
+        Raises: Same as feed and finish.
+        """
+        error = None
+        for chunk in iter(lambda: stream.read(chunk_size), b'') if stream is not None else ():
+            if error is None:
+                try:
+                    self.feed(chunk)
+                except UploadTooLarge:
+                    raise
+                except Exception as e:
+                    error = e
+            else:
+                self.hash(chunk)
+        if error is not None:
+            raise error
+        return self.finish()
+
+    def hash(self, data: bytes) -> None:
+        """
+        Account for a chunk in ``size`` and ``hexdigest`` only.
+
+        Args: data (bytes): The chunk.
+
+        Raises: UploadTooLarge: If the expression exceeds the maximum size.
+        """
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadTooLarge(UploadErrorMessages.TOO_LARGE.format(self.max_size))
+        self.digest.update(data)
+
+    def feed(self, data: bytes) -> None:
+        """
+        Consume the next chunk of the expression.
+
+        Args: data (bytes): The chunk, in UTF-8.
+
+        Raises:
+            UploadTooLarge: If the expression exceeds the maximum size.
+            SyntaxError, ValueError: If the expression is invalid.
+        """
+        self.hash(data)
+        self.scan(self.decode(data, final=False), final=False)
+
+    def finish(self) -> str:
+        """
+        Consume the end of the expression and return its result.
+
+        Returns: str: The result of the evaluation.
+
+        Raises:
+            SyntaxError, ValueError: If the expression is invalid.
+            Exception: If the evaluation failed.
+        """
+        self.scan(self.decode(b'', final=True), final=True)
+        if self.len_state is not None:
+            raise ValueError(SyntaxErrorMessages.LEN_ERROR)
+        if self.previous is None:
+            raise SyntaxError(UploadErrorMessages.EMPTY_EXPRESSION)
+        if self.expect_operand:
+            raise SyntaxError(SyntaxErrorMessages.ENDS_WITH_OPERATOR)
+        self.reduce_until(lambda entry: entry in (PAREN, ABS))
+        if self.operators:
+            raise SyntaxError(SyntaxErrorMessages.MISMATCHED_PARENTHESES)
+        if self.error is not None:
+            raise self.error
+        return str(self.values[0])
+
+    @property
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+    def decode(self, data: bytes, final: bool) -> str:
+        try:
+            text = self.decoder.decode(data, final)
+        except UnicodeDecodeError:
+            raise SyntaxError(UploadErrorMessages.INVALID_ENCODING)
+        if len(self.prefix) < self.prefix_length:
+            self.prefix += text[:self.prefix_length - len(self.prefix)]
+        return text
+
+    def scan(self, text: str, final: bool) -> None:
+        """
+        Tokenize text, carrying a token that may continue over to the next chunk.
+
+        Args:
+            text (str): The decoded text.
+            final (bool): Whether this is the end of the expression.
+        """
+        buffer, self.carry = self.carry + text, ''
+        position = 0
+        while position < len(buffer):
+            if self.len_state == 'literal':
+                end = buffer.find("'", position)
+                self.count_literal(buffer[position:] if end < 0 else buffer[position:end])
+                if end < 0:
+                    return
+                self.len_state = 'close'
+                position = end + 1
+                continue
+
+            match = TOKEN.match(buffer, position)
+            kind = match.lastgroup
+            start = match.start(kind)
+            if start > position and self.len_state is not None:
+                raise ValueError(SyntaxErrorMessages.LEN_ERROR)
+            if kind == 'end':
+                return
+            value = match.group(kind)
+            if not final and match.end() == len(buffer) and (kind in OPEN_ENDED or value == '.'):
+                self.carry = value
+                if len(value) > self.max_token:
+                    raise SyntaxError(UploadErrorMessages.TOKEN_TOO_LONG.format(self.max_token))
+                return
+            self.token(kind, value)
+            position = match.end()
+
+    def count_literal(self, segment: str) -> None:
+        """
+        Count the characters of a len() literal, stripped like ExpressionEvaluator.handle_len_operator.
+
+        Args: segment (str): The next part of the literal.
+        """
+        if not self.literal_started:
+            segment = segment.lstrip()
+            self.literal_started = bool(segment)
+        core = segment.rstrip()
+        if core:
+            self.literal_length += self.literal_spaces + len(core)
+            self.literal_spaces = len(segment) - len(core)
+        else:
+            self.literal_spaces += len(segment)
+
+    def token(self, kind: str, value: str) -> None:
+        if self.len_state is not None:
+            self.len_token(kind, value)
+            return
+        if self.abs_pending:
+            if value != '(':
+                raise SyntaxError(SyntaxErrorMessages.INVALID_CHARACTER.format('a'))
+            self.abs_pending = False
+            self.open_paren(ABS)
+            return
+
+        if kind == 'number':
+            self.number(value)
+        elif kind == 'operator':
+            self.operator(value)
+        elif value == '(':
+            self.open_paren(PAREN)
+        elif value == ')':
+            self.close_paren()
+        elif value in ('len', 'abs'):
+            if not self.expect_operand:
+                raise SyntaxError(SyntaxErrorMessages.MISSING_OPERATOR)
+            if value == 'len':
+                self.len_state = 'len'
+            else:
+                self.abs_pending = True
+        else:
+            raise SyntaxError(SyntaxErrorMessages.INVALID_CHARACTER.format(value[0]))
+
+    def len_token(self, kind: str, value: str) -> None:
+        """
+        Follow len('...'), which like ExpressionEvaluator allows no spaces outside the quotes.
+        """
+        if self.len_state == 'len' and value == '(':
+            self.len_state = 'open'
+        elif self.len_state == 'open' and kind == 'quote':
+            self.len_state, self.literal_length, self.literal_spaces, self.literal_started = 'literal', 0, 0, False
+        elif self.len_state == 'close' and value == ')':
+            self.len_state = None
+            self.push_operand(self.literal_length)
+        else:
+            raise ValueError(SyntaxErrorMessages.LEN_ERROR)
+
+    def number(self, value: str) -> None:
+        if len(value) > self.max_token:
+            raise SyntaxError(UploadErrorMessages.TOKEN_TOO_LONG.format(self.max_token))
+        if not self.expect_operand:
+            raise SyntaxError(SyntaxErrorMessages.MISSING_OPERATOR)
+        if '.' in value:
+            self.push_operand(float(value))
+        elif len(value) > 1 and value[0] == '0' and value.strip('0'):
+            raise SyntaxError(UploadErrorMessages.LEADING_ZEROS)
+        else:
+            self.push_operand(int(value))
+
+    def push_operand(self, value) -> None:
+        self.values.append(value)
+        self.expect_operand = False
+        self.previous = 'operand'
+
+    def operator(self, symbol: str) -> None:
+        if self.expect_operand:
+            # Like ExpressionEvaluator, signs may start an operand, or follow another '+' or '-'.
+            if symbol in '+-' and (self.previous in (None, '(') or self.previous_operator in ('+', '-')):
+                self.push_operator('u' + symbol)
+                self.previous_operator = symbol
+            elif self.previous == 'operator':
+                raise SyntaxError(SyntaxErrorMessages.INVALID_CONSECUTIVE_OPERATORS)
+            else:
+                raise SyntaxError(UploadErrorMessages.INVALID_SYNTAX)
+            self.previous = 'operator'
+            return
+
+        precedence = BINARY_OPERATORS[symbol][0]
+        right = symbol in RIGHT_ASSOCIATIVE
+        self.reduce_until(
+            lambda entry: entry in (PAREN, ABS) or self.precedence(entry) < precedence
+            or (right and self.precedence(entry) == precedence)
+        )
+        self.push_operator(symbol)
+        self.expect_operand = True
+        self.previous = 'operator'
+        self.previous_operator = symbol
+
+    def push_operator(self, entry: str) -> None:
+        if len(self.operators) >= self.max_pending:
+            raise SyntaxError(UploadErrorMessages.TOO_MANY_PENDING.format(self.max_pending))
+        self.operators.append(entry)
+
+    @staticmethod
+    def precedence(entry: str) -> int:
+        return (BINARY_OPERATORS.get(entry) or UNARY_OPERATORS[entry])[0]
+
+    def open_paren(self, marker: str) -> None:
+        if not self.expect_operand:
+            raise SyntaxError(SyntaxErrorMessages.MISSING_OPERATOR)
+        self.depth += 1
+        if self.depth > self.max_depth:
+            raise SyntaxError(UploadErrorMessages.TOO_DEEP.format(self.max_depth))
+        self.push_operator(marker)
+        self.previous = '('
+
+    def close_paren(self) -> None:
+        if self.expect_operand:
+            if self.previous != '(':
+                raise SyntaxError(UploadErrorMessages.INVALID_SYNTAX)
+            if self.operators and self.operators[-1] == ABS:
+                raise ValueError(SyntaxErrorMessages.EMPTY_ARGUMENT_ABS)
+            raise SyntaxError(SyntaxErrorMessages.EMPTY_PARENTHESES)
+        self.reduce_until(lambda entry: entry in (PAREN, ABS))
+        if not self.operators:
+            raise SyntaxError(SyntaxErrorMessages.MISMATCHED_PARENTHESES)
+        if self.operators.pop() == ABS:
+            self.apply(abs, 1)
+        self.depth -= 1
+        self.previous = ')'
+
+    def reduce_until(self, stop) -> None:
+        """
+        Apply stacked operators until ``stop`` accepts the top of the operator stack.
+        """
+        while self.operators and not stop(self.operators[-1]):
+            entry = self.operators.pop()
+            if entry in UNARY_OPERATORS:
+                self.apply(UNARY_OPERATORS[entry][1], 1)
+            else:
+                self.apply(BINARY_OPERATORS[entry][1], 2)
+
+    def apply(self, function, arity: int) -> None:
+        """
+        Apply a function to the top values; after the first failure only the syntax is checked.
+        """
+        arguments = self.values[-arity:]
+        del self.values[-arity:]
+        if self.error is not None:
+            self.values.append(None)
+            return
+        try:
+            self.values.append(function(*arguments))
+        except Exception as e:
+            self.error = e
+            self.values.append(None)
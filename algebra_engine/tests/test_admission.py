@@ -0,0 +1,155 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from AlgebraAPI.settings import env_flag
+from algebra_engine.admission import charge, evaluation_cost, get_bucket, get_usage
+from algebra_engine.jobs import process_next_job
+from algebra_engine.models import AdmissionClient
+
+ADMISSION_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'admission': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'admission-tests'},
+}
+
+
+@override_settings(
+    CACHES=ADMISSION_CACHES, ADMISSION_CONTROL=True, ADMISSION_CAPACITY=10,
+    ADMISSION_REFILL_RATE=5, ADMISSION_BASE_COST=1, ADMISSION_COST_PER_KB=1,
+)
+class EvaluationCostThrottleTest(APITestCase):
+    """
+    Test suite for cost-weighted admission control in front of ExpressionInput.
+    """
+
+    def setUp(self):
+        caches['admission'].clear()
+        self.url = reverse('algebra_engine:expression-input')
+
+    def test_evaluation_cost(self):
+        self.assertAlmostEqual(evaluation_cost('x' * 2048, 0.004), 1 + 4 + 2)
+
+    def test_over_budget_client_rejected_with_retry_after(self):
+        charge('127.0.0.1', '2 + 2', 0.015)
+        response = self.client.post(self.url, {'expression': '2+2'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_other_clients_unaffected(self):
+        charge('10.0.0.1', '2 + 2', 0.015)
+        response = self.client.post(self.url, {'expression': '2+2'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_evaluation_charges_client(self):
+        self.client.post(self.url, {'expression': '2+2'})
+        self.client.post(self.url, {'expression': '2*/2'})
+        usage = get_usage()['127.0.0.1']
+        self.assertEqual(usage['requests'], 2)
+        self.assertGreater(usage['charged'], 2)
+        self.assertLess(usage['tokens'], 10)
+
+    def test_forwarded_for_header_is_not_trusted(self):
+        for index in range(3):
+            self.client.post(self.url, {'expression': '2+2'}, HTTP_X_FORWARDED_FOR=f'203.0.113.{index}')
+        usage = get_usage()
+        self.assertEqual(list(usage), ['127.0.0.1'])
+        self.assertEqual(usage['127.0.0.1']['requests'], 3)
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_forwarded_for_header_behind_proxy(self):
+        self.client.post(self.url, {'expression': '2+2'}, HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.1')
+        self.assertEqual(list(get_usage()), ['203.0.113.1'])
+
+    def test_rejections_are_counted(self):
+        charge('127.0.0.1', '2 + 2', 0.015)
+        self.client.post(self.url, {'expression': '2+2'})
+        self.assertEqual(get_usage()['127.0.0.1']['rejected'], 1)
+
+    def test_bucket_refills(self):
+        charge('127.0.0.1', '2 + 2', 0.009)
+        bucket = caches['admission'].get('admission:bucket:127.0.0.1')
+        bucket['updated'] = time.time() - 1
+        caches['admission'].set('admission:bucket:127.0.0.1', bucket)
+        self.assertAlmostEqual(get_bucket('127.0.0.1')['tokens'], 5, places=1)
+
+    def test_job_submission_rejected_over_budget(self):
+        charge('127.0.0.1', '2 + 2', 0.015)
+        response = self.client.post(reverse('algebra_engine:expression-job-input'), {'expression': '2+2'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_job_evaluation_charges_client(self):
+        self.client.post(reverse('algebra_engine:expression-job-input'), {'expression': '2+2'})
+        self.assertEqual(get_usage(), {})
+        process_next_job()
+        self.assertEqual(get_usage()['127.0.0.1']['requests'], 1)
+
+    def test_prepared_registration_charges_client(self):
+        url = reverse('algebra_engine:prepared-expression-input')
+        response = self.client.post(url, {'template': 'abs(2 - 5) * {x}'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(get_usage()['127.0.0.1']['requests'], 1)
+        charge('127.0.0.1', '2 + 2', 0.015)
+        response = self.client.post(url, {'template': '{x} + 1'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(ADMISSION_CONTROL=False)
+    def test_disabled(self):
+        charge('127.0.0.1', '2 + 2', 1)
+        response = self.client.post(self.url, {'expression': '2+2'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_charges_read_no_client_index(self):
+        charge('127.0.0.1', '2 + 2', 0.001)
+        self.assertEqual(list(AdmissionClient.objects.values_list('client', flat=True)), ['127.0.0.1'])
+        with self.assertNumQueries(0):
+            charge('127.0.0.1', '2 + 2', 0.001)
+        self.assertEqual(get_bucket('127.0.0.1')['requests'], 2)
+
+    @override_settings(ADMISSION_LIST_INTERVAL=0)
+    def test_clients_listed_again_after_interval(self):
+        charge('127.0.0.1', '2 + 2', 0.001)
+        seen_at = AdmissionClient.objects.get().seen_at
+        charge('127.0.0.1', '2 + 2', 0.001)
+        self.assertGreater(AdmissionClient.objects.get().seen_at, seen_at)
+
+    def test_usage_drops_expired_clients(self):
+        charge('10.0.0.1', '2 + 2', 0.001)
+        AdmissionClient.objects.create(client='10.0.0.2', seen_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(list(get_usage()), ['10.0.0.1'])
+        self.assertFalse(AdmissionClient.objects.filter(client='10.0.0.2').exists())
+
+
+class AdmissionCacheIsolationTest(SimpleTestCase):
+    """
+    Test suite for the admission cache used by the rest of the test suite.
+    """
+
+    def test_buckets_kept_away_from_the_host_cache(self):
+        cache = settings.CACHES[settings.ADMISSION_CACHE]
+        self.assertEqual(cache['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        self.assertEqual(cache['LOCATION'], 'algebra_api_admission_tests')
+
+
+class EnvFlagTest(SimpleTestCase):
+    """
+    Test suite for boolean settings read from the environment, such as ADMISSION_CONTROL.
+    """
+
+    def test_values(self):
+        cases = (('True', True), ('yes', True), ('1', True), ('False', False), ('', False), ('0', False))
+        for value, expected in cases:
+            with mock.patch.dict('os.environ', {'ADMISSION_CONTROL': value}):
+                self.assertIs(env_flag('ADMISSION_CONTROL', True), expected)
+
+    def test_default(self):
+        with mock.patch.dict('os.environ', clear=True):
+            self.assertIs(env_flag('ADMISSION_CONTROL', True), True)
+            self.assertIs(env_flag('ADMISSION_CONTROL', False), False)
@@ -0,0 +1,119 @@
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from algebra_engine.jobs import evaluate_record
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.canonical import canonical_hash, canonicalize
+from algebra_engine.corpus import Corpus
+
+
+class CanonicalizeTest(TestCase):
+    """
+    Test suite for canonical forms of expressions.
+    """
+
+    def assertEquivalent(self, *expressions):
+        forms = {canonicalize(expression) for expression in expressions}
+        self.assertEqual(len(forms), 1, forms)
+
+    def assertDistinct(self, *expressions):
+        forms = {canonicalize(expression) for expression in expressions}
+        self.assertEqual(len(forms), len(expressions), forms)
+
+    def test_spacing_and_redundant_parentheses(self):
+        self.assertEqual(canonicalize("((2)+(3 *4))"), "2 + 3 * 4")
+        self.assertEquivalent("2 ** 3 ** 2", "2**(3**2)")
+        self.assertEquivalent("-2 ** 2", "-(2 ** 2)")
+
+    def test_needed_parentheses_are_kept(self):
+        self.assertEqual(canonicalize("(2 + 3) * 4"), "(2 + 3) * 4")
+        self.assertEqual(canonicalize("(2 ** 3) ** 2"), "(2 ** 3) ** 2")
+        self.assertEqual(canonicalize("(-2) ** 2"), "(-2) ** 2")
+        self.assertEqual(canonicalize("3 * (7 // 2)"), "3 * (7 // 2)")
+        self.assertDistinct("7 // 2 * 3", "7 // (2 * 3)")
+
+    def test_integer_chains_are_sorted(self):
+        self.assertEquivalent("1 + 2 + 3", "3 + (2 + 1)", "2 + 3 + 1")
+        self.assertEquivalent("2 * 3 * 4", "4 * (3 * 2)")
+        self.assertEquivalent("5 - 3 + 1", "1 - (3 - 5)", "5 + -3 + 1")
+        self.assertEquivalent("-2 * 3", "2 * -3", "-(3 * 2)")
+
+    def test_float_operands_are_only_swapped(self):
+        self.assertEquivalent("0.1 + 0.2", "0.2 + 0.1")
+        self.assertEquivalent("(0.1 + 0.2) + 0.3", "0.3 + (0.2 + 0.1)")
+        # Float addition is not associative.
+        self.assertDistinct("(0.1 + 0.2) + 0.3", "0.1 + (0.2 + 0.3)")
+        self.assertDistinct("(2 ** -1 + 1) + 1", "2 ** -1 + (1 + 1)")
+
+    def test_types_are_kept(self):
+        self.assertDistinct("1", "1.0", "2 / 2")
+        self.assertEquivalent("1.50", "1.5")
+
+    def test_len_literals_are_folded(self):
+        self.assertEquivalent("len('abc') * 2", "2 * 3", "len(' abc ') * len('xy')")
+
+    def test_signs(self):
+        self.assertEquivalent("--3", "+3", "3")
+        self.assertEquivalent("-7 // 2", "(-7) // 2")
+        self.assertDistinct("-7 // 2", "-(7 // 2)")
+
+    def test_rewrites_keep_values(self):
+        corpus = Corpus(200, seed=1)
+        for expression in corpus.requests(500):
+            form = canonicalize(expression)
+            namespace = {'__builtins__': {'len': len}}
+            try:
+                expected = eval(expression, namespace)
+            except ZeroDivisionError:
+                continue
+            self.assertEqual(repr(eval(form, namespace)), repr(expected), (expression, form))
+
+    def test_unsupported_expressions(self):
+        for expression in ("2 +", "x + 1", "len(3)", "2 @ 3", "1j"):
+            with self.subTest(expression=expression), self.assertRaises(ValueError):
+                canonicalize(expression)
+        self.assertIsNone(canonical_hash("x + 1"))
+
+    @override_settings(CANONICAL_MAX_LENGTH=10)
+    def test_long_expressions_are_skipped(self):
+        self.assertIsNone(canonical_hash("1 + 2 + 3 + 4"))
+
+
+@override_settings(ADMISSION_CONTROL=False)
+class CanonicalHashHistoryTest(TestCase):
+    """
+    Test suite for recording canonical hashes in the history.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_equivalent_evaluations_share_the_hash(self):
+        for expression in ("2 * (3 + 4)", "(4+3)*2"):
+            self.client.post(reverse('algebra_engine:expression-input'), {'expression': expression}, format='json')
+        hashes = set(ExpressionHistory.objects.values_list('canonical_hash', flat=True))
+        self.assertEqual(hashes, {canonical_hash("2 * (3 + 4)")})
+
+    def test_failed_evaluations(self):
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "1 / 0"}, format='json')
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "2 +"}, format='json')
+        self.assertEqual(
+            list(ExpressionHistory.objects.order_by('id').values_list('canonical_hash', flat=True)),
+            [canonical_hash("1 / 0"), None],
+        )
+
+    def test_prepared_evaluations_are_not_canonicalized(self):
+        response = self.client.post(
+            reverse('algebra_engine:prepared-expression-input'), {'template': "{x} + 1"}, format='json'
+        )
+        self.client.post(
+            reverse('algebra_engine:prepared-expression-evaluate', args=[response.data['id']]),
+            {'parameters': [{'x': 1}]}, format='json',
+        )
+        self.assertIsNone(ExpressionHistory.objects.get().canonical_hash)
+
+    def test_jobs(self):
+        record = evaluate_record(ExpressionHistory.objects.create(expression="3 + 2"))
+        record.refresh_from_db()
+        self.assertEqual(record.canonical_hash, canonical_hash("2 + 3"))
@@ -0,0 +1,75 @@
+import hashlib
+
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.test import APIClient
+
+from algebra_engine.jobs import evaluate_record
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.compression import get_codec, history_fields
+
+BIG_EXPRESSION = " + ".join(["2 ** 4000"] * 200)
+BIG_RESULT = str(200 * 2 ** 4000)
+
+
+@override_settings(
+    HISTORY_COMPRESSION='zlib', HISTORY_COMPRESSION_MIN_SIZE=1000, HISTORY_PREVIEW_LENGTH=20, ADMISSION_CONTROL=False
+)
+class CompressedHistoryTest(TestCase):
+    """
+    Test suite for compressed storage of large history values.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_small_values_stay_plain(self):
+        self.assertEqual(history_fields(expression="2 + 2", result="4"), {'expression': "2 + 2", 'result': "4"})
+
+    def test_large_values_are_compressed(self):
+        fields = history_fields(expression=BIG_EXPRESSION, result=BIG_RESULT)
+        self.assertEqual(fields['expression'], BIG_EXPRESSION[:20])
+        self.assertEqual(fields['result'], BIG_RESULT[:20])
+        self.assertEqual(fields['compression'], 'zlib')
+        self.assertEqual(fields['expression_hash'], hashlib.sha256(BIG_EXPRESSION.encode()).hexdigest())
+        self.assertEqual(fields['input_size'], len(BIG_EXPRESSION))
+        self.assertLess(len(fields['expression_data']), len(BIG_EXPRESSION) // 10)
+
+    def test_evaluation_is_stored_compressed(self):
+        response = self.client.post(reverse('algebra_engine:expression-input'), {'expression': BIG_EXPRESSION})
+        self.assertEqual(response.data, {"result": BIG_RESULT})
+
+        listed = self.client.get(reverse('algebra_engine:expression-history')).data[0]
+        self.assertEqual((listed['expression'], listed['result']), (BIG_EXPRESSION[:20], BIG_RESULT[:20]))
+
+        detail = self.client.get(reverse('algebra_engine:expression-history-detail', args=[listed['id']])).data
+        self.assertEqual((detail['expression'], detail['result']), (BIG_EXPRESSION, BIG_RESULT))
+
+    def test_values_are_decompressed_on_demand(self):
+        record = ExpressionHistory.objects.create(**history_fields(expression=BIG_EXPRESSION), status="FAILED")
+        record = ExpressionHistory.objects.defer('expression_data').get(pk=record.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(record.full_expression, BIG_EXPRESSION)
+            self.assertEqual(record.full_expression, BIG_EXPRESSION)
+        self.assertIsNone(record.full_result)
+
+    def test_compressed_job(self):
+        record = ExpressionHistory.objects.create(**history_fields(expression=BIG_EXPRESSION))
+        evaluate_record(record)
+        record = ExpressionHistory.objects.get(pk=record.pk)
+        self.assertEqual(record.status, ExpressionHistory.Status.SUCCESS)
+        self.assertEqual(record.full_result, BIG_RESULT)
+
+    def test_admin_list_shows_previews(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        ExpressionHistory.objects.create(**history_fields(expression=BIG_EXPRESSION, result=BIG_RESULT))
+        response = self.client.get(reverse('admin:algebra_engine_expressionhistory_changelist'))
+        self.assertContains(response, BIG_RESULT[:20])
+        self.assertNotContains(response, BIG_RESULT[:21])
+
+    @override_settings(HISTORY_COMPRESSION='lz4')
+    def test_unknown_codec(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_codec('lz4')
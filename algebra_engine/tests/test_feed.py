@@ -0,0 +1,154 @@
+import threading
+
+from django.urls import reverse
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from algebra_engine.feed import RecentFeed, get_recent_feed
+from algebra_engine.jobs import process_next_job
+from algebra_engine.models import ExpressionHistory
+
+
+def create_records(count: int, status_: str = "SUCCESS") -> list:
+    return [
+        ExpressionHistory.objects.create(expression=f"{i} + 1", result=str(i + 1), status=status_) for i in range(count)
+    ]
+
+
+class RecentFeedTest(TestCase):
+    """
+    Test suite for the ring buffer of recent evaluations.
+    """
+
+    def test_seeded_from_the_latest_evaluations(self):
+        records = create_records(5)
+        ExpressionHistory.objects.create(expression="2 + 2")
+        entries, cursor = RecentFeed(3).read()
+        self.assertEqual([entry['id'] for entry in entries], [record.id for record in records[-3:]])
+        self.assertEqual(cursor, records[-1].id)
+
+    def test_published_records_are_read_after_the_cursor(self):
+        feed = RecentFeed(10)
+        feed.seed()
+        first, second = create_records(2)
+        feed.publish(second, first)
+        with self.assertNumQueries(0):
+            entries, cursor = feed.read(since=first.id)
+        self.assertEqual(entries, [feed.encode(second)])
+        self.assertEqual(cursor, second.id)
+        self.assertEqual(feed.read(since=second.id), ([], second.id))
+
+    def test_buffer_is_bounded(self):
+        feed = RecentFeed(3)
+        feed.seed()
+        records = create_records(5)
+        feed.publish(*records)
+        self.assertEqual([entry['id'] for entry in feed.entries], [record.id for record in records[-3:]])
+
+    def test_dropped_records_are_read_from_the_database(self):
+        feed = RecentFeed(2)
+        feed.seed()
+        records = create_records(5)
+        feed.publish(*records)
+        entries, cursor = feed.read(since=records[0].id, limit=2)
+        self.assertEqual([entry['id'] for entry in entries], [record.id for record in records[1:3]])
+        self.assertEqual(cursor, records[2].id)
+
+    def test_records_of_other_processes_are_read_from_the_database(self):
+        feed = RecentFeed(10)
+        feed.seed()
+        first, other, last = create_records(3)
+        feed.publish(first, last)
+        with self.assertNumQueries(1):
+            entries, cursor = feed.read(since=first.id)
+        self.assertEqual([entry['id'] for entry in entries], [other.id, last.id])
+        self.assertEqual(cursor, last.id)
+
+    def test_latest_records_of_other_processes_are_read_from_the_database(self):
+        feed = RecentFeed(10)
+        feed.seed()
+        first, other, last = create_records(3)
+        feed.publish(first, last)
+        with self.assertNumQueries(1):
+            entries, cursor = feed.read()
+        self.assertEqual([entry['id'] for entry in entries], [first.id, other.id, last.id])
+        self.assertEqual(cursor, last.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(feed.read(limit=1), ([feed.encode(last)], last.id))
+
+    def test_cursor_ahead_of_the_buffer_is_read_from_the_database(self):
+        feed = RecentFeed(10)
+        feed.seed()
+        records = create_records(3)
+        with self.assertNumQueries(1):
+            entries, cursor = feed.read(since=records[0].id)
+        self.assertEqual([entry['id'] for entry in entries], [record.id for record in records[1:]])
+
+    def test_unsaved_records_are_skipped(self):
+        feed = RecentFeed(10)
+        feed.publish(ExpressionHistory(expression="2 + 2", result="4", status="SUCCESS"))
+        self.assertEqual(len(feed.entries), 0)
+
+
+class RecentFeedLongPollTest(TransactionTestCase):
+    """
+    Test suite for long polling the feed.
+    """
+
+    def test_waiting_reader_is_woken_up(self):
+        feed = RecentFeed(10)
+        feed.seed()
+        record, = create_records(1)
+        timer = threading.Timer(0.1, feed.publish, [record])
+        timer.start()
+        entries, cursor = feed.read(since=0, wait=5)
+        timer.join()
+        self.assertEqual(cursor, record.id)
+        self.assertEqual(len(entries), 1)
+
+    def test_wait_runs_out(self):
+        feed = RecentFeed(10)
+        self.assertEqual(feed.read(since=0, wait=0.05), ([], 0))
+
+
+@override_settings(ADMISSION_CONTROL=False)
+class RecentExpressionsViewTest(TestCase):
+    """
+    Test suite for the recent evaluations endpoint.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        get_recent_feed().clear()
+
+    def tearDown(self):
+        get_recent_feed().clear()
+
+    def test_evaluations_are_published(self):
+        response = self.client.get(reverse('algebra_engine:expression-recent'))
+        cursor = response.data['cursor']
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "2 + 2"}, format='json')
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "2 +"}, format='json')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('algebra_engine:expression-recent'), {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['status'] for entry in response.data['results']], ["SUCCESS", "FAILED"])
+        self.assertEqual(response.data['results'][0]['result'], "4")
+        self.assertEqual(response.data['cursor'], ExpressionHistory.objects.latest('id').id)
+
+    def test_job_results_are_published(self):
+        response = self.client.post(reverse('algebra_engine:expression-job-input'), {'expression': "3 * 3"})
+        process_next_job()
+        entries, cursor = get_recent_feed().read(since=response.data['id'] - 1)
+        self.assertEqual([(entry['id'], entry['result']) for entry in entries], [(response.data['id'], "9")])
+
+    def test_limit_returns_the_latest_records(self):
+        records = create_records(3)
+        response = self.client.get(reverse('algebra_engine:expression-recent'), {'limit': 2})
+        self.assertEqual([entry['id'] for entry in response.data['results']], [record.id for record in records[1:]])
+
+    def test_invalid_query(self):
+        response = self.client.get(reverse('algebra_engine:expression-recent'), {'wait': 3600})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
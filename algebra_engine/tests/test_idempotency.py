@@ -0,0 +1,93 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from algebra_engine import idempotency
+from algebra_engine.stats import expression_hash
+from algebra_engine.models import ExpressionHistory, IdempotencyRecord
+
+
+@override_settings(ADMISSION_CONTROL=False)
+class IdempotencyKeyTest(TestCase):
+    """
+    Test suite for Idempotency-Key support on ExpressionInput.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def post(self, expression, key='retry-1'):
+        return self.client.post(
+            reverse('algebra_engine:expression-input'), {'expression': expression}, HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def in_flight(self, expression, key='retry-1', age=0):
+        now = timezone.now()
+        return IdempotencyRecord.objects.create(
+            client='127.0.0.1', key=key, request_hash=expression_hash(expression),
+            created_at=now - timedelta(seconds=age), expires_at=now + timedelta(hours=1),
+        )
+
+    def test_duplicate_replays_response(self):
+        first = self.post("2 + 2")
+        second = self.post("2 + 2")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((second.status_code, second.data), (first.status_code, first.data))
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(ExpressionHistory.objects.count(), 1)
+
+    def test_failed_evaluation_is_replayed(self):
+        self.post("2 +* 2")
+        response = self.post("2 +* 2")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ExpressionHistory.objects.count(), 1)
+
+    def test_different_keys_evaluate(self):
+        self.post("2 + 2", key='a')
+        self.post("2 + 2", key='b')
+        self.assertEqual(ExpressionHistory.objects.count(), 2)
+
+    def test_key_reused_with_other_expression(self):
+        self.post("2 + 2")
+        response = self.post("3 + 3")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(ExpressionHistory.objects.count(), 1)
+
+    def test_expired_key_evaluates_again(self):
+        self.post("2 + 2")
+        IdempotencyRecord.objects.update(expires_at=timezone.now())
+        self.assertNotIn('Idempotent-Replayed', self.post("2 + 2"))
+        self.assertEqual(ExpressionHistory.objects.count(), 2)
+
+    def test_concurrent_duplicate_waits_for_response(self):
+        record = self.in_flight("2 + 2")
+
+        def finish_first_request(seconds):
+            idempotency.complete(record, 201, {"result": "4"})
+
+        with mock.patch('algebra_engine.idempotency.time.sleep', side_effect=finish_first_request) as sleep:
+            response = self.post("2 + 2")
+        sleep.assert_called_once()
+        self.assertEqual((response.status_code, response.data), (201, {"result": "4"}))
+        self.assertFalse(ExpressionHistory.objects.exists())
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_in_flight_duplicate_times_out(self):
+        self.in_flight("2 + 2")
+        self.assertEqual(self.post("2 + 2").status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(ExpressionHistory.objects.exists())
+
+    @override_settings(IDEMPOTENCY_LOCK_TIMEOUT=10)
+    def test_abandoned_key_is_taken_over(self):
+        self.in_flight("2 + 2", age=60)
+        self.assertEqual(self.post("2 + 2").data, {"result": "4"})
+        self.assertEqual(IdempotencyRecord.objects.get().response, {"result": "4"})
+
+    def test_without_key(self):
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "2 + 2"})
+        self.assertFalse(IdempotencyRecord.objects.exists())
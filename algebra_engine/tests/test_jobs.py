@@ -0,0 +1,85 @@
+import io
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.jobs import evaluate_record, process_next_job
+
+
+class ExpressionJobTest(TestCase):
+    """
+    Test suite for the database-backed job queue.
+    """
+
+    def test_process_next_job_success(self):
+        record = ExpressionHistory.objects.create(expression="2 + len('abc')")
+        self.assertTrue(process_next_job())
+        record.refresh_from_db()
+        self.assertEqual(record.status, ExpressionHistory.Status.SUCCESS)
+        self.assertEqual(record.result, "5")
+        self.assertIsNotNone(record.evaluated_at)
+
+    def test_process_next_job_failure(self):
+        record = ExpressionHistory.objects.create(expression="5 / 0")
+        process_next_job()
+        record.refresh_from_db()
+        self.assertEqual(record.status, ExpressionHistory.Status.FAILED)
+        self.assertIn("division by zero", record.error)
+        self.assertIsNone(record.result)
+
+    def test_process_next_job_empty_queue(self):
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS")
+        self.assertFalse(process_next_job())
+
+    def test_worker_drains_queue_in_order(self):
+        first = ExpressionHistory.objects.create(expression="1 + 1")
+        second = ExpressionHistory.objects.create(expression="2 + 2")
+        output = io.StringIO()
+        call_command('run_expression_worker', drain=True, stdout=output)
+        self.assertIn("Processed 2 job(s)", output.getvalue())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertLess(first.evaluated_at, second.evaluated_at)
+
+
+class ExpressionJobViewTest(APITestCase):
+    """
+    Test suite for the asynchronous submission and polling endpoints.
+    """
+
+    def test_submit_returns_pending_record(self):
+        response = self.client.post(reverse('algebra_engine:expression-job-input'), {'expression': '2+2'})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'PENDING')
+        self.assertEqual(ExpressionHistory.objects.get(pk=response.data['id']).status, 'PENDING')
+
+    def test_poll_evaluated_record(self):
+        record = evaluate_record(ExpressionHistory.objects.create(expression="3 * 3"))
+        response = self.client.get(reverse('algebra_engine:expression-job-detail', args=[record.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'SUCCESS')
+        self.assertEqual(response.data['result'], '9')
+
+    @override_settings(EXPRESSION_JOBS_LONG_POLL_INTERVAL=0.01)
+    def test_long_poll_times_out_while_pending(self):
+        record = ExpressionHistory.objects.create(expression="3 * 3")
+        response = self.client.get(
+            reverse('algebra_engine:expression-job-detail', args=[record.id]), {'wait': 0.05}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'PENDING')
+
+    def test_long_poll_rejects_excessive_wait(self):
+        record = ExpressionHistory.objects.create(expression="3 * 3")
+        response = self.client.get(
+            reverse('algebra_engine:expression-job-detail', args=[record.id]), {'wait': 3600}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_poll_unknown_record(self):
+        response = self.client.get(reverse('algebra_engine:expression-job-detail', args=[12345]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,128 @@
+import json
+
+import msgpack
+
+from django.conf import settings
+from django.test import TestCase, RequestFactory, override_settings
+from django.db import close_old_connections
+from django.core.signals import request_started, request_finished
+
+from algebra_engine.models import ExpressionHistory
+from AlgebraAPI.lean import LeanAPIDispatcher, LeanWSGIHandler
+
+
+class SettingsRecordingMiddleware:
+    """
+    Middleware recording settings.MIDDLEWARE as it is instantiated.
+    """
+    seen = []
+
+    def __init__(self, get_response):
+        self.seen.append(list(settings.MIDDLEWARE))
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+class LeanWSGIHandlerTest(TestCase):
+    """
+    Test suite for the lean API handler and dispatcher.
+    """
+
+    def setUp(self):
+        """
+        Build the handlers and keep the test transaction's connection open across requests.
+        """
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        self.factory = RequestFactory()
+        self.handler = LeanWSGIHandler()
+
+    def call(self, application, environ):
+        captured = {}
+
+        def start_response(status, headers):
+            captured['status'] = status
+            captured['headers'] = dict(headers)
+
+        response = application(environ, start_response)
+        body = b''.join(response)
+        response.close()
+        return captured['status'], captured['headers'], body
+
+    def test_middleware_chain_is_stripped(self):
+        chain, names = self.handler._middleware_chain, []
+        while hasattr(chain, '__wrapped__'):
+            middleware = chain.__wrapped__
+            names.append(type(middleware).__name__)
+            chain = getattr(middleware, 'get_response', None)
+        self.assertEqual(names[0], 'LeanURLConfMiddleware')
+        self.assertNotIn('SessionMiddleware', names)
+        self.assertNotIn('CsrfViewMiddleware', names)
+
+    @override_settings(LEAN_API_MIDDLEWARE=[
+        'algebra_engine.middleware.LeanURLConfMiddleware',
+        'algebra_engine.tests.test_lean.MissingMiddleware',
+    ])
+    def test_failed_loading_leaves_settings_alone(self):
+        middleware = list(settings.MIDDLEWARE)
+        with self.assertRaises(ImportError):
+            LeanWSGIHandler()
+        self.assertEqual(settings.MIDDLEWARE, middleware)
+
+    @override_settings(LEAN_API_MIDDLEWARE=[
+        'algebra_engine.middleware.LeanURLConfMiddleware',
+        'algebra_engine.tests.test_lean.SettingsRecordingMiddleware',
+    ])
+    def test_middleware_is_built_from_the_lean_list(self):
+        SettingsRecordingMiddleware.seen.clear()
+        handler = LeanWSGIHandler()
+        self.assertEqual(SettingsRecordingMiddleware.seen, [list(settings.MIDDLEWARE)])
+        self.assertEqual(type(handler._middleware_chain.__wrapped__).__name__, 'LeanURLConfMiddleware')
+
+    def test_expression_input(self):
+        environ = self.factory.post(
+            '/api/expression-input/', json.dumps({'expression': '2+2'}), content_type='application/json'
+        ).environ
+        status, headers, body = self.call(self.handler, environ)
+        self.assertTrue(status.startswith('201'))
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(body), {'result': '4'})
+        self.assertTrue(ExpressionHistory.objects.filter(expression='2+2').exists())
+
+    def test_expression_input_rejects_other_media_types(self):
+        environ = self.factory.post(
+            '/api/expression-input/', 'expression=2%2B2', content_type='application/x-www-form-urlencoded'
+        ).environ
+        status, headers, body = self.call(self.handler, environ)
+        self.assertTrue(status.startswith('415'))
+        self.assertFalse(ExpressionHistory.objects.exists())
+
+    def test_expression_history_ignores_accept_header(self):
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS")
+        environ = self.factory.get('/api/expressions/', HTTP_ACCEPT='text/html').environ
+        status, headers, body = self.call(self.handler, environ)
+        self.assertTrue(status.startswith('200'))
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(body)[0]['expression'], '2 + 2')
+
+    def test_dispatcher_routes_by_prefix(self):
+        calls = []
+        dispatcher = LeanAPIDispatcher(
+            lambda environ, start_response: calls.append('regular'),
+            lambda environ, start_response: calls.append('lean'),
+            '/api/',
+        )
+        dispatcher(self.factory.get('/api/expressions/').environ, None)
+        dispatcher(self.factory.get('/admin/').environ, None)
+        self.assertEqual(calls, ['lean', 'regular'])
+
+    def test_expression_history_msgpack(self):
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS")
+        environ = self.factory.get('/api/expressions/', HTTP_ACCEPT='application/msgpack').environ
+        status, headers, body = self.call(self.handler, environ)
+        self.assertEqual(headers['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(body)[0]['result'], '4')
@@ -0,0 +1,77 @@
+import json
+import tempfile
+from wsgiref.util import setup_testing_defaults
+
+from django.test import SimpleTestCase, TestCase
+from django.db import close_old_connections
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.signals import request_started, request_finished
+
+from algebra_engine.loadtest import (
+    QUERY_COUNT_HEADER, QueryCountingApplication, build_scenarios, diff, load_traffic, summarize
+)
+
+
+class QueryCountingApplicationTest(TestCase):
+    """
+    Test suite for the per-request query count header.
+    """
+
+    def setUp(self):
+        """
+        Keep the test transaction's connection open across requests.
+        """
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+
+    def test_reports_query_count(self):
+        environ = {'PATH_INFO': '/api/expressions/', 'REQUEST_METHOD': 'GET'}
+        setup_testing_defaults(environ)
+        headers = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            headers.update(response_headers)
+
+        response = QueryCountingApplication(WSGIHandler())(environ, start_response)
+        response.close()
+        self.assertEqual(headers[QUERY_COUNT_HEADER], '1')
+
+
+class LoadTestReportTest(SimpleTestCase):
+    """
+    Test suite for the load harness traffic and reports.
+    """
+
+    def test_summarize(self):
+        samples = [('valid', 200, 0.01 * i, 4) for i in range(1, 101)] + [('history', 500, 1.0, 1)]
+        results = summarize(samples, elapsed=2.0)
+        self.assertEqual(results['total']['requests'], 101)
+        self.assertEqual(results['total']['errors'], 1)
+        self.assertAlmostEqual(results['total']['throughput'], 50.5)
+        self.assertAlmostEqual(results['valid']['p50_ms'], 505)
+        self.assertAlmostEqual(results['valid']['p99_ms'], 990.1)
+        self.assertEqual(results['valid']['queries_per_request'], 4)
+        self.assertEqual(results['history']['p95_ms'], 1000)
+
+    def test_diff_against_baseline(self):
+        baseline = {'total': {'throughput': 100.0, 'p95_ms': 10.0, 'errors': 0, 'queries_per_request': 4.0}}
+        results = {'total': {'throughput': 150.0, 'p95_ms': 20.0, 'errors': 0, 'queries_per_request': 4.1}}
+        verdicts = {metric: verdict for _, metric, *_, verdict in diff(results, baseline)}
+        self.assertEqual(verdicts, {'throughput': 'better', 'p95_ms': 'worse', 'queries_per_request': 'same'})
+
+    def test_replay_traffic(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as file:
+            file.write(json.dumps({'method': 'post', 'path': '/api/expression-input/', 'body': {'expression': '1'}}))
+            file.write('\n{"request_id": "not a request"}\n')
+            file.flush()
+            traffic = load_traffic(file.name)
+        self.assertEqual(traffic, [('POST', '/api/expression-input/', {'expression': '1'})])
+        self.assertEqual(build_scenarios(traffic)['replay'](), traffic[0])
+
+    def test_scenarios_use_test_expressions(self):
+        scenarios = build_scenarios()
+        self.assertEqual(set(scenarios), {'valid', 'invalid', 'history'})
+        method, path, body = scenarios['valid']()
+        self.assertEqual((method, path), ('POST', '/api/expression-input/'))
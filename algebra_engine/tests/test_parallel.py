@@ -0,0 +1,81 @@
+import os
+import ast
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from algebra_engine.parser import ExpressionEvaluator
+from algebra_engine.parallel import (
+    CostEstimator, ParallelEvaluator, eval_source, get_parallel_evaluator, independent_subtrees
+)
+
+
+class ParallelEvaluationTest(SimpleTestCase):
+    """
+    Test suite for parallel evaluation of big-integer subtrees.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.evaluator = ParallelEvaluator(workers=2, min_cost=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.evaluator.close()
+        super().tearDownClass()
+
+    def subtrees(self, expression, min_cost):
+        tree = ast.parse(expression, mode='eval')
+        return [ast.unparse(node) for node in independent_subtrees(tree.body, CostEstimator(), min_cost)]
+
+    def test_finds_independent_operands(self):
+        self.assertEqual(
+            self.subtrees('3 ** 1000000 * 5 ** 1000000 + 1', 4e6), ['3 ** 1000000', '5 ** 1000000']
+        )
+
+    def test_descends_into_single_expensive_operand(self):
+        self.assertEqual(
+            self.subtrees('(3 ** 1000000 - 5 ** 1000000) // 7 + 2', 4e6), ['3 ** 1000000', '5 ** 1000000']
+        )
+
+    def test_splits_nested_operands(self):
+        self.assertEqual(
+            self.subtrees('(3 ** 1000000 * 5 ** 1000000) // (7 ** 1000000 + 11 ** 10)', 4e6),
+            ['3 ** 1000000', '5 ** 1000000', '7 ** 1000000 + 11 ** 10'],
+        )
+
+    def test_small_expression_has_no_subtrees(self):
+        self.assertEqual(self.subtrees('2 ** 64 * 3 ** 64 + len("abc")', 4e6), [])
+
+    def test_small_expression_skips_pool(self):
+        evaluator = ParallelEvaluator(workers=2, min_cost=4e6)
+        with mock.patch.object(evaluator, 'get_pool') as get_pool:
+            self.assertEqual(evaluator.evaluate('2 ** 64 * 3 + 1'), 2 ** 64 * 3 + 1)
+        get_pool.assert_not_called()
+
+    def test_matches_sequential_evaluation(self):
+        for expression in ['2 ** 100 * 3 ** 100 + 5 ** 50', '-(7 ** 90 - 2 ** 80) // 3 ** 20', '2 ** 70 / 3 ** 40 * 5']:
+            self.assertEqual(self.evaluator.evaluate(expression), eval_source(expression))
+
+    def test_error_matches_sequential_evaluation(self):
+        with self.assertRaisesMessage(ZeroDivisionError, 'integer division or modulo by zero'):
+            self.evaluator.evaluate('2 ** 100 * (3 ** 100 // 0)')
+
+    def test_broken_pool_is_replaced(self):
+        evaluator = ParallelEvaluator(workers=1, min_cost=1)
+        self.addCleanup(evaluator.close)
+        broken = evaluator.get_pool()
+        broken.submit(os._exit, 1).exception()
+        expression = '2 ** 100 * 3 ** 100 + 1'
+        self.assertEqual(evaluator.evaluate(expression), eval_source(expression))
+        self.assertIsNone(evaluator.pool)
+        self.assertEqual(evaluator.evaluate(expression), eval_source(expression))
+        self.assertIsNot(evaluator.pool, broken)
+
+    @override_settings(PARALLEL_EVAL=True, PARALLEL_EVAL_WORKERS=2, PARALLEL_EVAL_MIN_COST=1)
+    def test_expression_evaluator_uses_parallel_evaluator(self):
+        get_parallel_evaluator.cache_clear()
+        self.addCleanup(get_parallel_evaluator.cache_clear)
+        self.addCleanup(lambda: get_parallel_evaluator().close())
+        self.assertEqual(ExpressionEvaluator('2 ** 100 * 3 ** 100 // 7 ** 80').evaluate(), str(2 ** 100 * 3 ** 100 // 7 ** 80))
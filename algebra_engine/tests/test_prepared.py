@@ -0,0 +1,97 @@
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from algebra_engine.models import ExpressionHistory, PreparedExpression
+from algebra_engine.prepared import PreparedForm, get_prepared_form
+
+
+class PreparedFormTest(TestCase):
+    """
+    Test suite for the compilation of prepared expression templates.
+    """
+
+    def test_compiles_placeholders(self):
+        form = PreparedForm.from_template("{a} * (2 + {b}) - len('abc') + {a}")
+        self.assertEqual(form.placeholders, ['a', 'b'])
+        self.assertEqual(form.evaluate({'a': 3, 'b': 4}), '18')
+
+    def test_matches_expression_evaluator(self):
+        form = PreparedForm.from_template("abs({x} - 10) / 4 + {y} ** 2 // 3")
+        self.assertEqual(form.evaluate({'x': 3, 'y': 5.5}), str(abs(3 - 10) / 4 + 5.5 ** 2 // 3))
+
+    def test_rejects_invalid_templates(self):
+        for template in ["{a} {b}", "2{a}", "{a} +", "({a} * 2", "{a} % 2", "__import__('os')"]:
+            with self.subTest(template=template), self.assertRaises(Exception):
+                PreparedForm.from_template(template)
+
+    def test_checks_parameters(self):
+        form = PreparedForm.from_template("{a} + {b}")
+        for parameters in [{'a': 1}, {'a': 1, 'b': 2, 'c': 3}, {'a': 1, 'b': '2'}, {'a': 1, 'b': True}]:
+            with self.subTest(parameters=parameters), self.assertRaises(ValueError):
+                form.check_parameters(parameters)
+
+    def test_renders_expression(self):
+        form = PreparedForm.from_template("{a} ** 2")
+        self.assertEqual(form.expression({'a': -3}), "(-3) ** 2")
+        self.assertEqual(form.evaluate({'a': -3}), '9')
+
+
+class PreparedExpressionViewTest(TestCase):
+    """
+    Test suite for the prepared expression endpoints.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        get_prepared_form.cache_clear()
+
+    def register(self, template):
+        return self.client.post(reverse('algebra_engine:prepared-expression-input'), {'template': template})
+
+    def evaluate(self, pk, parameters):
+        return self.client.post(
+            reverse('algebra_engine:prepared-expression-evaluate', args=[pk]), {'parameters': parameters}, format='json'
+        )
+
+    def test_register_and_evaluate(self):
+        response = self.register("{x} * 2 + {y}")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['placeholders'], ['x', 'y'])
+
+        response = self.evaluate(response.data['id'], [{'x': 1, 'y': 2}, {'x': 2 ** 70, 'y': 0}, {'x': 1, 'y': 0.5}])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['results'], [{'result': '4'}, {'result': str(2 ** 71)}, {'result': '2.5'}])
+        self.assertEqual(
+            list(ExpressionHistory.objects.order_by('id').values_list('expression', 'status')),
+            [("1 * 2 + 2", "SUCCESS"), (f"{2 ** 70} * 2 + 0", "SUCCESS"), ("1 * 2 + 0.5", "SUCCESS")],
+        )
+
+    def test_register_invalid_template(self):
+        response = self.register("{x} +* 2")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+        self.assertFalse(PreparedExpression.objects.exists())
+
+    def test_evaluation_error(self):
+        pk = self.register("1 / {x}").data['id']
+        response = self.evaluate(pk, [{'x': 0}])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('division by zero', response.data['results'][0]['error'])
+        self.assertEqual(ExpressionHistory.objects.get().status, "FAILED")
+
+    def test_invalid_parameters(self):
+        pk = self.register("1 / {x}").data['id']
+        response = self.evaluate(pk, [{'x': 1}, {'y': 1}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ExpressionHistory.objects.exists())
+
+    def test_unknown_prepared_expression(self):
+        self.assertEqual(self.evaluate(1, [{'x': 1}]).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_compiled_form_is_cached(self):
+        pk = self.register("{x} + 1").data['id']
+        self.evaluate(pk, [{'x': 1}])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_prepared_form(pk).evaluate({'x': 2}), '3')
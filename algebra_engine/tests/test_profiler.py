@@ -0,0 +1,70 @@
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from algebra_engine.models import SlowExpression
+from algebra_engine.parser import ExpressionEvaluator
+from algebra_engine.profiler import sample_slow_evaluation
+
+
+class SlowExpressionProfilerTest(TestCase):
+    """
+    Test suite for the slow expression sampler.
+    """
+
+    def evaluate(self, expression):
+        evaluator = ExpressionEvaluator(expression)
+        evaluator.evaluate()
+        return evaluator
+
+    def test_evaluator_records_stage_timings(self):
+        evaluator = self.evaluate("len('abc') * 2")
+        self.assertEqual(set(evaluator.timings), {'unary', 'format', 'validation', 'canonical', 'eval'})
+
+    def test_failed_stage_is_timed(self):
+        evaluator = ExpressionEvaluator("2 */ 2")
+        with self.assertRaises(Exception):
+            evaluator.evaluate()
+        self.assertIn('validation', evaluator.timings)
+        self.assertNotIn('eval', evaluator.timings)
+
+    @override_settings(SLOW_EXPRESSIONS_THRESHOLD=60)
+    def test_fast_evaluation_not_recorded(self):
+        self.assertIsNone(sample_slow_evaluation(self.evaluate("2 + 2")))
+        self.assertFalse(SlowExpression.objects.exists())
+
+    @override_settings(SLOW_EXPRESSIONS_THRESHOLD=0, SLOW_EXPRESSIONS_MAX_LENGTH=3)
+    def test_slow_evaluation_recorded(self):
+        record = sample_slow_evaluation(self.evaluate("2 + 2"))
+        self.assertEqual(record.expression, "2 +")
+        self.assertEqual(record.input_size, 5)
+        self.assertGreater(record.eval_time, 0)
+        self.assertAlmostEqual(
+            record.total_time,
+            record.unary_time + record.format_time + record.validation_time + record.canonical_time
+            + record.eval_time + record.db_time,
+        )
+        self.assertIsNone(record.profile)
+
+    @override_settings(SLOW_EXPRESSIONS_THRESHOLD=0, SLOW_EXPRESSIONS_MAX_RECORDS=2)
+    def test_ring_buffer_is_bounded(self):
+        for expression in ["1 + 1", "2 + 2", "3 + 3"]:
+            sample_slow_evaluation(self.evaluate(expression))
+        self.assertEqual(list(SlowExpression.objects.values_list('expression', flat=True)), ["2 + 2", "3 + 3"])
+
+    @override_settings(SLOW_EXPRESSIONS_THRESHOLD=0, SLOW_EXPRESSIONS_PROFILE=True)
+    def test_profile_snapshot(self):
+        record = sample_slow_evaluation(self.evaluate("2 ** 10"))
+        self.assertIn('safe_eval', record.profile)
+
+    @override_settings(SLOW_EXPRESSIONS_THRESHOLD=0)
+    def test_expression_input_records_db_time(self):
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': '2+2'})
+        self.assertGreater(SlowExpression.objects.get().db_time, 0)
+
+    @override_settings(SLOW_EXPRESSIONS_THRESHOLD=0)
+    def test_admin_changelist(self):
+        sample_slow_evaluation(self.evaluate("2 + 2"))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.get(reverse('admin:algebra_engine_slowexpression_changelist'))
+        self.assertContains(response, "2 + 2")
@@ -0,0 +1,160 @@
+import math
+from unittest import mock
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.canonical import canonical_hash
+from algebra_engine.result_cache import (
+    ResultCache, estimated_time, get_result_cache, hot_expressions, warm_up, warm_up_on_startup,
+)
+
+
+class ResultCacheTest(TestCase):
+    """
+    Test suite for the memory-bounded LRU result cache.
+    """
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResultCache(3 * ResultCache.entry_size("1 + 1", "2"))
+        for expression in ("1 + 1", "1 + 2", "1 + 3"):
+            cache.put(expression, "2")
+        cache.get("1 + 1")
+        cache.put("1 + 4", "2")
+        self.assertEqual(list(cache.entries), ["1 + 3", "1 + 1", "1 + 4"])
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+    def test_oversize_entry_is_not_cached(self):
+        cache = ResultCache(1000)
+        self.assertFalse(cache.put("2 ** 10000", "1" * 3011))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+    def test_replacing_an_entry_keeps_the_size(self):
+        cache = ResultCache(10000)
+        cache.put("1 + 1", "2")
+        size = cache.size
+        cache.put("1 + 1", "2")
+        self.assertEqual(cache.size, size)
+
+    def test_hits_and_misses_are_counted(self):
+        cache = ResultCache(10000)
+        cache.put("1 + 1", "2")
+        self.assertEqual(cache.get("1 + 1"), "2")
+        self.assertIsNone(cache.get("1 + 2"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+class WarmUpTest(TestCase):
+    """
+    Test suite for warming up the result cache with hot expressions.
+    """
+
+    def setUp(self):
+        get_result_cache().clear()
+        rows = [("2 + 2", "SUCCESS")] * 3 + [("3 * 3", "SUCCESS")] * 2 + [("1 / 0", "FAILURE")] * 5
+        ExpressionHistory.objects.bulk_create(
+            ExpressionHistory(expression=expression, result="", status=status_) for expression, status_ in rows
+        )
+        ExpressionHistory.objects.create(expression="7 +", result="", status="SUCCESS", input_size=10 ** 6)
+
+    def tearDown(self):
+        get_result_cache().clear()
+
+    def test_hot_expressions_are_ranked_by_frequency(self):
+        self.assertEqual(hot_expressions(10, 100), ["2 + 2", "3 * 3"])
+        self.assertEqual(hot_expressions(1, 100), ["2 + 2"])
+
+    def test_only_the_latest_evaluations_are_sampled(self):
+        ExpressionHistory.objects.create(expression="5 - 1", result="4", status="SUCCESS")
+        self.assertEqual(hot_expressions(10, 1), ["5 - 1"])
+
+    def test_warm_up_fills_the_cache(self):
+        report = warm_up(10, 100, 10)
+        self.assertEqual((report['candidates'], report['cached']), (2, 2))
+        self.assertEqual(get_result_cache().get(canonical_hash("3 * 3")), "9")
+
+    def test_warm_up_respects_the_time_budget(self):
+        report = warm_up(10, 100, 0)
+        self.assertEqual(report['cached'], 0)
+        self.assertEqual(len(get_result_cache()), 0)
+
+    def test_warm_up_skips_expressions_over_the_budget(self):
+        ExpressionHistory.objects.create(expression="7 ** 10000000 % 10", result="1", status="SUCCESS")
+        with mock.patch('algebra_engine.parser.ExpressionEvaluator.safe_eval', return_value=1) as safe_eval:
+            report = warm_up(10, 100, 1)
+        self.assertEqual((report['candidates'], report['skipped'], report['cached']), (3, 1, 2))
+        self.assertEqual(safe_eval.call_count, 2)
+
+    def test_estimated_time(self):
+        self.assertLess(estimated_time("2 + 2"), 1e-6)
+        self.assertGreater(estimated_time("7 ** 10000000 % 10"), 1)
+        self.assertEqual(estimated_time("2 +"), math.inf)
+
+    @override_settings(RESULT_CACHE_WARMUP=False)
+    def test_warm_up_on_startup_can_be_disabled(self):
+        warm_up_on_startup()
+        self.assertEqual(len(get_result_cache()), 0)
+
+    def test_warm_up_on_startup_never_raises(self):
+        with mock.patch('algebra_engine.result_cache.warm_up', side_effect=RuntimeError), \
+                self.assertLogs('algebra_engine.result_cache', 'WARNING'):
+            warm_up_on_startup()
+
+    def test_warm_up_on_startup_keeps_connections_open(self):
+        # AlgebraAPI.wsgi closes them before workers are forked, not the warm-up itself.
+        with mock.patch('django.db.connections.close_all') as close_all:
+            warm_up_on_startup()
+        close_all.assert_not_called()
+
+
+@override_settings(ADMISSION_CONTROL=False)
+class CachedEvaluationTest(TestCase):
+    """
+    Test suite for serving repeated expressions from the result cache.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        get_result_cache().clear()
+
+    def tearDown(self):
+        get_result_cache().clear()
+
+    def test_cached_result_is_served_and_recorded(self):
+        get_result_cache().put(canonical_hash("2 + 2"), "4")
+        with mock.patch('algebra_engine.parser.ExpressionEvaluator.safe_eval') as safe_eval:
+            response = self.client.post(
+                reverse('algebra_engine:expression-input'), {'expression': "2 + 2"}, format='json'
+            )
+        safe_eval.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['result'], "4")
+        self.assertTrue(ExpressionHistory.objects.filter(expression="2 + 2", result="4").exists())
+
+    def test_equivalent_expressions_share_results(self):
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "6 * 7 + 1"}, format='json')
+        with mock.patch('algebra_engine.parser.ExpressionEvaluator.safe_eval') as safe_eval:
+            response = self.client.post(
+                reverse('algebra_engine:expression-input'), {'expression': "(1 + (7*6))"}, format='json'
+            )
+        safe_eval.assert_not_called()
+        self.assertEqual(response.data['result'], "43")
+
+    def test_invalid_equivalent_expressions_are_not_served(self):
+        # Python reads "2 * -3" like "2 * (-3)", but the validator rejects it.
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "2 * (-3)"}, format='json')
+        response = self.client.post(reverse('algebra_engine:expression-input'), {'expression': "2 * -3"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_results_are_cached_after_evaluation(self):
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "6 * 7"}, format='json')
+        self.assertEqual(get_result_cache().get(canonical_hash("6 * 7")), "42")
+
+    @override_settings(RESULT_CACHE=False)
+    def test_cache_can_be_disabled(self):
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': "6 * 7"}, format='json')
+        self.assertEqual(len(get_result_cache()), 0)
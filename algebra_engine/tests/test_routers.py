@@ -0,0 +1,110 @@
+import time
+from unittest import skipUnless
+
+from django.conf import settings
+from django.urls import reverse
+from django.db import connections
+from django.http import HttpResponse
+from django.contrib.auth.models import User
+from django.test.utils import CaptureQueriesContext
+from django.test import SimpleTestCase, TransactionTestCase, RequestFactory, override_settings
+
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.middleware import ReplicaPinningMiddleware
+from algebra_engine.routers import ReplicaRouter, pin_to_primary, reset_pinning, restore_pinning
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    """
+    Test suite for the read replica router.
+    """
+
+    def setUp(self):
+        self.addCleanup(restore_pinning, reset_pinning())
+        self.router = ReplicaRouter()
+
+    def test_history_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(ExpressionHistory), 'replica')
+
+    def test_other_models_read_from_primary(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        self.assertEqual(self.router.db_for_write(ExpressionHistory), 'default')
+        self.assertEqual(self.router.db_for_read(ExpressionHistory), 'default')
+
+    def test_pin_expires(self):
+        pin_to_primary(-1)
+        self.assertEqual(self.router.db_for_read(ExpressionHistory), 'replica')
+        pin_to_primary(60)
+        self.assertEqual(self.router.db_for_read(ExpressionHistory), 'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'algebra_engine'))
+        self.assertFalse(self.router.allow_migrate('replica', 'algebra_engine'))
+
+
+@override_settings(REPLICA_READ_AFTER_WRITE_SECONDS=5)
+class ReplicaPinningMiddlewareTest(SimpleTestCase):
+    """
+    Test suite for the read-after-write guard carried across requests.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+        self.addCleanup(restore_pinning, reset_pinning())
+
+    def test_write_sets_pin_cookie(self):
+        def write(request):
+            self.router.db_for_write(ExpressionHistory)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(write)(self.factory.post('/api/expression-input/'))
+        cookie = response.cookies['replica_pinned_until']
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertGreater(float(cookie.value), time.time())
+
+    def test_read_without_write_sets_no_cookie(self):
+        response = ReplicaPinningMiddleware(lambda request: HttpResponse())(self.factory.get('/api/expressions/'))
+        self.assertNotIn('replica_pinned_until', response.cookies)
+
+    def test_cookie_pins_reads(self):
+        databases = []
+
+        def read(request):
+            databases.append(self.router.db_for_read(ExpressionHistory))
+            return HttpResponse()
+
+        middleware = ReplicaPinningMiddleware(read)
+        request = self.factory.get('/api/expressions/')
+        request.COOKIES['replica_pinned_until'] = str(time.time() + 5)
+        middleware(request)
+        request = self.factory.get('/api/expressions/')
+        request.COOKIES['replica_pinned_until'] = str(time.time() - 5)
+        middleware(request)
+        self.assertEqual(databases, ['default', 'replica'])
+
+
+@skipUnless(settings.REPLICA_DATABASE in settings.DATABASES, "No replica database configured.")
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    End-to-end routing against a configured replica: set DB_REPLICA_HOST, or follow the
+    "Read replica" section of the README, which also installs the router and middleware.
+    """
+    databases = '__all__'
+
+    def test_history_reads_use_replica_until_own_write(self):
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS")
+        replica = connections[settings.REPLICA_DATABASE]
+
+        with CaptureQueriesContext(replica) as replica_queries:
+            response = self.client.get(reverse('algebra_engine:expression-history'))
+        self.assertEqual(len(response.data), 1)
+        self.assertTrue(replica_queries.captured_queries)
+
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': '3+3'})
+        with CaptureQueriesContext(replica) as replica_queries:
+            response = self.client.get(reverse('algebra_engine:expression-history'))
+        self.assertEqual(len(response.data), 2)
+        self.assertFalse(replica_queries.captured_queries)
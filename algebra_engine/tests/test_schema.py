@@ -0,0 +1,79 @@
+import io
+import re
+import json
+import tempfile
+from pathlib import Path
+
+from django.urls import reverse
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.core.management import call_command
+
+from AlgebraAPI.schema import SCHEMA_CONTENT_TYPES, generate_schema, get_schema
+from algebra_engine.urls import urlpatterns
+
+
+class SchemaViewTest(TestCase):
+    """
+    Test suite for the precomputed OpenAPI schema views.
+    """
+
+    def setUp(self):
+        """
+        Point the schema artifacts at an empty temporary directory.
+        """
+        self.schema_dir = Path(tempfile.mkdtemp())
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=self.schema_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_schema.cache_clear()
+        self.addCleanup(get_schema.cache_clear)
+
+    def test_schema_generated_on_first_use(self):
+        response = self.client.get(reverse('schema-json', kwargs={'format': '.json'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('/expression-input/', json.loads(response.content)['paths'])
+
+    def test_prebuilt_schema_served(self):
+        (self.schema_dir / 'swagger.yaml').write_bytes(b'swagger: prebuilt\n')
+        response = self.client.get(reverse('schema-json', kwargs={'format': '.yaml'}))
+        self.assertEqual(response.content, b'swagger: prebuilt\n')
+
+    def test_generate_schema_command(self):
+        call_command('generate_schema', stdout=io.StringIO())
+        schema = json.loads((self.schema_dir / 'swagger.json').read_bytes())
+        self.assertIn('/expressions/', schema['paths'])
+        self.assertTrue((self.schema_dir / 'swagger.yaml').exists())
+
+    def test_swagger_ui(self):
+        response = self.client.get(reverse('schema-swagger-ui'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'swagger.json')
+
+
+class SchemaContentTest(SimpleTestCase):
+    """
+    Test suite for keeping the schema in line with the URLconf.
+    """
+
+    def test_every_endpoint_is_documented(self):
+        paths = json.loads(generate_schema('.json'))['paths']
+        for pattern in urlpatterns:
+            with self.subTest(pattern=str(pattern.pattern)):
+                self.assertIn('/' + re.sub(r'<(\w+:)?\w+>', '{id}', str(pattern.pattern)), paths)
+
+    def test_stored_schema_is_up_to_date(self):
+        stored = [
+            (settings.OPENAPI_SCHEMA_DIR / f'swagger{schema_format}', schema_format)
+            for schema_format in SCHEMA_CONTENT_TYPES
+        ]
+        stored = [(path, schema_format) for path, schema_format in stored if path.exists()]
+        if not stored:
+            self.skipTest("No stored schema.")
+        for path, schema_format in stored:
+            with self.subTest(path=str(path)):
+                self.assertEqual(
+                    path.read_bytes(), generate_schema(schema_format),
+                    f"{path} is stale, run `python manage.py generate_schema`.",
+                )
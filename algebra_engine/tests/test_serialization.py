@@ -0,0 +1,53 @@
+import msgpack
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from algebra_engine.encoders import RowEncoder
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.serializers import ExpressionHistorySerializer
+
+
+class RowEncoderTest(TestCase):
+    """
+    Test suite for the compiled history row encoder.
+    """
+
+    def setUp(self):
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS", evaluated_at=timezone.now())
+        ExpressionHistory.objects.create(expression="5 / 0", status="FAILED")
+        self.encoder = RowEncoder(ExpressionHistorySerializer)
+
+    def test_matches_model_serializer(self):
+        queryset = ExpressionHistory.objects.all()
+        encoded = self.encoder.encode_rows(queryset.values_list(*self.encoder.fields))
+        self.assertEqual(encoded, ExpressionHistorySerializer(queryset, many=True).data)
+
+    def test_field_order(self):
+        row = self.encoder.encode_rows(ExpressionHistory.objects.values_list(*self.encoder.fields))[0]
+        self.assertEqual(list(row), [
+            'id', 'expression', 'result', 'error', 'status', 'created_at', 'evaluated_at', 'expression_hash',
+            'canonical_hash', 'input_size', 'compression',
+        ])
+
+
+class MessagePackRendererTest(TestCase):
+    """
+    Test suite for MessagePack output of the history list.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS")
+
+    def test_msgpack_selected_by_accept_header(self):
+        response = self.client.get(reverse('algebra_engine:expression-history'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        records = msgpack.unpackb(response.content)
+        self.assertEqual(records[0]['expression'], "2 + 2")
+        self.assertEqual(records, ExpressionHistorySerializer(ExpressionHistory.objects.all(), many=True).data)
+
+    def test_json_stays_default(self):
+        response = self.client.get(reverse('algebra_engine:expression-history'))
+        self.assertEqual(response['Content-Type'], 'application/json')
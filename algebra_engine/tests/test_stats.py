@@ -0,0 +1,175 @@
+import threading
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from algebra_engine.models import ExpressionHistory, ExpressionHourlyStats, ExpressionHeavyHitter
+from algebra_engine.stats import (
+    expression_hash, flush_pending_stats, flush_stats, get_stats, get_stats_batch, rebuild_stats, record_evaluation,
+    record_heavy_hitter,
+)
+
+
+class ExpressionStatsTest(TestCase):
+    """
+    Test suite for the incrementally maintained statistics rollups.
+    """
+
+    def setUp(self):
+        get_stats_batch().clear()
+
+    def test_hourly_counts_by_status(self):
+        record_evaluation("2 + 2", "SUCCESS")
+        record_evaluation("2 + 2", "SUCCESS")
+        record_evaluation("5 / 0", "FAILED")
+        flush_stats()
+        counts = dict(ExpressionHourlyStats.objects.values_list('status', 'count'))
+        self.assertEqual(counts, {"SUCCESS": 2, "FAILED": 1})
+
+    def test_outcomes_written_in_batches(self):
+        record_evaluation("2 + 2", "SUCCESS")
+        record_evaluation("5 / 0", "FAILED")
+        flush_stats()
+        with override_settings(STATS_BATCH_SIZE=3, STATS_BATCH_INTERVAL=60):
+            with self.assertNumQueries(0):
+                record_evaluation("2 + 2", "SUCCESS")
+                record_evaluation("2 + 2", "SUCCESS")
+            # One update per distinct hour and expression, in a single transaction.
+            with self.assertNumQueries(6):
+                record_evaluation("5 / 0", "FAILED")
+        counts = dict(ExpressionHourlyStats.objects.values_list('status', 'count'))
+        self.assertEqual(counts, {"SUCCESS": 3, "FAILED": 2})
+        hitters = dict(ExpressionHeavyHitter.objects.values_list('expression', 'count'))
+        self.assertEqual(hitters, {"2 + 2": 3, "5 / 0": 2})
+
+    @override_settings(STATS_BATCH_SIZE=3)
+    def test_failed_write_keeps_batch(self):
+        record_evaluation("2 + 2", "SUCCESS")
+        record_evaluation("5 / 0", "FAILED")
+        with mock.patch('algebra_engine.stats.record_heavy_hitter', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                flush_stats()
+        self.assertFalse(ExpressionHourlyStats.objects.exists())
+        self.assertEqual(get_stats_batch().size, 2)
+        flush_stats()
+        counts = dict(ExpressionHourlyStats.objects.values_list('status', 'count'))
+        self.assertEqual(counts, {"SUCCESS": 1, "FAILED": 1})
+
+    @override_settings(STATS_BATCH_SIZE=3, STATS_BATCH_INTERVAL=0.01)
+    def test_idle_batch_written_by_timer(self):
+        flushed = threading.Event()
+        with mock.patch('algebra_engine.stats.flush_stats', side_effect=flushed.set):
+            record_evaluation("2 + 2", "SUCCESS")
+            self.assertTrue(flushed.wait(5))
+
+    def test_batch_written_at_exit(self):
+        get_stats_batch.cache_clear()
+        self.addCleanup(get_stats_batch.cache_clear)
+        with mock.patch('atexit.register') as register:
+            get_stats_batch()
+        register.assert_called_once_with(flush_pending_stats)
+
+    @override_settings(STATS_TOP_K=1)
+    def test_eviction_racing_another_worker(self):
+        select_for_update = ExpressionHeavyHitter.objects.select_for_update
+
+        def lock_after_other_worker(*args, **kwargs):
+            # Another worker starts tracking the same expression while the lock is awaited.
+            ExpressionHeavyHitter.objects.create(expression_hash=expression_hash("1 + 1"), expression="1 + 1", count=1)
+            return select_for_update(*args, **kwargs)
+
+        record_heavy_hitter("9 + 9")
+        with mock.patch.object(ExpressionHeavyHitter.objects, 'select_for_update', side_effect=lock_after_other_worker):
+            record_heavy_hitter("1 + 1", count=2)
+        hitters = dict(ExpressionHeavyHitter.objects.values_list('expression', 'count'))
+        self.assertEqual(hitters, {"9 + 9": 1, "1 + 1": 3})
+
+    @override_settings(STATS_TOP_K=2)
+    def test_heavy_hitters_stay_bounded(self):
+        for expression in ["1 + 1"] * 5 + ["2 + 2"] * 3 + ["3 + 3"]:
+            record_heavy_hitter(expression)
+        self.assertEqual(ExpressionHeavyHitter.objects.count(), 2)
+        hitters = {hitter.expression: (hitter.count, hitter.error) for hitter in ExpressionHeavyHitter.objects.all()}
+        self.assertEqual(hitters["1 + 1"], (5, 0))
+        self.assertEqual(hitters["3 + 3"], (4, 3))
+
+    def test_get_stats(self):
+        record_evaluation("2 + 2", "SUCCESS")
+        record_evaluation("2 + 2", "SUCCESS")
+        record_evaluation("3 + 3", "SUCCESS")
+        record_evaluation("5 / 0", "FAILED")
+        stats = get_stats(hours=24, top=1)
+        self.assertEqual(stats['total'], 4)
+        self.assertEqual(stats['success_rate'], 0.75)
+        self.assertEqual(stats['failure_rate'], 0.25)
+        self.assertEqual(len(stats['hourly']), 1)
+        self.assertEqual(stats['top_expressions'], [{'expression': "2 + 2", 'count': 2, 'error': 0}])
+
+    def test_old_hours_excluded(self):
+        record_evaluation("2 + 2", "SUCCESS", at=timezone.now() - timezone.timedelta(hours=30))
+        self.assertEqual(get_stats(hours=24, top=10)['total'], 0)
+
+    def test_rebuild_stats(self):
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS")
+        ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS")
+        ExpressionHistory.objects.create(expression="5 / 0", status="FAILED")
+        ExpressionHistory.objects.create(expression="1 + 1")
+        rebuild_stats()
+        stats = get_stats(hours=1, top=10)
+        self.assertEqual(stats['totals'], {"SUCCESS": 2, "FAILED": 1})
+        self.assertEqual(stats['top_expressions'][0], {'expression': "2 + 2", 'count': 2, 'error': 0})
+
+    def test_rebuild_stats_buckets_jobs_by_evaluation_time(self):
+        now = timezone.now()
+        record = ExpressionHistory.objects.create(expression="2 + 2", result="4", status="SUCCESS", evaluated_at=now)
+        ExpressionHistory.objects.filter(pk=record.pk).update(created_at=now - timezone.timedelta(hours=3))
+        rebuild_stats()
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        self.assertEqual(list(ExpressionHourlyStats.objects.values_list('hour', 'count')), [(hour, 1)])
+
+    def test_rebuild_stats_matches_incremental_keys(self):
+        digest = expression_hash("1" * 100)
+        for _ in range(2):
+            ExpressionHistory.objects.create(
+                expression="1" * 10, result="1", status="SUCCESS", expression_hash=digest, input_size=100
+            )
+        ExpressionHistory.objects.create(expression="1" * 10, result="1", status="SUCCESS")
+        rebuild_stats()
+        record_heavy_hitter("1" * 10, digest)
+        record_heavy_hitter("1" * 10)
+        hitters = dict(ExpressionHeavyHitter.objects.values_list('expression_hash', 'count'))
+        self.assertEqual(hitters, {digest: 3, expression_hash("1" * 10): 2})
+
+
+class ExpressionStatsViewTest(APITestCase):
+    """
+    Test suite for the statistics endpoint.
+    """
+
+    def setUp(self):
+        get_stats_batch().clear()
+
+    def test_stats_follow_evaluations(self):
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': '2+2'})
+        self.client.post(reverse('algebra_engine:expression-input'), {'expression': '2*/2'})
+        response = self.client.get(reverse('algebra_engine:expression-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals'], {"SUCCESS": 1, "FAILED": 1})
+        self.assertEqual(response.data['success_rate'], 0.5)
+
+    def test_stats_failure_does_not_change_response(self):
+        with mock.patch('algebra_engine.feed.record_evaluation', side_effect=RuntimeError("stats down")), \
+                self.assertLogs('algebra_engine.feed', 'WARNING'):
+            response = self.client.post(reverse('algebra_engine:expression-input'), {'expression': '2+2'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"result": "4"})
+        self.assertEqual(list(ExpressionHistory.objects.values_list('status', flat=True)), ["SUCCESS"])
+
+    def test_invalid_query(self):
+        response = self.client.get(reverse('algebra_engine:expression-stats'), {'hours': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,160 @@
+import random
+import hashlib
+
+from django.urls import reverse
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+
+from error_messages import SyntaxErrorMessages
+from algebra_engine.models import ExpressionHistory
+from algebra_engine.parser import ExpressionEvaluator
+from algebra_engine.constance import SyntaxValidatorConstants
+from algebra_engine.streaming import StreamingEvaluator, UploadTooLarge
+
+
+class StreamingEvaluatorTest(SimpleTestCase):
+    """
+    Test suite for the incremental tokenizer and evaluator.
+    """
+
+    def stream(self, expression, chunk_size=1, **limits):
+        evaluator = StreamingEvaluator(
+            limits.get('max_size', 10 ** 9), limits.get('max_token', 4300), limits.get('max_depth', 100),
+            limits.get('max_pending', 1000), 10,
+        )
+        data = expression.encode()
+        for start in range(0, len(data), chunk_size):
+            evaluator.feed(data[start:start + chunk_size])
+        return evaluator.finish()
+
+    def test_matches_expression_evaluator(self):
+        expressions = SyntaxValidatorConstants.VALID_EXPRESSIONS + [
+            "-2 ** 2", "2 ** 3 ** 2", "10 // 3 * 2 - 7 / 2", "1.5 + .5", "len('  a b  ') * 2", "abs (-3 - 4) + 1",
+        ]
+        for expression in expressions:
+            for chunk_size in (1, 3, 1024):
+                with self.subTest(expression=expression, chunk_size=chunk_size):
+                    self.assertEqual(self.stream(expression, chunk_size), ExpressionEvaluator(expression).evaluate())
+
+    def test_signs_after_operators(self):
+        for expression in ("2 - -3", "2 + - 3", "10 -- 2", "7++3", "0--2", "3-+2", "--3", "-+-3", "2 - - - 3"):
+            with self.subTest(expression=expression):
+                self.assertEqual(self.stream(expression), ExpressionEvaluator(expression).evaluate())
+        for expression in ("2 * -3", "2 / +3", "2 // -3", "2 ** -1"):
+            with self.subTest(expression=expression), self.assertRaises(SyntaxError):
+                self.stream(expression)
+
+    def random_expression(self, rng, depth):
+        parts = []
+        for index in range(rng.randint(1, 4)):
+            if index:
+                operator = rng.choice(['+', '-', '*', '/', '//', '**'])
+                space = rng.choice(['', ' '])
+                parts.append(f'{space}{operator}{space}')
+            sign = rng.choice(['', '', '', '-', '+', '- ', '--', '-+'])
+            if parts and parts[-1].strip() == '**':
+                # Keep exponents small so that evaluations stay cheap.
+                parts.append(sign + rng.choice(['2', '3', '0.5']))
+            elif depth and rng.random() < 0.3:
+                parts.append(f'{sign}({self.random_expression(rng, depth - 1)})')
+            else:
+                number = rng.choice([str(rng.randint(0, 20)), f'{rng.randint(0, 9)}.{rng.randint(0, 9)}', "len('ab')"])
+                parts.append(sign + number)
+        return ''.join(parts)
+
+    def test_agrees_with_expression_evaluator(self):
+        # abs() is left out: ExpressionEvaluator evals its argument text without validating it.
+        rng = random.Random(0)
+        for _ in range(2000):
+            expression = self.random_expression(rng, 2)
+            try:
+                expected = ExpressionEvaluator(expression).evaluate()
+            except Exception:
+                expected = None
+            try:
+                result = self.stream(expression, chunk_size=rng.choice([1, 3, 1024]))
+            except Exception:
+                result = None
+            self.assertEqual(result, expected, expression)
+
+    def test_rejects_invalid_expressions(self):
+        invalid = [
+            expression
+            for name, expressions in vars(SyntaxValidatorConstants).items()
+            if name.isupper() and name != 'VALID_EXPRESSIONS'
+            for expression in expressions
+        ]
+        for expression in invalid + ["", "len ('a')", "007"]:
+            with self.subTest(expression=expression), self.assertRaises(Exception):
+                self.stream(expression)
+
+    def test_syntax_error_takes_precedence(self):
+        with self.assertRaisesMessage(SyntaxError, SyntaxErrorMessages.ENDS_WITH_OPERATOR):
+            self.stream("1 / 0 +")
+        with self.assertRaises(ZeroDivisionError):
+            self.stream("1 / 0 + 1")
+
+    def test_limits(self):
+        with self.assertRaises(UploadTooLarge):
+            self.stream("1 + 1", max_size=4)
+        with self.assertRaises(SyntaxError):
+            self.stream("12345 + 1", max_token=4)
+        with self.assertRaises(SyntaxError):
+            self.stream("((((1))))", max_depth=3)
+
+    def test_pending_operators_are_bounded(self):
+        self.assertEqual(self.stream("2 ** 1 ** 2 ** 3", max_pending=3), "2")
+        self.assertEqual(self.stream("-" * 4 + "3", max_pending=4), "3")
+        for expression in ("2 ** " * 5 + "1", "-" * 5 + "3"):
+            with self.subTest(expression=expression), self.assertRaisesMessage(SyntaxError, "More than 4 operators"):
+                self.stream(expression, max_pending=4)
+
+    def test_long_expression_keeps_prefix_and_hash(self):
+        expression = " + ".join(["(2 * 3)"] * 50000)
+        evaluator = StreamingEvaluator(10 ** 9, 4300, 100, 1000, 10)
+        evaluator.feed(expression.encode())
+        self.assertEqual(evaluator.finish(), str(6 * 50000))
+        self.assertEqual(evaluator.prefix, expression[:10])
+        self.assertEqual(evaluator.size, len(expression))
+        self.assertEqual(evaluator.hexdigest, hashlib.sha256(expression.encode()).hexdigest())
+
+
+class ExpressionUploadViewTest(TestCase):
+    """
+    Test suite for the ExpressionUpload view.
+    """
+
+    def upload(self, expression):
+        return self.client.post(reverse('algebra_engine:expression-upload'), expression, content_type='text/plain')
+
+    @override_settings(EXPRESSION_UPLOAD_PREFIX_LENGTH=5)
+    def test_upload(self):
+        expression = " + ".join(["len('abc')"] * 1000)
+        response = self.upload(expression)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"result": "3000"})
+
+        record = ExpressionHistory.objects.get()
+        self.assertEqual(record.expression, "len('")
+        self.assertEqual(record.input_size, len(expression))
+        self.assertEqual(record.expression_hash, hashlib.sha256(expression.encode()).hexdigest())
+
+    def test_invalid_upload(self):
+        response = self.upload("2 +* 3" + " + 1" * 1000)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        record = ExpressionHistory.objects.get()
+        self.assertEqual(record.status, "FAILED")
+        self.assertEqual(record.input_size, 4006)
+
+    def test_malformed_content_length(self):
+        response = self.client.post(
+            reverse('algebra_engine:expression-upload'), "1 + 1", content_type='text/plain', CONTENT_LENGTH='five'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ExpressionHistory.objects.exists())
+
+    @override_settings(EXPRESSION_UPLOAD_MAX_SIZE=10)
+    def test_too_large_upload(self):
+        response = self.upload("1 + 1 + 1 + 1")
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(ExpressionHistory.objects.exists())
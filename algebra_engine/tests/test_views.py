@@ -3,7 +3,7 @@ from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
-from algebra_engine.tests.constance import *
+from algebra_engine.constance import *
 from error_messages import SyntaxErrorMessages
 from algebra_engine.models import ExpressionHistory
 from algebra_engine.expression_validator import SyntaxValidator
@@ -62,6 +62,12 @@ class ExpressionInputTest(APITestCase):
         self.client.post(url, {'expression': '3+3'})
         self.assertTrue(ExpressionHistory.objects.exists())
 
+    def test_failed_expression_keeps_error(self):
+        url = reverse('algebra_engine:expression-input')
+        response = self.client.post(url, {'expression': '2*/2'})
+        record = ExpressionHistory.objects.get()
+        self.assertEqual((record.status, record.result, record.error), ("FAILED", None, response.data['error']))
+
 
 class ExpressionFormatterTest(TestCase):
 
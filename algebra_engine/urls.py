@@ -1,12 +1,26 @@
 from django.urls import path
 
-from algebra_engine.views import ExpressionHistoryList, ExpressionInput
+from algebra_engine.views import (
+    ExpressionHistoryList, RecentExpressions, ExpressionHistoryDetail, ExpressionInput, ExpressionUpload,
+    ExpressionJobInput, ExpressionJobDetail, ExpressionStats, PreparedExpressionInput, PreparedExpressionEvaluate,
+)
 
 app_name = 'algebra_engine'
 
 
 urlpatterns = [
     path('expressions/', ExpressionHistoryList.as_view(), name='expression-history'),
+    path('expressions/recent/', RecentExpressions.as_view(), name='expression-recent'),
+    path('expressions/<int:pk>/', ExpressionHistoryDetail.as_view(), name='expression-history-detail'),
     path('expression-input/', ExpressionInput.as_view(), name='expression-input'),
+    path('expression-upload/', ExpressionUpload.as_view(), name='expression-upload'),
+    path('expression-jobs/', ExpressionJobInput.as_view(), name='expression-job-input'),
+    path('expression-jobs/<int:pk>/', ExpressionJobDetail.as_view(), name='expression-job-detail'),
+    path('stats/', ExpressionStats.as_view(), name='expression-stats'),
+    path('prepared-expressions/', PreparedExpressionInput.as_view(), name='prepared-expression-input'),
+    path(
+        'prepared-expressions/<int:pk>/evaluate/', PreparedExpressionEvaluate.as_view(),
+        name='prepared-expression-evaluate',
+    ),
 
 ]
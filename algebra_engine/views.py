@@ -1,11 +1,36 @@
-from .models import ExpressionHistory
+import time
+
+from . import idempotency
+from .models import ExpressionHistory, IdempotencyRecord, PreparedExpression
 from .parser import ExpressionEvaluator
-from .serializers import ExpressionHistorySerializer, ExpressionInputSerializer
+from .prepared import get_prepared_form, register
+from .compression import history_fields
+from .result_cache import get_result_cache
+from .feed import get_recent_feed, publish_evaluations
+from .streaming import StreamingEvaluator, UploadTooLarge
+from .profiler import sample_slow_evaluation
+from .admission import EvaluationCostThrottle
+from .encoders import RowEncoder
+from .renderers import MessagePackRenderer
+from .stats import expression_hash, get_stats
+from .negotiation import LeanContentNegotiation
+from .serializers import (
+    ExpressionHistorySerializer, ExpressionHistoryDetailSerializer, ExpressionInputSerializer,
+    ExpressionJobPollSerializer, ExpressionStatsQuerySerializer, PreparedExpressionSerializer,
+    PreparedExpressionEvaluateSerializer, RecentExpressionsQuerySerializer,
+)
+from error_messages import IdempotencyErrorMessages, SyntaxErrorMessages, UploadErrorMessages
 
+from django.conf import settings
 from django.views import View
+from django.http import Http404
 from django.shortcuts import render
 from rest_framework import generics, status
+from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 
 
 class MainView(View):
@@ -32,9 +57,72 @@ class ExpressionHistoryList(generics.ListAPIView):
 
     Clients can access this endpoint to retrieve the entire history
     of algebraic expressions evaluated, including their results and status.
+
+    Rows are read with ``values_list()`` and encoded by a RowEncoder compiled from
+    the serializer instead of building model instances, and clients may ask for
+    compact MessagePack output with ``Accept: application/msgpack``.
     """
     queryset = ExpressionHistory.objects.all()
     serializer_class = ExpressionHistorySerializer
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
+    row_encoder = RowEncoder(ExpressionHistorySerializer)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Handle GET request for the expression history.
+
+        Args:
+            request: Django Rest Framework request object.
+
+        Returns:
+            Response: DRF Response object with the encoded history records.
+        """
+        rows = self.filter_queryset(self.get_queryset()).values_list(*self.row_encoder.fields)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.row_encoder.encode_rows(page))
+        return Response(self.row_encoder.encode_rows(rows))
+
+
+class RecentExpressions(generics.GenericAPIView):
+    """
+    API view to follow the most recent evaluations without querying the database.
+
+    Records come from the in-memory feed of this server process. Without
+    ``?since=<id>`` the latest ``limit`` records are returned; with it, the records
+    after that id, and ``?wait=<seconds>`` holds the response until there is one.
+    Clients pass the returned ``cursor`` as ``since`` on their next request.
+    """
+    serializer_class = RecentExpressionsQuerySerializer
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request for the recent evaluations.
+
+        Args:
+            request: Django Rest Framework request object, optionally with ``since``, ``limit`` and ``wait``
+                query parameters.
+
+        Returns:
+            Response: DRF Response object with the records, oldest first, and the next cursor.
+        """
+        query = self.get_serializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        results, cursor = get_recent_feed().read(**query.validated_data)
+        return Response({"cursor": cursor, "results": results})
+
+
+class ExpressionHistoryDetail(generics.RetrieveAPIView):
+    """
+    API view to retrieve one expression history record in full.
+
+    Unlike the list, which only shows previews of compressed values, the
+    expression and result are decompressed here.
+    """
+    queryset = ExpressionHistory.objects.all()
+    serializer_class = ExpressionHistoryDetailSerializer
 
 
 class ExpressionInput(generics.CreateAPIView):
@@ -43,8 +131,18 @@ class ExpressionInput(generics.CreateAPIView):
 
     This view accepts an algebraic expression, evaluates it, and returns the result.
     It also stores a record of the expression and its evaluation status in the database.
+
+    Clients are admitted through EvaluationCostThrottle and charged for the CPU time
+    and size of each evaluation.
+
+    Requests may carry an ``Idempotency-Key`` header: the first response for a key is
+    stored, and duplicates wait for it and replay it instead of evaluating again.
+
+    Successful results are kept in the in-process result cache by canonical form,
+    so repeated and equivalent expressions are not evaluated again by the same process.
     """
     serializer_class = ExpressionInputSerializer
+    throttle_classes = [EvaluationCostThrottle]
 
     def create(self, request, *args, **kwargs):
         """
@@ -60,10 +158,380 @@ class ExpressionInput(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
 
         expression = serializer.validated_data['expression']
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return self.evaluate(request, expression)
+        max_length = IdempotencyRecord._meta.get_field('key').max_length
+        if len(key) > max_length:
+            return Response(
+                {"error": IdempotencyErrorMessages.KEY_TOO_LONG.format(max_length)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        record, claimed = idempotency.claim(
+            EvaluationCostThrottle().get_ident(request), key, expression_hash(expression)
+        )
+        if claimed:
+            try:
+                response = self.evaluate(request, expression)
+            except BaseException:
+                idempotency.release(record)
+                raise
+            idempotency.complete(record, response.status_code, response.data)
+            return response
+
+        if record.request_hash != expression_hash(expression):
+            return Response({"error": IdempotencyErrorMessages.KEY_REUSED}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        record = idempotency.wait_for_response(record)
+        if record.status_code is None:
+            return Response({"error": IdempotencyErrorMessages.IN_PROGRESS}, status=status.HTTP_409_CONFLICT)
+        return Response(record.response, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+    def evaluate(self, request, expression: str) -> Response:
+        """
+        Evaluate an expression and store it in the history.
+
+        Args:
+            request: Django Rest Framework request object.
+            expression (str): The expression to evaluate.
+
+        Returns:
+            Response: DRF Response object with the evaluation result or error message.
+        """
+        evaluator = ExpressionEvaluator(expression)
+        cache = get_result_cache() if settings.RESULT_CACHE else None
+        started = time.thread_time()
         try:
-            result = ExpressionEvaluator(expression).evaluate()
-            ExpressionHistory.objects.create(expression=expression, result=result, status="SUCCESS")
-            return Response({"result": result}, status=status.HTTP_201_CREATED)
+            try:
+                result, error = evaluator.evaluate(cache), None
+            except Exception as e:
+                result, error = None, str(e)
+            with evaluator.timed('db'):
+                record = ExpressionHistory.objects.create(
+                    **history_fields(expression=expression, result=result), error=error,
+                    status="FAILED" if error else "SUCCESS", canonical_hash=evaluator.canonical_hash,
+                )
+        finally:
+            EvaluationCostThrottle().charge_request(request, expression, time.thread_time() - started)
+            sample_slow_evaluation(evaluator)
+
+        publish_evaluations(record)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"result": result}, status=status.HTTP_201_CREATED)
+
+
+class ExpressionUpload(APIView):
+    """
+    API view to evaluate a very large expression sent as the raw request body.
+
+    The body is tokenized and evaluated incrementally as it is read, with bounded
+    buffers, and rejected as soon as it exceeds EXPRESSION_UPLOAD_MAX_SIZE. Only a
+    prefix of the expression, its hash and its size are stored in the history.
+    """
+    throttle_classes = [EvaluationCostThrottle]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST request to evaluate the expression in the request body.
+
+        Args:
+            request: Django Rest Framework request object whose body is the expression.
+
+        Returns:
+            Response: DRF Response object with the evaluation result or error message.
+        """
+        too_large = {"error": UploadErrorMessages.TOO_LARGE.format(settings.EXPRESSION_UPLOAD_MAX_SIZE)}
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({"error": UploadErrorMessages.INVALID_CONTENT_LENGTH}, status=status.HTTP_400_BAD_REQUEST)
+        if content_length > settings.EXPRESSION_UPLOAD_MAX_SIZE:
+            return Response(too_large, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        evaluator = StreamingEvaluator(
+            settings.EXPRESSION_UPLOAD_MAX_SIZE, settings.EXPRESSION_UPLOAD_MAX_TOKEN,
+            settings.EXPRESSION_UPLOAD_MAX_DEPTH, settings.EXPRESSION_UPLOAD_MAX_PENDING,
+            settings.EXPRESSION_UPLOAD_PREFIX_LENGTH,
+        )
+        started = time.thread_time()
+        try:
+            result, error = evaluator.consume(request.stream, settings.EXPRESSION_UPLOAD_CHUNK_SIZE), None
+        except UploadTooLarge:
+            return Response(too_large, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except SyntaxError as e:
+            result, error = None, SyntaxErrorMessages.GLOBAL_SYNTAX_ERROR.format(evaluator.prefix, str(e))
         except Exception as e:
-            ExpressionHistory.objects.create(expression=expression, status="FAILED")
+            result, error = None, SyntaxErrorMessages.EVALUATING_EXPRESSION_ERROR.format(evaluator.prefix, str(e))
+        finally:
+            EvaluationCostThrottle().charge_request(
+                request, evaluator.prefix, time.thread_time() - started, evaluator.size
+            )
+
+        record = ExpressionHistory.objects.create(
+            expression=evaluator.prefix, **history_fields(result=result), error=error,
+            status="FAILED" if error else "SUCCESS", expression_hash=evaluator.hexdigest, input_size=evaluator.size,
+        )
+        publish_evaluations(record)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"result": result}, status=status.HTTP_201_CREATED)
+
+
+class ExpressionJobInput(generics.CreateAPIView):
+    """
+    API view to submit an algebraic expression for asynchronous evaluation.
+
+    The expression is stored as a PENDING record and its id is returned right away;
+    the run_expression_worker command evaluates it later.
+
+    Clients are admitted through EvaluationCostThrottle like for ExpressionInput; the
+    record keeps the client, which the worker charges once the evaluation cost is known.
+    """
+    serializer_class = ExpressionInputSerializer
+    throttle_classes = [EvaluationCostThrottle]
+
+    def create(self, request, *args, **kwargs):
+        """
+        Handle POST request to queue an algebraic expression.
+
+        Args:
+            request: Django Rest Framework request object containing the expression.
+
+        Returns:
+            Response: DRF Response object with the record id and its PENDING status.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        expression = serializer.validated_data['expression']
+        record = ExpressionHistory.objects.create(
+            **history_fields(expression=expression), client=EvaluationCostThrottle().get_ident(request)
+        )
+        return Response({"id": record.id, "status": record.status}, status=status.HTTP_202_ACCEPTED)
+
+
+class ExpressionJobDetail(generics.RetrieveAPIView):
+    """
+    API view to poll an asynchronous evaluation.
+
+    Passing ``?wait=<seconds>`` turns the request into a long poll: the response is
+    held until the record leaves the PENDING status or the wait runs out.
+    """
+    queryset = ExpressionHistory.objects.all()
+    serializer_class = ExpressionHistoryDetailSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Handle GET request for the state of a submitted expression.
+
+        Args:
+            request: Django Rest Framework request object, optionally with a ``wait`` query parameter.
+
+        Returns:
+            Response: DRF Response object with the record, its status and, once evaluated, its result.
+        """
+        poll = ExpressionJobPollSerializer(data=request.query_params)
+        poll.is_valid(raise_exception=True)
+
+        record = self.get_object()
+        deadline = time.monotonic() + poll.validated_data['wait']
+        while record.status == ExpressionHistory.Status.PENDING and time.monotonic() < deadline:
+            time.sleep(settings.EXPRESSION_JOBS_LONG_POLL_INTERVAL)
+            record.refresh_from_db(fields=['result', 'result_data', 'error', 'compression', 'status', 'evaluated_at'])
+        return Response(self.get_serializer(record).data)
+
+
+class ExpressionStats(generics.GenericAPIView):
+    """
+    API view to report evaluation statistics.
+
+    Success and failure rates, hourly volume and the most frequent expressions are
+    read from rollup tables maintained as results are stored, so the response time
+    does not grow with the expression history.
+    """
+    serializer_class = ExpressionStatsQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET request for the statistics of the last ``hours`` hours.
+
+        Args:
+            request: Django Rest Framework request object, optionally with ``hours`` and ``top`` query parameters.
+
+        Returns:
+            Response: DRF Response object with totals, rates, hourly volume and top expressions.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(get_stats(**serializer.validated_data))
+
+
+class PreparedExpressionInput(generics.CreateAPIView):
+    """
+    API view to register a prepared expression.
+
+    The template, an expression with ``{name}`` placeholders, is validated and
+    compiled once here; its id is then used to evaluate it with parameter sets.
+    Validation evaluates the arguments of abs(), so registrations are charged too.
+    """
+    serializer_class = PreparedExpressionSerializer
+    throttle_classes = [EvaluationCostThrottle]
+
+    def create(self, request, *args, **kwargs):
+        """
+        Handle POST request to register a template.
+
+        Args:
+            request: Django Rest Framework request object containing the template.
+
+        Returns:
+            Response: DRF Response object with the prepared expression and its placeholders, or an error message.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        template = serializer.validated_data['template']
+        started = time.thread_time()
+        try:
+            prepared = register(template)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            EvaluationCostThrottle().charge_request(request, template, time.thread_time() - started)
+        return Response(self.get_serializer(prepared).data, status=status.HTTP_201_CREATED)
+
+
+class PreparedExpressionEvaluate(generics.GenericAPIView):
+    """
+    API view to evaluate a prepared expression with one or more parameter sets.
+
+    Only the parameters are checked; the compiled template comes from a per-worker
+    LRU cache. Each evaluation is stored in the expression history with the
+    placeholders replaced by their values. They get no ``canonical_hash``: parsing every
+    rendered expression again would cost more than evaluating the compiled template.
+    """
+    queryset = PreparedExpression.objects.all()
+    serializer_class = PreparedExpressionEvaluateSerializer
+    throttle_classes = [EvaluationCostThrottle]
+
+    def post(self, request, pk, *args, **kwargs):
+        """
+        Handle POST request to evaluate a prepared expression.
+
+        Args:
+            request: Django Rest Framework request object containing the ``parameters`` sets.
+            pk: Id of the prepared expression.
+
+        Returns:
+            Response: DRF Response object with a result or error message per parameter set.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            form = get_prepared_form(pk)
+        except PreparedExpression.DoesNotExist:
+            raise Http404
+
+        parameter_sets = serializer.validated_data['parameters']
+        try:
+            for parameters in parameter_sets:
+                form.check_parameters(parameters)
+        except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results, records = [], []
+        started = time.thread_time()
+        for parameters in parameter_sets:
+            expression = form.expression(parameters)
+            try:
+                result = form.evaluate(parameters)
+                results.append({"result": result})
+                records.append((expression, "SUCCESS", history_fields(expression=expression, result=result)))
+            except Exception as e:
+                results.append({"error": str(e)})
+                records.append((expression, "FAILED", {**history_fields(expression=expression), 'error': str(e)}))
+        cpu_time = time.thread_time() - started
+
+        publish_evaluations(*ExpressionHistory.objects.bulk_create(
+            ExpressionHistory(**fields, status=outcome) for _, outcome, fields in records
+        ))
+        EvaluationCostThrottle().charge_request(
+            request, ''.join(expression for expression, _, _ in records), cpu_time
+        )
+        return Response({"results": results}, status=status.HTTP_201_CREATED)
+
+
+class LeanAPIMixin:
+    """
+    Strip a DRF view down to what machine clients need.
+
+    Authentication, permissions and the browsable API are dropped, and content
+    negotiation always picks JSON. Used by the views served from the lean URLconf.
+    """
+    authentication_classes = ()
+    permission_classes = ()
+    parser_classes = (JSONParser,)
+    renderer_classes = (JSONRenderer,)
+    content_negotiation_class = LeanContentNegotiation
+
+
+class LeanExpressionHistoryList(LeanAPIMixin, ExpressionHistoryList):
+    """
+    ExpressionHistoryList served through the lean API handler.
+    """
+    renderer_classes = (JSONRenderer, MessagePackRenderer)
+
+
+class LeanRecentExpressions(LeanAPIMixin, RecentExpressions):
+    """
+    RecentExpressions served through the lean API handler.
+    """
+    renderer_classes = (JSONRenderer, MessagePackRenderer)
+
+
+class LeanExpressionHistoryDetail(LeanAPIMixin, ExpressionHistoryDetail):
+    """
+    ExpressionHistoryDetail served through the lean API handler.
+    """
+
+
+class LeanExpressionInput(LeanAPIMixin, ExpressionInput):
+    """
+    ExpressionInput served through the lean API handler.
+    """
+
+
+class LeanExpressionUpload(LeanAPIMixin, ExpressionUpload):
+    """
+    ExpressionUpload served through the lean API handler.
+    """
+
+
+class LeanExpressionJobInput(LeanAPIMixin, ExpressionJobInput):
+    """
+    ExpressionJobInput served through the lean API handler.
+    """
+
+
+class LeanExpressionJobDetail(LeanAPIMixin, ExpressionJobDetail):
+    """
+    ExpressionJobDetail served through the lean API handler.
+    """
+
+
+class LeanExpressionStats(LeanAPIMixin, ExpressionStats):
+    """
+    ExpressionStats served through the lean API handler.
+    """
+
+
+class LeanPreparedExpressionInput(LeanAPIMixin, PreparedExpressionInput):
+    """
+    PreparedExpressionInput served through the lean API handler.
+    """
+
+
+class LeanPreparedExpressionEvaluate(LeanAPIMixin, PreparedExpressionEvaluate):
+    """
+    PreparedExpressionEvaluate served through the lean API handler.
+    """
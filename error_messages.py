@@ -12,3 +12,27 @@ class SyntaxErrorMessages:
     EMPTY_ARGUMENT_ABS = "Empty argument for abs()"
     SYNTAX_ERROR_ABS = "Syntax error in expression inside abs(): {}"
     INVALID_VALUE_ABS = "Invalid value for abs(): {}. Error: {}"
+
+
+class PreparedExpressionMessages:
+    UNKNOWN_PARAMETERS = "Unknown parameters: {}"
+    MISSING_PARAMETERS = "Missing parameters: {}"
+    INVALID_PARAMETER = "Parameter {} must be a number."
+
+
+class UploadErrorMessages:
+    TOO_LARGE = "Expression exceeds the maximum size of {} bytes."
+    INVALID_CONTENT_LENGTH = "Invalid Content-Length header."
+    EMPTY_EXPRESSION = "Empty expression."
+    INVALID_ENCODING = "Expression is not valid UTF-8."
+    TOKEN_TOO_LONG = "Token longer than {} characters."
+    TOO_DEEP = "Parentheses nested deeper than {} levels."
+    TOO_MANY_PENDING = "More than {} operators awaiting their operands."
+    INVALID_SYNTAX = "invalid syntax"
+    LEADING_ZEROS = "leading zeros in decimal integer literals are not permitted"
+
+
+class IdempotencyErrorMessages:
+    KEY_TOO_LONG = "Idempotency-Key must be at most {} characters."
+    KEY_REUSED = "Idempotency-Key was already used with a different expression."
+    IN_PROGRESS = "A request with this Idempotency-Key is still being evaluated, retry later."